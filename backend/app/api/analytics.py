@@ -2,6 +2,7 @@
 数据统计分析API路由 - 使用数据库真实数据
 """
 from fastapi import APIRouter, HTTPException, Query, Depends
+import asyncio
 from typing import Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
@@ -10,9 +11,12 @@ from sqlalchemy import func, and_
 from ..core.database import get_db
 from ..models.problem import LeetCodeProblem, ProblemSubmission, DailyProgress
 from ..models.interview import InterviewQuestion, VoiceAnswer
+from ..services.knowledge_tracing_service import KnowledgeTracingService, MASTERED_THRESHOLD, FAMILIAR_THRESHOLD
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+knowledge_service = KnowledgeTracingService()
+
 
 @router.get("/overview")
 async def get_overview_statistics(db: Session = Depends(get_db)):
@@ -664,3 +668,33 @@ async def get_achievements(db: Session = Depends(get_db)):
         return {"success": True, "achievements": achievements}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取成就数据失败: {str(e)}")
+
+
+@router.get("/knowledge-mastery")
+async def get_knowledge_mastery(
+    min_observations: int = Query(1, ge=1),
+    db: Session = Depends(get_db)
+):
+    """获取各知识点（标签）的掌握度，按掌握概率降序"""
+    try:
+        mastery = knowledge_service.get_mastery(db, min_observations)
+        summary = {
+            "tags": len(mastery),
+            "mastered": sum(1 for item in mastery if item["mastery"] >= MASTERED_THRESHOLD),
+            "familiar": sum(1 for item in mastery if FAMILIAR_THRESHOLD <= item["mastery"] < MASTERED_THRESHOLD),
+            "weak": sum(1 for item in mastery if item["mastery"] < FAMILIAR_THRESHOLD),
+        }
+        return {"success": True, "mastery": mastery, "summary": summary}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取知识点掌握度失败: {str(e)}")
+
+
+@router.post("/knowledge-mastery/replay")
+async def replay_knowledge_mastery():
+    """由全部刷题提交与面试答题记录重建知识点掌握度"""
+    try:
+        loop = asyncio.get_event_loop()
+        stats = await loop.run_in_executor(None, knowledge_service.replay)
+        return {"success": True, "replay": stats}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"重建知识点掌握度失败: {str(e)}")
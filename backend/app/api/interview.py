@@ -4,61 +4,202 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
 from typing import Optional, List
 from datetime import datetime
+from bisect import bisect_right
+import asyncio
+import base64
+import json
+import os
 from sqlalchemy.orm import Session
 
 from ..core.database import get_db
 from ..models.interview import InterviewQuestion, VoiceAnswer, InterviewSession
 from ..services.ai_service import AIService
-from ..services.voice_service import VoiceService
+from ..services.voice_service import VoiceService, sniff_audio_format
+from ..services.answer_scoring_service import AnswerScoringService, quality_level
+from ..services.question_search_service import QuestionSearchIndex
+from ..services.item_bank_service import ItemBankService, PASS_SCORE
+from ..services.adaptive_session_service import AdaptiveSessionService, MAX_SESSION_QUESTIONS
+from ..services.knowledge_tracing_service import KnowledgeTracingService
+from ..models.adaptive_session import AdaptiveSession
+from ..utils.keypoint_matcher import parse_list_field
+from ..utils.file_handler import FileHandler, UploadTooLargeError
 
 router = APIRouter(prefix="/interview", tags=["interview"])
 
+# 批量分析单次请求的回答数上限
+MAX_BATCH_ANSWERS = 5000
+
 ai_service = AIService()
 voice_service = VoiceService()
+scoring_service = AnswerScoringService()
+search_index = QuestionSearchIndex()
+item_bank = ItemBankService()
+knowledge_service = KnowledgeTracingService()
+session_service = AdaptiveSessionService(item_bank, scoring_service, knowledge_service)
+file_handler = FileHandler()
+
+# 回答录音的保存目录（文件以内容的 SHA-256 命名）
+AUDIO_UPLOAD_DIR = os.path.join(file_handler.upload_dir, "audio")
+
+# 可编辑的题目字段（question 为 content 的别名，与列表接口返回的字段名一致）
+EDITABLE_QUESTION_FIELDS = (
+    "title", "content", "category", "difficulty", "tags", "reference_answer",
+    "key_points", "importance", "frequency", "is_active"
+)
+
+
+def _serialize_question(q: InterviewQuestion) -> dict:
+    return {
+        "id": q.id,
+        "title": q.title,
+        "question": q.content,
+        "category": q.category,
+        "difficulty": q.difficulty,
+        "tags": parse_list_field(q.tags),
+        "reference_answer": q.reference_answer,
+        "key_points": parse_list_field(q.key_points),
+        "importance": q.importance,
+        "frequency": q.frequency,
+    }
+
+
+def _serialize_question_summary(q: InterviewQuestion) -> dict:
+    """列表精简字段，不含参考答案与要点"""
+    return {
+        "id": q.id,
+        "title": q.title,
+        "question": q.content,
+        "category": q.category,
+        "difficulty": q.difficulty,
+        "tags": parse_list_field(q.tags),
+        "importance": q.importance,
+    }
+
+
+def _encode_cursor(position: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, with_score: bool) -> dict:
+    """解析分页游标；检索结果的游标带上一页末条的得分"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        position["id"] = int(position["id"])
+        if with_score:
+            position["score"] = float(position["score"])
+        return position
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
 
 
 @router.get("/questions")
 async def get_questions(
     category: Optional[str] = None,
     difficulty: Optional[str] = None,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    view: str = "full",
     limit: int = 50,
     db: Session = Depends(get_db)
 ):
-    """获取面试题目列表（从数据库）"""
+    """获取面试题目列表（从数据库）；q 检索标题、内容、标签与要点并按相关度排序，cursor 为上一页返回的 next_cursor"""
     try:
+        if view not in ("full", "slim"):
+            raise HTTPException(status_code=400, detail="view 只能是 full 或 slim")
+        if limit < 1:
+            raise HTTPException(status_code=400, detail="limit 必须大于 0")
+        serialize = _serialize_question if view == "full" else _serialize_question_summary
+        searching = bool(q and q.strip())
+        position = _decode_cursor(cursor, with_score=searching) if cursor else None
+
+        if searching:
+            loop = asyncio.get_event_loop()
+            ranked = await loop.run_in_executor(None, search_index.search, q, category, difficulty)
+            total_matches = len(ranked)
+            if position:
+                # 结果按 (-得分, ID) 升序排列，从游标之后继续
+                keys = [(-score, question_id) for score, question_id in ranked]
+                ranked = ranked[bisect_right(keys, (-position["score"], position["id"])):]
+            page = ranked[:limit]
+            rows = {
+                row.id: row for row in db.query(InterviewQuestion).filter(
+                    InterviewQuestion.id.in_([question_id for _, question_id in page])
+                ).all()
+            }
+            questions_list = []
+            for score, question_id in page:
+                if question_id in rows:
+                    questions_list.append(dict(serialize(rows[question_id]), score=score))
+            next_cursor = _encode_cursor({"score": page[-1][0], "id": page[-1][1]}) if len(ranked) > limit else None
+            return {
+                "success": True,
+                "questions": questions_list,
+                "total": len(questions_list),
+                "total_matches": total_matches,
+                "next_cursor": next_cursor
+            }
+
         query = db.query(InterviewQuestion).filter(InterviewQuestion.is_active == True)
 
         if category:
             query = query.filter(InterviewQuestion.category == category)
         if difficulty:
             query = query.filter(InterviewQuestion.difficulty == difficulty)
+        if position:
+            query = query.filter(InterviewQuestion.id > position["id"])
 
-        questions = query.limit(limit).all()
-
-        questions_list = []
-        for q in questions:
-            questions_list.append({
-                "id": q.id,
-                "title": q.title,
-                "question": q.content,
-                "category": q.category,
-                "difficulty": q.difficulty,
-                "tags": q.tags if isinstance(q.tags, list) else (eval(q.tags) if q.tags else []),
-                "reference_answer": q.reference_answer,
-                "key_points": q.key_points if isinstance(q.key_points, list) else (eval(q.key_points) if q.key_points else []),
-                "importance": q.importance,
-                "frequency": q.frequency,
-            })
+        questions = query.order_by(InterviewQuestion.id).limit(limit + 1).all()
+        has_more = len(questions) > limit
+        questions = questions[:limit]
+
+        questions_list = [serialize(q) for q in questions]
 
         return {
             "success": True,
             "questions": questions_list,
-            "total": len(questions_list)
+            "total": len(questions_list),
+            "next_cursor": _encode_cursor({"id": questions[-1].id}) if has_more else None
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取题目失败: {str(e)}")
 
 
+@router.put("/questions/{question_id}")
+async def update_question(question_id: int, question_data: dict, db: Session = Depends(get_db)):
+    """编辑面试题目；该题的要点匹配器失效，参考答案向量增量更新"""
+    try:
+        question = db.query(InterviewQuestion).filter(InterviewQuestion.id == question_id).first()
+        if not question:
+            raise HTTPException(status_code=404, detail="题目不存在")
+
+        if "question" in question_data and "content" not in question_data:
+            question_data["content"] = question_data["question"]
+        for field in EDITABLE_QUESTION_FIELDS:
+            if field not in question_data:
+                continue
+            value = question_data[field]
+            if field in ("tags", "key_points"):
+                if not isinstance(value, list):
+                    raise HTTPException(status_code=400, detail=f"{field} 必须是列表")
+                value = json.dumps(value, ensure_ascii=False)
+            setattr(question, field, value)
+        if hasattr(question, "updated_at"):
+            question.updated_at = datetime.utcnow()
+        db.commit()
+        scoring_service.question_changed(question)
+        search_index.update(question)
+        item_bank.invalidate()
+
+        return {"success": True, "question": _serialize_question(question)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"更新题目失败: {str(e)}")
+
+
 @router.post("/analyze-answer")
 async def analyze_answer(
     question_id: int = Form(...),
@@ -66,76 +207,32 @@ async def analyze_answer(
     audio_file: Optional[UploadFile] = File(None),
     db: Session = Depends(get_db)
 ):
-    """分析回答（文字或语音）"""
+    """分析回答（文字或语音）；录音分块写盘，先校验文件头、大小与时长，不合格时不写入回答记录"""
     try:
-        # 查询题目获取参考答案
-        question = db.query(InterviewQuestion).filter(InterviewQuestion.id == question_id).first()
+        audio = None
+        if audio_file:
+            try:
+                audio = await file_handler.save_upload_stream(
+                    audio_file, AUDIO_UPLOAD_DIR, voice_service.max_file_size, check_header=sniff_audio_format
+                )
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=413, detail=str(e))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            loop = asyncio.get_event_loop()
+            validation = await loop.run_in_executor(None, voice_service.validate_audio_file, audio["path"])
+            if not validation["valid"]:
+                file_handler.delete_file(audio["path"])
+                raise HTTPException(status_code=400, detail=validation["error"])
 
-        reference_answer = ""
-        key_points = []
-        if question:
-            reference_answer = question.reference_answer or ""
-            kp = question.key_points
-            if isinstance(kp, list):
-                key_points = kp
-            elif kp:
-                try:
-                    key_points = eval(kp)
-                except:
-                    key_points = []
-
-        # 简单的评分逻辑：基于回答长度和关键词匹配
-        answer_len = len(answer_text)
-        base_score = min(60 + answer_len // 10, 95)
-
-        # 检查关键词匹配
-        matched_points = 0
-        for point in key_points:
-            if isinstance(point, str) and point.lower() in answer_text.lower():
-                matched_points += 1
-        
-        keyword_bonus = min(matched_points * 5, 20) if key_points else 10
-        
-        content_score = min(base_score + keyword_bonus, 98)
-        logic_score = min(base_score - 2 + keyword_bonus, 95)
-        accuracy_score = min(base_score + 5 + keyword_bonus, 98)
-        overall_score = round((content_score + logic_score + accuracy_score) / 3, 1)
-
-        # 生成反馈
-        strengths = []
-        improvements = []
-        
-        if answer_len > 50:
-            strengths.append("回答内容较为详细")
-        if answer_len > 100:
-            strengths.append("对问题有较深入的理解")
-        if matched_points > 0:
-            strengths.append(f"涵盖了{matched_points}个关键要点")
-        
-        if answer_len < 50:
-            improvements.append("建议增加回答的详细程度")
-        if matched_points < len(key_points) // 2 and key_points:
-            improvements.append("建议覆盖更多关键知识点")
-        improvements.append("可以通过举例来增强回答的说服力")
+        question = db.query(InterviewQuestion).filter(InterviewQuestion.id == question_id).first()
+        analysis = scoring_service.analyze(question, answer_text)
+        overall_score = analysis["overall_score"]
 
         analysis_result = {
             "question_id": question_id,
             "answer_text": answer_text,
-            "analysis": {
-                "content_score": content_score,
-                "logic_score": logic_score,
-                "accuracy_score": accuracy_score,
-                "overall_score": overall_score,
-                "strengths": strengths if strengths else ["回答涵盖了问题的主要方面"],
-                "improvements": improvements,
-                "detailed_feedback": f"整体评分 {overall_score} 分。" + (
-                    f"回答中提及了{matched_points}个关键要点。" if key_points else ""
-                ) + "建议在表达时更加结构化，先概括后详述。",
-                "key_points_coverage": {
-                    "total": len(key_points),
-                    "matched": matched_points
-                }
-            },
+            "analysis": analysis,
             "voice_analysis": None,
             "created_at": datetime.utcnow().isoformat()
         }
@@ -145,72 +242,151 @@ async def analyze_answer(
             question_id=question_id,
             transcribed_text=answer_text,
             quality_score=overall_score,
-            quality_level="优秀" if overall_score >= 85 else "良好" if overall_score >= 70 else "一般",
+            quality_level=quality_level(overall_score),
             feedback=analysis_result["analysis"]["detailed_feedback"],
         )
         db.add(voice_answer)
+        knowledge_service.observe_answer(db, question, overall_score)
         db.commit()
 
-        if audio_file:
-            voice_analysis = await voice_service.analyze_speech_quality(audio_file)
+        if audio:
+            voice_analysis = voice_service.analyze_speech_quality(audio["path"], answer_text)
+            voice_analysis["audio"] = {
+                "filename": audio["filename"],
+                "size": audio["size"],
+                "sha256": audio["sha256"],
+                "format": audio["extension"].lstrip("."),
+                "duration": validation.get("duration"),
+            }
             analysis_result["voice_analysis"] = voice_analysis
 
         return {
             "success": True,
             "analysis": analysis_result
         }
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
+        if audio:
+            # 评分或写库失败时不保留没有回答记录对应的录音
+            file_handler.delete_file(audio["path"])
         raise HTTPException(status_code=500, detail=f"分析回答失败: {str(e)}")
 
 
+@router.post("/analyze-answers:batch")
+async def analyze_answers_batch(batch_data: dict, db: Session = Depends(get_db)):
+    """批量分析回答（仅文字）：一次查询加载全部题目，批量评分，所有回答记录在同一事务中写入"""
+    try:
+        items = batch_data.get("answers")
+        if not isinstance(items, list) or not items:
+            raise HTTPException(status_code=400, detail="answers 必须是非空列表")
+        if len(items) > MAX_BATCH_ANSWERS:
+            raise HTTPException(status_code=400, detail=f"单次最多分析 {MAX_BATCH_ANSWERS} 条回答")
+        pairs_input = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get("answer_text"), str):
+                raise HTTPException(status_code=400, detail=f"第{index + 1}条缺少 answer_text")
+            try:
+                question_id = int(item.get("question_id"))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail=f"第{index + 1}条缺少有效的 question_id")
+            pairs_input.append((question_id, item["answer_text"]))
+
+        question_ids = {question_id for question_id, _ in pairs_input}
+        questions = {
+            q.id: q for q in db.query(InterviewQuestion).filter(InterviewQuestion.id.in_(question_ids)).all()
+        }
+        pairs = [(questions.get(question_id), answer_text) for question_id, answer_text in pairs_input]
+        analyses = scoring_service.analyze_many(pairs)
+
+        created_at = datetime.utcnow()
+        voice_answers = [
+            VoiceAnswer(
+                question_id=question_id,
+                transcribed_text=answer_text,
+                quality_score=analysis["overall_score"],
+                quality_level=quality_level(analysis["overall_score"]),
+                feedback=analysis["detailed_feedback"],
+                created_at=created_at,
+            )
+            for (question_id, answer_text), analysis in zip(pairs_input, analyses)
+        ]
+        db.add_all(voice_answers)
+        knowledge_service.observe_many(db, [
+            (parse_list_field(question.tags), analysis["overall_score"] >= PASS_SCORE, "interview", created_at)
+            for (question, _), analysis in zip(pairs, analyses) if question is not None
+        ])
+        # 提交前取出 ID：提交后对象过期，逐个读取 id 会各自触发一次查询
+        db.flush()
+        answer_ids = [voice_answer.id for voice_answer in voice_answers]
+        db.commit()
+
+        results = [
+            {
+                "answer_id": answer_id,
+                "question_id": question_id,
+                "question_found": questions.get(question_id) is not None,
+                "analysis": analysis,
+            }
+            for (question_id, _), analysis, answer_id in zip(pairs_input, analyses, answer_ids)
+        ]
+        return {
+            "success": True,
+            "total": len(results),
+            "results": results,
+            "created_at": created_at.isoformat()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"批量分析回答失败: {str(e)}")
+
+
 @router.get("/statistics")
 async def get_interview_statistics(db: Session = Depends(get_db)):
     """获取面试统计信息（从数据库）"""
     try:
-        # 总答题数
-        total_answered = db.query(VoiceAnswer).count()
-        
-        # 平均分
         from sqlalchemy import func
-        avg_score_result = db.query(func.avg(VoiceAnswer.quality_score)).scalar()
+
+        # 总答题数与平均分
+        total_answered, avg_score_result = db.query(
+            func.count(VoiceAnswer.id), func.avg(VoiceAnswer.quality_score)
+        ).one()
         avg_score = round(float(avg_score_result), 1) if avg_score_result else 0
 
-        # 按分类统计
-        questions = db.query(InterviewQuestion).all()
-        category_map = {}
-        for q in questions:
-            cat = q.category
-            if cat not in category_map:
-                category_map[cat] = {"ids": [], "total": 0}
-            category_map[cat]["ids"].append(q.id)
-            category_map[cat]["total"] += 1
+        # 按分类统计：题目表左连接答题记录，一次 GROUP BY 得到题目数、答题数与平均分
+        category_rows = db.query(
+            InterviewQuestion.category,
+            func.count(func.distinct(InterviewQuestion.id)),
+            func.count(VoiceAnswer.id),
+            func.avg(VoiceAnswer.quality_score),
+        ).outerjoin(
+            VoiceAnswer, VoiceAnswer.question_id == InterviewQuestion.id
+        ).group_by(InterviewQuestion.category).all()
 
         category_stats = {}
-        for cat, info in category_map.items():
-            answered = db.query(VoiceAnswer).filter(
-                VoiceAnswer.question_id.in_(info["ids"])
-            ).count()
-            cat_avg = db.query(func.avg(VoiceAnswer.quality_score)).filter(
-                VoiceAnswer.question_id.in_(info["ids"])
-            ).scalar()
+        for cat, total, answered, cat_avg in category_rows:
             category_stats[cat] = {
-                "total_questions": info["total"],
+                "total_questions": total,
                 "answered": answered,
                 "avg_score": round(float(cat_avg), 1) if cat_avg else 0
             }
 
-        # 最近答题记录
-        recent_answers = db.query(VoiceAnswer).order_by(
+        # 最近答题记录：只取覆盖索引中的列
+        recent_answers = db.query(
+            VoiceAnswer.question_id, VoiceAnswer.quality_score, VoiceAnswer.created_at
+        ).order_by(
             VoiceAnswer.created_at.desc()
         ).limit(10).all()
 
         recent_progress = []
-        for a in recent_answers:
+        for question_id, score, created_at in recent_answers:
             recent_progress.append({
-                "question_id": a.question_id,
-                "score": a.quality_score,
-                "created_at": a.created_at.isoformat() if a.created_at else None
+                "question_id": question_id,
+                "score": score,
+                "created_at": created_at.isoformat() if created_at else None
             })
 
         stats = {
@@ -257,7 +433,7 @@ async def get_daily_question(db: Session = Depends(get_db)):
                 "question": question.content,
                 "category": question.category,
                 "difficulty": question.difficulty,
-                "tags": question.tags if isinstance(question.tags, list) else (eval(question.tags) if question.tags else []),
+                "tags": parse_list_field(question.tags),
             },
             "date": today
         }
@@ -265,3 +441,104 @@ async def get_daily_question(db: Session = Depends(get_db)):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取每日题目失败: {str(e)}")
+
+
+def _serialize_session(session: AdaptiveSession, db: Session) -> dict:
+    current = None
+    if session.current_question_id is not None:
+        question = db.query(InterviewQuestion).filter(InterviewQuestion.id == session.current_question_id).first()
+        if question:
+            current = _serialize_question_summary(question)
+    return {
+        "id": session.id,
+        "status": session.status,
+        "category": session.category,
+        "answered": session.answered,
+        "max_questions": session.max_questions,
+        "ability": round(session.ability, 4),
+        "ability_se": session_service.standard_error(session),
+        "current_question": current,
+        "created_at": session.created_at.isoformat() if session.created_at else None,
+        "finished_at": session.finished_at.isoformat() if session.finished_at else None
+    }
+
+
+@router.post("/sessions")
+async def create_session(session_data: dict, db: Session = Depends(get_db)):
+    """开始自适应模拟面试：按能力估计逐题选出信息量最大的题目"""
+    try:
+        max_questions = session_data.get("max_questions", 10)
+        if not isinstance(max_questions, int) or not 1 <= max_questions <= MAX_SESSION_QUESTIONS:
+            raise HTTPException(status_code=400, detail=f"max_questions 须在 1-{MAX_SESSION_QUESTIONS} 之间")
+        try:
+            session = session_service.create(db, max_questions, session_data.get("category") or None)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        return {"success": True, "session": _serialize_session(session, db)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"创建模拟面试失败: {str(e)}")
+
+
+@router.get("/sessions/{session_id}")
+async def get_session(session_id: int, db: Session = Depends(get_db)):
+    """获取模拟面试进度与当前题目"""
+    try:
+        session = db.query(AdaptiveSession).filter(AdaptiveSession.id == session_id).first()
+        if not session:
+            raise HTTPException(status_code=404, detail="模拟面试不存在")
+        return {"success": True, "session": _serialize_session(session, db)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取模拟面试失败: {str(e)}")
+
+
+@router.post("/sessions/{session_id}/answer")
+async def answer_session_question(session_id: int, answer_data: dict, db: Session = Depends(get_db)):
+    """提交当前题目的回答：评分、更新能力估计并返回下一题（会话结束时为 null）"""
+    try:
+        answer_text = answer_data.get("answer_text")
+        if not isinstance(answer_text, str) or not answer_text.strip():
+            raise HTTPException(status_code=400, detail="answer_text 不能为空")
+        session = db.query(AdaptiveSession).filter(AdaptiveSession.id == session_id).first()
+        if not session:
+            raise HTTPException(status_code=404, detail="模拟面试不存在")
+        if session.status != "active":
+            raise HTTPException(status_code=400, detail="模拟面试已结束")
+
+        result = session_service.answer(db, session, answer_text)
+        return {
+            "success": True,
+            "question_id": result["question_id"],
+            "correct": result["correct"],
+            "analysis": result["analysis"],
+            "session": _serialize_session(session, db)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"提交回答失败: {str(e)}")
+
+
+@router.get("/item-bank")
+async def get_item_bank():
+    """查看题库 IRT 标定状态"""
+    try:
+        return {"success": True, "item_bank": item_bank.get_stats(), "prefetch": session_service.get_stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取题库状态失败: {str(e)}")
+
+
+@router.post("/item-bank/calibrate")
+async def calibrate_item_bank():
+    """用全部答题记录重新标定题目的区分度与难度"""
+    try:
+        loop = asyncio.get_event_loop()
+        stats = await loop.run_in_executor(None, item_bank.calibrate)
+        return {"success": True, "calibration": stats}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"题库标定失败: {str(e)}")
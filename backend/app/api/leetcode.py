@@ -1,16 +1,50 @@
 """
 LeetCode相关API路由 - 使用数据库真实数据
 """
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Form, Request, Depends
 from typing import Optional, List
+from datetime import date, datetime
 import asyncio
+import ipaddress
 
-from ..services.crawler_service import CrawlerService
+from ..services.crawler_service import get_shared_crawler
 from ..services.leetcode_service import LeetCodeService
+from ..services.similarity_service import ProblemSimilarityService
+from ..services.study_plan_service import StudyPlanService
+from ..services.catalog_importer import CatalogImporter, detect_format, open_text_stream
+from ..services.benchmark_service import SubmissionBenchmarkService
+from ..services.code_run_service import CodeRunService, RunQueueFullError
+from ..services.sync_service import ProblemSyncService, SYNC_MODES
+from ..services.sync_job_service import SyncJobManager
+from ..services.tag_label_service import ProblemTagService
+from ..core.config import settings
 
 router = APIRouter(prefix="/leetcode", tags=["leetcode"])
 
 leetcode_service = LeetCodeService()
+similarity_service = ProblemSimilarityService()
+study_plan_service = StudyPlanService()
+benchmark_service = SubmissionBenchmarkService()
+code_run_service = CodeRunService()
+sync_service = ProblemSyncService()
+tag_service = ProblemTagService()
+sync_job_manager = SyncJobManager(sync_service, on_rows_changed=similarity_service.rebuild)
+
+# 经反向代理转发的请求带有这些头，此时连接来源是代理而不是真实客户端
+FORWARDED_HEADERS = ("forwarded", "x-forwarded-for", "x-real-ip")
+
+
+def require_local_sandbox(request: Request):
+    """执行提交代码的接口：需显式开启 SANDBOX_ENABLED，且只接受本机直接发来的请求"""
+    if not settings.SANDBOX_ENABLED:
+        raise HTTPException(status_code=403, detail="代码运行未启用，请在本机设置 SANDBOX_ENABLED=true 后重启服务")
+    host = request.client.host if request.client else ""
+    try:
+        is_loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        is_loopback = False
+    if not is_loopback or any(header in request.headers for header in FORWARDED_HEADERS):
+        raise HTTPException(status_code=403, detail="代码运行只允许本机直接访问")
 
 
 @router.get("/problems")
@@ -51,32 +85,175 @@ async def get_problem_detail(problem_id: int):
         raise HTTPException(status_code=500, detail=f"获取题目详情失败: {str(e)}")
 
 
+@router.get("/problems/{problem_id}/related")
+async def get_related_problems(problem_id: int, limit: int = Query(10, ge=1, le=50)):
+    """获取相似题目"""
+    try:
+        if similarity_service.needs_rebuild():
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, similarity_service.rebuild)
+        related = similarity_service.get_related(problem_id, limit=limit)
+        return {"problem_id": problem_id, "related": related}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取相似题目失败: {str(e)}")
+
+
+@router.post("/related/rebuild")
+async def rebuild_related_index():
+    """重建相似题目索引"""
+    try:
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(None, similarity_service.rebuild)
+        return {"success": True, "result": result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"重建相似题目索引失败: {str(e)}")
+
+
+@router.post("/problems/reclassify")
+async def reclassify_problems():
+    """按标签分类表重新分类整个题库"""
+    try:
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(None, tag_service.reclassify_all)
+        return {"success": True, "result": result, "categories": tag_service.get_category_counts()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"重新分类失败: {str(e)}")
+
+
 @router.post("/sync")
 async def sync_problems_from_leetcode(
-    background_tasks: BackgroundTasks,
     max_problems: Optional[int] = Query(None),
-    batch_size: int = Query(50, ge=1, le=100)
+    batch_size: int = Query(50, ge=1, le=100),
+    resume: bool = Query(True),
+    mode: str = Query("full")
 ):
-    """从LeetCode同步题目数据"""
+    """从LeetCode同步题目数据；mode 为 full（全量）或 delta（增量）。已有同步任务在运行时返回该任务"""
     try:
-        background_tasks.add_task(_sync_problems_task, max_problems=max_problems, batch_size=batch_size)
-        return {"success": True, "message": "题目同步任务已启动，请稍后查看同步结果"}
+        if mode not in SYNC_MODES:
+            raise HTTPException(status_code=400, detail=f"不支持的同步模式: {mode}")
+        job = sync_job_manager.submit(
+            "problems", {"max_problems": max_problems, "batch_size": batch_size, "resume": resume, "mode": mode}
+        )
+        message = "已有题目同步任务在运行" if job["deduplicated"] else "题目同步任务已启动"
+        return {"success": True, "message": message, "job": job}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"启动同步任务失败: {str(e)}")
 
 
-async def _sync_problems_task(max_problems: Optional[int] = None, batch_size: int = 50):
-    """后台同步任务"""
+@router.post("/sync/details")
+async def sync_problem_details(
+    only_missing: bool = Query(True),
+    limit: Optional[int] = Query(None, ge=1),
+    batch_size: int = Query(10, ge=1, le=50)
+):
+    """批量同步题目详情（内容、提示、示例用例）"""
+    try:
+        job = sync_job_manager.submit(
+            "details", {"only_missing": only_missing, "limit": limit, "batch_size": batch_size}
+        )
+        message = "已有题目详情同步任务在运行" if job["deduplicated"] else "题目详情同步任务已启动"
+        return {"success": True, "message": message, "job": job}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"启动详情同步任务失败: {str(e)}")
+
+
+@router.get("/sync/jobs")
+async def get_sync_jobs(limit: int = Query(20, ge=1, le=100)):
+    """获取最近的同步任务与定时同步配置"""
+    try:
+        return {"jobs": sync_job_manager.list_jobs(limit), "schedule": sync_job_manager.get_schedule()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取同步任务失败: {str(e)}")
+
+
+@router.get("/sync/watermark")
+async def get_sync_watermark():
+    """获取增量同步水位与最近一次同步报告"""
+    try:
+        watermark = sync_service.get_watermark()
+        if not watermark:
+            raise HTTPException(status_code=404, detail="暂无同步记录")
+        return watermark
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取同步水位失败: {str(e)}")
+
+
+@router.get("/sync/checkpoint")
+async def get_sync_checkpoint():
+    """获取题目同步断点"""
     try:
-        async with CrawlerService() as crawler:
-            result = await crawler.batch_fetch_problems(batch_size=batch_size, max_problems=max_problems)
-            if result["success"]:
-                sync_result = leetcode_service.sync_problems_from_crawler(result["problems"])
-                print(f"同步完成: 创建 {sync_result['created']} 题，更新 {sync_result['updated']} 题")
-            else:
-                print(f"同步失败: {result['error']}")
+        checkpoint = sync_service.get_checkpoint()
+        if not checkpoint:
+            raise HTTPException(status_code=404, detail="暂无同步记录")
+        return checkpoint
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取同步断点失败: {str(e)}")
+
+
+@router.get("/sync/{job_id}")
+async def get_sync_job(job_id: int):
+    """获取同步任务状态、进度（已完成页数、写入行数）与预计剩余时间"""
+    try:
+        job = sync_job_manager.get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="同步任务不存在")
+        return job
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取同步任务失败: {str(e)}")
+
+
+@router.post("/sync/{job_id}/cancel")
+async def cancel_sync_job(job_id: int):
+    """取消同步任务；已写入的题目和断点保留，下次同步从断点继续"""
+    try:
+        job = sync_job_manager.cancel(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="同步任务不存在")
+        return {"success": True, "job": job}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"同步任务异常: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"取消同步任务失败: {str(e)}")
+
+
+@router.post("/import")
+async def import_problem_catalog(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Form(None),
+    batch_size: int = Form(500)
+):
+    """从 JSON Lines / CSV 导出文件批量导入题目"""
+    try:
+        if not file_format:
+            try:
+                file_format = detect_format(file.filename or "")
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        if file_format not in ("jsonl", "csv"):
+            raise HTTPException(status_code=400, detail=f"不支持的导入格式: {file_format}")
+
+        importer = CatalogImporter(batch_size=max(1, min(batch_size, 5000)))
+        loop = asyncio.get_event_loop()
+        stats = await loop.run_in_executor(
+            None, importer.import_stream, open_text_stream(file.file), file_format
+        )
+        if stats["created"] or stats["updated"]:
+            await loop.run_in_executor(None, similarity_service.rebuild)
+        return {"success": True, "result": stats}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"导入题库失败: {str(e)}")
 
 
 @router.get("/statistics")
@@ -106,10 +283,10 @@ async def get_daily_challenge():
 
 
 @router.get("/recommendations")
-async def get_recommended_problems(count: int = Query(5, ge=1, le=20)):
+async def get_recommended_problems(count: int = Query(5, ge=1, le=20), category: Optional[str] = None):
     """获取推荐题目"""
     try:
-        problems = leetcode_service.get_recommended_problems(count)
+        problems = leetcode_service.get_recommended_problems(count, category=category)
         return {"problems": problems}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取推荐题目失败: {str(e)}")
@@ -143,6 +320,61 @@ async def get_submissions(
         raise HTTPException(status_code=500, detail=f"获取提交记录失败: {str(e)}")
 
 
+@router.post("/run", dependencies=[Depends(require_local_sandbox)])
+async def run_code(run_data: dict):
+    """在本地沙箱中运行代码并返回每个测试用例的结果、运行时间与内存"""
+    try:
+        return await code_run_service.run(run_data)
+    except RunQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"运行代码失败: {str(e)}")
+
+
+@router.get("/run/stats")
+async def get_run_statistics():
+    """获取代码运行队列与进程池统计"""
+    try:
+        return code_run_service.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取运行统计失败: {str(e)}")
+
+
+@router.post("/submissions/{submission_id}/benchmark", dependencies=[Depends(require_local_sandbox)])
+async def benchmark_submission(submission_id: int, method: Optional[str] = None):
+    """在递增规模的生成输入上实测 Python 提交的运行时间与内存，拟合复杂度"""
+    try:
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(
+            None, benchmark_service.benchmark_submission, submission_id, method
+        )
+        if result is None:
+            raise HTTPException(status_code=404, detail="提交记录不存在")
+        return result
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"基准测试失败: {str(e)}")
+
+
+@router.get("/submissions/{submission_id}/benchmark")
+async def get_submission_benchmark(submission_id: int):
+    """获取提交最近一次的基准测试结果"""
+    try:
+        result = benchmark_service.get_latest_benchmark(submission_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="该提交还没有基准测试结果")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取基准测试结果失败: {str(e)}")
+
+
 @router.get("/search")
 async def search_problems(
     keyword: str = Query(..., description="搜索关键词"),
@@ -160,13 +392,161 @@ async def search_problems(
         raise HTTPException(status_code=500, detail=f"搜索题目失败: {str(e)}")
 
 
+@router.get("/lists")
+async def get_problem_lists(with_progress: bool = True):
+    """获取题单列表"""
+    try:
+        lists = leetcode_service.get_problem_lists(with_progress=with_progress)
+        return {"lists": lists, "total": len(lists)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取题单列表失败: {str(e)}")
+
+
+@router.post("/lists")
+async def create_problem_list(list_data: dict):
+    """创建题单"""
+    try:
+        return leetcode_service.create_problem_list(list_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"创建题单失败: {str(e)}")
+
+
+@router.get("/lists/progress")
+async def get_problem_lists_progress():
+    """获取所有题单的完成进度"""
+    try:
+        progress = leetcode_service.get_problem_lists_progress()
+        return {"progress": progress}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取题单进度失败: {str(e)}")
+
+
+@router.get("/lists/{list_id}")
+async def get_problem_list(list_id: int, include_problems: bool = True):
+    """获取题单详情"""
+    try:
+        problem_list = leetcode_service.get_problem_list(list_id, include_problems=include_problems)
+        if not problem_list:
+            raise HTTPException(status_code=404, detail="题单不存在")
+        return problem_list
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取题单详情失败: {str(e)}")
+
+
+@router.put("/lists/{list_id}")
+async def update_problem_list(list_id: int, list_data: dict):
+    """更新题单"""
+    try:
+        problem_list = leetcode_service.update_problem_list(list_id, list_data)
+        if not problem_list:
+            raise HTTPException(status_code=404, detail="题单不存在")
+        return problem_list
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"更新题单失败: {str(e)}")
+
+
+@router.delete("/lists/{list_id}")
+async def delete_problem_list(list_id: int):
+    """删除题单"""
+    try:
+        if not leetcode_service.delete_problem_list(list_id):
+            raise HTTPException(status_code=404, detail="题单不存在")
+        return {"message": "题单删除成功"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"删除题单失败: {str(e)}")
+
+
+@router.post("/study-plans")
+async def generate_study_plan(plan_data: dict):
+    """生成学习计划"""
+    try:
+        target_date = date.fromisoformat(plan_data["target_date"])
+        return study_plan_service.generate_plan(
+            target_date=target_date,
+            daily_minutes=int(plan_data.get("daily_minutes", 60)),
+            weak_categories=plan_data.get("weak_categories") or [],
+            name=plan_data.get("name")
+        )
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"学习计划参数错误: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"生成学习计划失败: {str(e)}")
+
+
+@router.get("/study-plans")
+async def get_study_plans():
+    """获取学习计划列表"""
+    try:
+        plans = study_plan_service.list_plans()
+        return {"plans": plans, "total": len(plans)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取学习计划失败: {str(e)}")
+
+
+@router.get("/study-plans/{plan_id}")
+async def get_study_plan(plan_id: int, include_days: bool = True):
+    """获取学习计划详情"""
+    try:
+        plan = study_plan_service.get_plan(plan_id, include_days=include_days)
+        if not plan:
+            raise HTTPException(status_code=404, detail="学习计划不存在")
+        return plan
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取学习计划失败: {str(e)}")
+
+
+@router.get("/study-plans/{plan_id}/days/{day}")
+async def get_study_plan_day(plan_id: int, day: str):
+    """获取学习计划某一天的任务（day 为 YYYY-MM-DD 或 today）"""
+    try:
+        target_day = datetime.now().date() if day == "today" else date.fromisoformat(day)
+        plan_day = study_plan_service.get_day(plan_id, target_day)
+        if plan_day is None:
+            raise HTTPException(status_code=404, detail="学习计划不存在")
+        return plan_day
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"日期格式错误: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取当日任务失败: {str(e)}")
+
+
+@router.post("/study-plans/{plan_id}/replan")
+async def replan_study_plan(plan_id: int, daily_minutes: Optional[int] = Query(None, ge=10)):
+    """从偏离点开始重排学习计划"""
+    try:
+        result = study_plan_service.replan(plan_id, daily_minutes=daily_minutes)
+        if result is None:
+            raise HTTPException(status_code=404, detail="学习计划不存在")
+        return result
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"重排学习计划失败: {str(e)}")
+
+
 @router.get("/crawler/health")
 async def crawler_health_check():
     """爬虫健康检查"""
     try:
-        async with CrawlerService() as crawler:
-            result = await crawler.health_check()
-            return result
+        # 复用共享爬虫的连接池，不为每次探测新建会话
+        crawler = await get_shared_crawler()
+        return await crawler.health_check()
     except Exception as e:
         return {"status": "unavailable", "message": str(e)}
 
@@ -175,8 +555,7 @@ async def crawler_health_check():
 async def get_crawler_statistics():
     """获取爬虫统计信息"""
     try:
-        crawler = CrawlerService()
-        stats = crawler.get_crawler_statistics()
-        return stats
+        crawler = await get_shared_crawler()
+        return crawler.get_crawler_statistics()
     except Exception as e:
         return {"status": "unavailable", "message": str(e)}
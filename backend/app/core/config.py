@@ -31,6 +31,8 @@ class Settings:
         self.UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./data/uploads")
         self.TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", "./data/templates")
         self.USER_DATA_DIR = os.getenv("USER_DATA_DIR", "./data/user_data")
+        # 请求体大小上限（按 Content-Length 在解析表单前拒绝）：50MB 录音加表单字段的余量，与 nginx 的 client_max_body_size 保持一致
+        self.MAX_REQUEST_BODY_MB = int(os.getenv("MAX_REQUEST_BODY_MB", "51"))
         
         # 安全配置
         self.SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
@@ -39,6 +41,23 @@ class Settings:
         # 爬虫配置
         self.LEETCODE_BASE_URL = os.getenv("LEETCODE_BASE_URL", "https://leetcode.com")
         self.CRAWLER_DELAY = float(os.getenv("CRAWLER_DELAY", "1.0"))
+        self.CRAWLER_RATE_LIMIT = float(os.getenv("CRAWLER_RATE_LIMIT", "5.0"))  # 每秒请求数
+        self.CRAWLER_CONCURRENCY = int(os.getenv("CRAWLER_CONCURRENCY", "5"))
+        self.CRAWLER_MAX_CONCURRENCY = int(os.getenv("CRAWLER_MAX_CONCURRENCY", "20"))  # 自适应并发上限
+        self.CRAWLER_CACHE_PATH = os.getenv("CRAWLER_CACHE_PATH", "./data/crawler_cache.db")
+        self.CRAWLER_CACHE_MAX_MB = int(os.getenv("CRAWLER_CACHE_MAX_MB", "64"))
+        # 定时同步的 cron 表达式，默认不启用；如 SYNC_SCHEDULE="0 4 * * *" 为每天 4 点增量同步
+        self.SYNC_SCHEDULE = os.getenv("SYNC_SCHEDULE", "")
+        self.SYNC_SCHEDULE_MODE = os.getenv("SYNC_SCHEDULE_MODE", "delta")
+        self.ITEM_CALIBRATION_SCHEDULE = os.getenv("ITEM_CALIBRATION_SCHEDULE", "30 4 * * *")  # 面试题 IRT 标定的 cron 表达式，留空不启用
+
+        # 代码执行沙箱配置
+        # 运行代码 / 基准测试接口会执行提交的 Python 代码，默认关闭；开启后也只接受本机直接访问（不经反向代理）
+        self.SANDBOX_ENABLED = os.getenv("SANDBOX_ENABLED", "false").lower() in ("1", "true", "yes")
+        self.SANDBOX_USER = os.getenv("SANDBOX_USER", "nobody")  # 以 root 运行时工作进程降权到该用户
+        self.SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "256"))
+        self.SANDBOX_TIMEOUT = float(os.getenv("SANDBOX_TIMEOUT", "5.0"))
         
         # 语音处理配置
         self.AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", "16000"))
@@ -29,8 +29,12 @@ class Base(DeclarativeBase):
 def init_db():
     """初始化数据库，创建所有表"""
     # 导入所有模型以确保表被创建
-    from app.models import resume, problem, interview
+    from app.models import (
+        resume, problem, interview, problem_list, problem_similarity, study_plan, benchmark, sync, problem_content,
+        problem_tag_label, interview_index, adaptive_session, knowledge_mastery
+    )
     Base.metadata.create_all(bind=engine)
+    interview_index.ensure_indexes(engine)
 
 def get_db() -> Session:
     """获取数据库会话的依赖注入函数"""
@@ -0,0 +1,39 @@
+"""
+自适应模拟面试数据模型
+InterviewItemParam 保存由历史答题记录标定的题目 2PL 参数（区分度 a、难度 b）；
+AdaptiveSession 保存一场自适应模拟面试的能力估计与出题进度
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime
+
+from ..core.database import Base
+
+
+class InterviewItemParam(Base):
+    """面试题的 IRT 参数"""
+    __tablename__ = "interview_item_params"
+
+    question_id = Column(Integer, primary_key=True)  # InterviewQuestion.id
+    discrimination = Column(Float, nullable=False)  # a
+    difficulty = Column(Float, nullable=False)  # b，与能力同一量纲
+    responses = Column(Integer, default=0)  # 参与标定的答题数
+    calibrated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AdaptiveSession(Base):
+    """自适应模拟面试"""
+    __tablename__ = "adaptive_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), default="active")  # active / finished
+    category = Column(String(50))  # 只从该分类出题，为空不限
+    max_questions = Column(Integer, nullable=False)
+    answered = Column(Integer, default=0)
+    ability = Column(Float, default=0.0)  # 能力估计 θ（正态近似的均值）
+    ability_precision = Column(Float, default=1.0)  # 正态近似的精度（方差的倒数）
+    asked_ids = Column(Text, default="[]")  # JSON，已出过的题目 ID，按出题顺序
+    current_question_id = Column(Integer)  # InterviewQuestion.id，等待作答的题目
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime)
@@ -0,0 +1,29 @@
+"""
+提交代码基准测试数据模型
+在递增规模的生成输入上实测运行时间与内存，拟合出的复杂度类别与原始数据一并保存
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime
+
+from ..core.database import Base
+
+
+class SubmissionBenchmark(Base):
+    """提交代码的实测复杂度"""
+    __tablename__ = "submission_benchmarks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    submission_id = Column(Integer, nullable=False, index=True)  # ProblemSubmission.id
+    problem_id = Column(Integer, index=True)  # LeetCodeProblem.id
+    entry_point = Column(String(100))
+    status = Column(String(30), nullable=False)  # completed / insufficient_data / failed
+    time_complexity = Column(String(20))
+    space_complexity = Column(String(20))
+    time_fit = Column(Text)  # JSON: 各复杂度类别的拟合误差
+    space_fit = Column(Text)  # JSON
+    measurements = Column(Text)  # JSON: [{n, seconds, peak_alloc_bytes, peak_rss_kb}]
+    max_size = Column(Integer)
+    total_seconds = Column(Float)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,23 @@
+"""
+面试答题记录的补充索引
+最近答题只读 (created_at, question_id, quality_score)，覆盖索引倒序扫描取前 N 条即可，不回表；
+按分类聚合得分时经 (question_id, quality_score) 索引与题目表连接，同样只读索引
+"""
+
+from sqlalchemy import Index
+
+from .interview import VoiceAnswer
+
+VOICE_ANSWER_INDEXES = [
+    Index(
+        "ix_voice_answers_created_question_score",
+        VoiceAnswer.created_at, VoiceAnswer.question_id, VoiceAnswer.quality_score,
+    ),
+    Index("ix_voice_answers_question_score", VoiceAnswer.question_id, VoiceAnswer.quality_score),
+]
+
+
+def ensure_indexes(bind):
+    """create_all 不会给已存在的表补建索引，启动时逐个检查创建"""
+    for index in VOICE_ANSWER_INDEXES:
+        index.create(bind=bind, checkfirst=True)
@@ -0,0 +1,23 @@
+"""
+知识点掌握度数据模型
+每个标签一行，保存贝叶斯知识追踪（BKT）的当前掌握概率；刷题提交与面试答题到达时增量更新，读取即查表
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, DateTime
+
+from ..core.database import Base
+
+
+class KnowledgeMastery(Base):
+    """标签掌握度"""
+    __tablename__ = "knowledge_mastery"
+
+    tag = Column(String(100), primary_key=True)  # LeetCode 标签 slug 或面试题标签名
+    mastery = Column(Float, nullable=False)  # P(已掌握)
+    observations = Column(Integer, default=0)
+    correct = Column(Integer, default=0)
+    leetcode_observations = Column(Integer, default=0)
+    interview_observations = Column(Integer, default=0)
+    last_event_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,22 @@
+"""
+题目内容数据模型
+题目 HTML 在入库时转换一次，Markdown 与纯文本两种形式都保存，读取时直接返回
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime
+
+from ..core.database import Base
+
+
+class ProblemContent(Base):
+    """题目内容的规范化结果"""
+    __tablename__ = "problem_contents"
+
+    problem_id = Column(Integer, primary_key=True)  # LeetCodeProblem.id
+    source_html = Column(Text)  # 原始 HTML，规范化规则升级后据此重新转换
+    source_hash = Column(String(40), nullable=False)  # 原始 HTML 的 sha1，内容未变时跳过转换
+    markdown = Column(Text)
+    text = Column(Text)
+    normalizer_version = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,24 @@
+"""
+题单数据模型
+题单（如热题100、面试经典150、公司题库）以压缩位图形式保存题目集合
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, LargeBinary, DateTime
+
+from ..core.database import Base
+
+
+class ProblemList(Base):
+    """题单"""
+    __tablename__ = "problem_lists"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False, index=True)
+    description = Column(Text)
+    source = Column(String(50), default="custom")  # builtin / company / custom
+    # 题目ID（LeetCodeProblem.id）位图，见 app.utils.bitmap
+    bitmap = Column(LargeBinary, nullable=False, default=b"")
+    problem_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,20 @@
+"""
+相似题目数据模型
+预计算的题目近邻表，每道题保存按相似度排序的前K个相关题目
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, DateTime
+
+from ..core.database import Base
+
+
+class ProblemSimilarity(Base):
+    """题目近邻（主键 problem_id + rank，按题目查询为一次索引读取）"""
+    __tablename__ = "problem_similarities"
+
+    problem_id = Column(Integer, primary_key=True)  # LeetCodeProblem.id
+    rank = Column(Integer, primary_key=True)
+    related_id = Column(Integer, nullable=False)  # LeetCodeProblem.id
+    score = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
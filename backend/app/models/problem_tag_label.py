@@ -0,0 +1,22 @@
+"""
+题目分类标签数据模型
+标签分类表得出的多分类结果，每个分类一行并保存权重，按分类筛选题目时走 (category, weight) 索引
+"""
+
+from sqlalchemy import Column, Integer, String, Float, Boolean, Index
+
+from ..core.database import Base
+
+
+class ProblemTagLabel(Base):
+    """题目的分类及权重（主键 problem_id + category）"""
+    __tablename__ = "problem_tag_labels"
+
+    problem_id = Column(Integer, primary_key=True)  # LeetCodeProblem.id
+    category = Column(String(20), primary_key=True)  # ProblemCategory 的值
+    weight = Column(Float, nullable=False)
+    is_primary = Column(Boolean, default=False)  # 是否为写入 LeetCodeProblem.category 的主分类
+
+    __table_args__ = (
+        Index("ix_problem_tag_labels_category_weight", "category", "weight"),
+    )
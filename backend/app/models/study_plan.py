@@ -0,0 +1,39 @@
+"""
+学习计划排期数据模型
+StudyPlan 的生成参数与按天物化的排期，按 (plan_id, day_index) 主键直接读取某一天的任务
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime
+
+from ..core.database import Base
+
+
+class StudyPlanSchedule(Base):
+    """学习计划生成参数"""
+    __tablename__ = "study_plan_schedules"
+
+    plan_id = Column(Integer, primary_key=True)  # StudyPlan.id
+    start_date = Column(Date, nullable=False)
+    target_date = Column(Date, nullable=False)
+    daily_minutes = Column(Integer, nullable=False)
+    weak_categories = Column(Text)  # JSON数组
+    category_order = Column(Text)  # JSON数组，课程拓扑序
+    total_days = Column(Integer, default=0)
+    revision = Column(Integer, default=1)
+    replanned_from = Column(Integer)  # 最近一次重排的起始 day_index
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class StudyPlanDay(Base):
+    """学习计划的单日任务"""
+    __tablename__ = "study_plan_days"
+
+    plan_id = Column(Integer, primary_key=True)  # StudyPlan.id
+    day_index = Column(Integer, primary_key=True)  # 距 start_date 的天数
+    plan_date = Column(Date, nullable=False)
+    problem_ids = Column(Text, nullable=False, default="[]")  # JSON数组，LeetCodeProblem.id
+    categories = Column(String(200))
+    estimated_minutes = Column(Integer, default=0)
+    revision = Column(Integer, default=1)
@@ -0,0 +1,73 @@
+"""
+题库同步数据模型
+SyncCheckpoint 记录分页同步已提交到数据库的偏移量，同步中断后从该位置继续；
+SyncWatermark 与 ProblemSyncHash 记录已同步到的位置和每道题的内容哈希，供增量同步判断新题和变更；
+SyncJob 记录每次同步任务的状态与进度
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime
+
+from ..core.database import Base
+
+
+class SyncCheckpoint(Base):
+    """同步断点"""
+    __tablename__ = "sync_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), unique=True, nullable=False)  # 同步任务名，如 problems
+    status = Column(String(20), default="running")  # running / completed / failed / cancelled
+    batch_size = Column(Integer, nullable=False)
+    max_problems = Column(Integer)
+    committed_offset = Column(Integer, default=0)  # 该偏移量之前的题目已写入数据库
+    pages_committed = Column(Integer, default=0)
+    rows_created = Column(Integer, default=0)
+    rows_updated = Column(Integer, default=0)
+    error = Column(Text)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime)
+
+
+class SyncWatermark(Base):
+    """增量同步水位"""
+    __tablename__ = "sync_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    max_leetcode_id = Column(Integer, default=0)  # 已同步的最大题号
+    known_total = Column(Integer, default=0)  # 题目列表中已同步的前缀长度
+    rotation_offset = Column(Integer, default=0)  # 下次增量同步抽查的起始偏移量
+    last_mode = Column(String(10))
+    last_report = Column(Text)  # JSON，最近一次同步的页数、流量与变更行数
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ProblemSyncHash(Base):
+    """题目内容哈希，未变化的题目不再写库"""
+    __tablename__ = "problem_sync_hashes"
+
+    leetcode_id = Column(Integer, primary_key=True)  # LeetCodeProblem.leetcode_id
+    content_hash = Column(String(40), nullable=False)
+    synced_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SyncJob(Base):
+    """同步任务"""
+    __tablename__ = "sync_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False, index=True)  # problems / details
+    params = Column(Text)  # JSON，提交时的同步参数
+    trigger = Column(String(20), default="manual")  # manual / schedule
+    status = Column(String(20), default="queued", index=True)  # queued / running / completed / failed / cancelled
+    pages_done = Column(Integer, default=0)
+    pages_total = Column(Integer)
+    rows_upserted = Column(Integer, default=0)
+    rows_unchanged = Column(Integer, default=0)
+    result = Column(Text)  # JSON，同步报告
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -7,11 +7,39 @@ from .leetcode_service import LeetCodeService
 from .ai_service import AIService
 from .voice_service import VoiceService
 from .crawler_service import CrawlerService
+from .similarity_service import ProblemSimilarityService
+from .study_plan_service import StudyPlanService
+from .benchmark_service import SubmissionBenchmarkService
+from .code_run_service import CodeRunService
+from .sync_service import ProblemSyncService
+from .sync_job_service import SyncJobManager
+from .content_service import ProblemContentService
+from .tag_label_service import ProblemTagService
+from .answer_scoring_service import AnswerScoringService
+from .reference_similarity_service import ReferenceAnswerIndex
+from .question_search_service import QuestionSearchIndex
+from .item_bank_service import ItemBankService
+from .adaptive_session_service import AdaptiveSessionService
+from .knowledge_tracing_service import KnowledgeTracingService
 
 __all__ = [
     "ResumeService",
     "LeetCodeService",
     "AIService",
     "VoiceService",
-    "CrawlerService"
+    "CrawlerService",
+    "ProblemSimilarityService",
+    "StudyPlanService",
+    "SubmissionBenchmarkService",
+    "CodeRunService",
+    "ProblemSyncService",
+    "SyncJobManager",
+    "ProblemContentService",
+    "ProblemTagService",
+    "AnswerScoringService",
+    "ReferenceAnswerIndex",
+    "QuestionSearchIndex",
+    "ItemBankService",
+    "AdaptiveSessionService",
+    "KnowledgeTracingService"
 ]
\ No newline at end of file
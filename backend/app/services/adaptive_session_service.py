@@ -0,0 +1,167 @@
+"""
+自适应模拟面试
+能力 θ 以正态近似（均值, 精度）保存在会话中，每答一题按 2PL 做一次 O(1) 的牛顿更新；
+下一题取当前能力处信息量最大的未出过的题目。出题后即在后台线程按「答对 / 答错」两种结果各选好下一题，
+作答提交时直接取用，选题不占用答题请求的时间。答满题数或能力标准误足够小时结束
+"""
+
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models.interview import InterviewQuestion, VoiceAnswer
+from ..models.adaptive_session import AdaptiveSession
+from ..utils.irt import update_ability
+from .answer_scoring_service import AnswerScoringService, quality_level
+from .item_bank_service import ItemBankService, PASS_SCORE
+from .knowledge_tracing_service import KnowledgeTracingService
+
+# 单场题数上限
+MAX_SESSION_QUESTIONS = 50
+# 能力标准误低于该值时提前结束
+STOP_STANDARD_ERROR = 0.3
+# 预选结果的保留上限与有效期（秒），中途放弃的会话不会一直占用内存
+MAX_PREFETCHED = 1000
+PREFETCH_TTL = 30 * 60
+
+
+class AdaptiveSessionService:
+    """自适应模拟面试会话"""
+
+    def __init__(self, item_bank: ItemBankService, scoring_service: AnswerScoringService,
+                 knowledge_service: Optional[KnowledgeTracingService] = None):
+        self.item_bank = item_bank
+        self.scoring_service = scoring_service
+        self.knowledge_service = knowledge_service or KnowledgeTracingService()
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="adaptive-prefetch")
+        # 会话 ID -> ((当前题目 ID, 已答题数), {答对与否: 下一题 ID}, 预选时间)，按预选时间先后排列
+        self._prefetched: "OrderedDict[int, Tuple[Tuple[int, int], Future, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+
+    def create(self, db: Session, max_questions: int = 10, category: Optional[str] = None) -> AdaptiveSession:
+        """新建会话并出第一题（能力先验 N(0, 1)，第一题为中等难度附近信息量最大的题）"""
+        first = self.item_bank.select(0.0, (), category)
+        if first is None:
+            raise ValueError("没有可出的题目")
+        session = AdaptiveSession(
+            status="active", category=category, max_questions=max_questions, answered=0,
+            ability=0.0, ability_precision=1.0, asked_ids=json.dumps([first]), current_question_id=first,
+        )
+        db.add(session)
+        db.commit()
+        self._prefetch(session)
+        return session
+
+    def answer(self, db: Session, session: AdaptiveSession, answer_text: str) -> Dict[str, Any]:
+        """为当前题目的回答评分、记录答题并更新能力，随后出下一题或结束会话"""
+        question_id = session.current_question_id
+        question = db.query(InterviewQuestion).filter(InterviewQuestion.id == question_id).first()
+        analysis = self.scoring_service.analyze(question, answer_text)
+        overall_score = analysis["overall_score"]
+        correct = overall_score >= PASS_SCORE
+
+        a, b = self.item_bank.params(question_id)
+        session.ability, session.ability_precision = update_ability(
+            session.ability, session.ability_precision, a, b, 1.0 if correct else 0.0
+        )
+        session.answered += 1
+        db.add(VoiceAnswer(
+            question_id=question_id,
+            transcribed_text=answer_text,
+            quality_score=overall_score,
+            quality_level=quality_level(overall_score),
+            feedback=analysis["detailed_feedback"],
+        ))
+        self.knowledge_service.observe_answer(db, question, overall_score)
+
+        asked = json.loads(session.asked_ids or "[]")
+        next_id = None
+        if session.answered < session.max_questions and self.standard_error(session) >= STOP_STANDARD_ERROR:
+            next_id = self._take_prefetched(session.id, (question_id, session.answered - 1), correct)
+            if next_id is None or next_id in asked:
+                next_id = self.item_bank.select(session.ability, asked, session.category)
+        if next_id is None:
+            self.discard(session.id)
+            session.status = "finished"
+            session.current_question_id = None
+            session.finished_at = datetime.utcnow()
+        else:
+            asked.append(next_id)
+            session.asked_ids = json.dumps(asked)
+            session.current_question_id = next_id
+        db.commit()
+        if next_id is not None:
+            self._prefetch(session)
+
+        return {"question_id": question_id, "correct": correct, "analysis": analysis}
+
+    def discard(self, session_id: int):
+        with self._lock:
+            self._prefetched.pop(session_id, None)
+
+    @staticmethod
+    def standard_error(session: AdaptiveSession) -> float:
+        return round(session.ability_precision ** -0.5, 4)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._prefetched)
+        return {"prefetch_hits": self.prefetch_hits, "prefetch_misses": self.prefetch_misses, "prefetch_pending": pending}
+
+    def _prefetch(self, session: AdaptiveSession):
+        """在后台按当前题答对 / 答错两种结果分别选好下一题"""
+        if session.answered + 1 >= session.max_questions:
+            return
+        key = (session.current_question_id, session.answered)
+        args = (
+            session.current_question_id, session.ability, session.ability_precision,
+            json.loads(session.asked_ids or "[]"), session.category,
+        )
+        future = self._executor.submit(self._select_both, *args)
+        now = time.monotonic()
+        with self._lock:
+            self._prefetched.pop(session.id, None)
+            self._prefetched[session.id] = (key, future, now)
+            while self._prefetched:
+                _, stale, prefetched_at = next(iter(self._prefetched.values()))
+                if len(self._prefetched) <= MAX_PREFETCHED and now - prefetched_at <= PREFETCH_TTL:
+                    break
+                stale.cancel()
+                self._prefetched.popitem(last=False)
+
+    def _select_both(self, question_id: int, ability: float, precision: float,
+                     asked: List[int], category: Optional[str]) -> Dict[bool, Optional[int]]:
+        a, b = self.item_bank.params(question_id)
+        choices = {}
+        for correct in (True, False):
+            mean, _ = update_ability(ability, precision, a, b, 1.0 if correct else 0.0)
+            choices[correct] = self.item_bank.select(mean, asked, category)
+        return choices
+
+    def _take_prefetched(self, session_id: int, key: Tuple[int, int], correct: bool) -> Optional[int]:
+        with self._lock:
+            entry = self._prefetched.pop(session_id, None)
+        # 预选还没算完时不等待（answer 在事件循环中同步调用），由调用方直接选题
+        if entry is None or entry[0] != key or not entry[1].done():
+            if entry is not None:
+                entry[1].cancel()
+            self.prefetch_misses += 1
+            return None
+        try:
+            choice = entry[1].result()[correct]
+        except Exception as e:
+            self.logger.warning(f"预选下一题失败: {str(e)}")
+            self.prefetch_misses += 1
+            return None
+        self.prefetch_hits += 1
+        return choice
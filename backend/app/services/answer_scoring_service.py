@@ -0,0 +1,154 @@
+"""
+面试回答评分服务
+每道题的要点匹配器只编译一次并放入 LRU 缓存，题目编辑后失效；评分时对回答单次扫描得到命中的要点及位置。
+回答与参考答案的 BM25 覆盖度计入内容分与准确度分
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from ..models.interview import InterviewQuestion
+from ..utils.keypoint_matcher import KeyPointMatcher, parse_list_field
+from .reference_similarity_service import ReferenceAnswerIndex
+
+# 缓存的题目匹配器数量上限
+MATCHER_CACHE_SIZE = 512
+
+
+class AnswerScoringService:
+    """面试回答评分"""
+
+    def __init__(self, cache_size: int = MATCHER_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._matchers: "OrderedDict[int, Tuple[str, KeyPointMatcher]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.reference_index = ReferenceAnswerIndex()
+
+    def get_matcher(self, question: Optional[InterviewQuestion]) -> KeyPointMatcher:
+        """获取题目的要点匹配器；要点内容与缓存时不同（题目被改过）时重新编译"""
+        if question is None:
+            return KeyPointMatcher([])
+        raw = question.key_points
+        fingerprint = raw if isinstance(raw, str) else json.dumps(raw, ensure_ascii=False, sort_keys=True)
+        with self._lock:
+            cached = self._matchers.get(question.id)
+            if cached is not None and cached[0] == fingerprint:
+                self._matchers.move_to_end(question.id)
+                self.cache_hits += 1
+                return cached[1]
+        matcher = KeyPointMatcher(parse_list_field(raw))
+        with self._lock:
+            self.cache_misses += 1
+            self._matchers[question.id] = (fingerprint, matcher)
+            self._matchers.move_to_end(question.id)
+            while len(self._matchers) > self.cache_size:
+                self._matchers.popitem(last=False)
+        return matcher
+
+    def invalidate(self, question_id: int):
+        """题目编辑后丢弃其匹配器"""
+        with self._lock:
+            self._matchers.pop(question_id, None)
+
+    def question_changed(self, question: InterviewQuestion):
+        """题目编辑后调用：要点匹配器失效，参考答案向量只重算这一道题"""
+        self.invalidate(question.id)
+        self.reference_index.update(question.id, question.reference_answer)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._matchers),
+                "capacity": self.cache_size,
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "reference_index": self.reference_index.get_stats(),
+            }
+
+    def analyze(self, question: Optional[InterviewQuestion], answer_text: str) -> Dict[str, Any]:
+        """对一条回答评分，返回各项得分、反馈与要点覆盖情况"""
+        similarity = self.reference_index.score(question, answer_text)
+        return self._analyze(question, answer_text, similarity)
+
+    def analyze_many(self, pairs: Sequence[Tuple[Optional[InterviewQuestion], str]]) -> List[Dict[str, Any]]:
+        """批量评分：参考答案覆盖度一次向量化算出，要点匹配器按题目复用，结果与输入顺序一致"""
+        similarities = self.reference_index.score_many(pairs)
+        return [
+            self._analyze(question, answer_text, similarity)
+            for (question, answer_text), similarity in zip(pairs, similarities)
+        ]
+
+    def _analyze(self, question: Optional[InterviewQuestion], answer_text: str, similarity: Optional[float]) -> Dict[str, Any]:
+        matcher = self.get_matcher(question)
+        matches = matcher.match(answer_text)
+        total_points = len(matcher.points)
+        matched_points = len(matches)
+
+        # 评分：回答长度、要点命中，以及与参考答案的覆盖度（没有参考答案的题目不计）
+        answer_len = len(answer_text)
+        base_score = min(60 + answer_len // 10, 95)
+        keyword_bonus = min(matched_points * 5, 20) if total_points else 10
+        content_bonus = accuracy_bonus = 0
+        if similarity is not None:
+            content_bonus = round(similarity * 20) - 5
+            accuracy_bonus = round(similarity * 30) - 10
+
+        content_score = max(min(base_score + keyword_bonus + content_bonus, 98), 0)
+        logic_score = min(base_score - 2 + keyword_bonus, 95)
+        accuracy_score = max(min(base_score + 5 + keyword_bonus + accuracy_bonus, 98), 0)
+        overall_score = round((content_score + logic_score + accuracy_score) / 3, 1)
+
+        # 生成反馈
+        strengths = []
+        improvements = []
+
+        if answer_len > 50:
+            strengths.append("回答内容较为详细")
+        if answer_len > 100:
+            strengths.append("对问题有较深入的理解")
+        if matched_points > 0:
+            strengths.append(f"涵盖了{matched_points}个关键要点")
+        if similarity is not None and similarity >= 0.5:
+            strengths.append("与参考答案的核心内容基本一致")
+
+        if answer_len < 50:
+            improvements.append("建议增加回答的详细程度")
+        if matched_points < total_points // 2 and total_points:
+            improvements.append("建议覆盖更多关键知识点")
+        if similarity is not None and similarity < 0.2:
+            improvements.append("与参考答案重合较少，建议对照参考答案补充核心概念")
+        improvements.append("可以通过举例来增强回答的说服力")
+
+        matched_names = {match.point for match in matches}
+        return {
+            "content_score": content_score,
+            "logic_score": logic_score,
+            "accuracy_score": accuracy_score,
+            "overall_score": overall_score,
+            "reference_similarity": similarity,
+            "strengths": strengths if strengths else ["回答涵盖了问题的主要方面"],
+            "improvements": improvements,
+            "detailed_feedback": f"整体评分 {overall_score} 分。" + (
+                f"回答中提及了{matched_points}个关键要点。" if total_points else ""
+            ) + (
+                f"对参考答案的覆盖度为 {similarity:.0%}。" if similarity is not None else ""
+            ) + "建议在表达时更加结构化，先概括后详述。",
+            "key_points_coverage": {
+                "total": total_points,
+                "matched": matched_points,
+                "matched_points": [
+                    {"point": match.point, "matched_by": match.matched_by, "spans": [list(span) for span in match.spans]}
+                    for match in matches
+                ],
+                "missed_points": [point for point in matcher.points if point not in matched_names],
+            },
+        }
+
+
+def quality_level(overall_score: float) -> str:
+    """回答质量等级"""
+    return "优秀" if overall_score >= 85 else "良好" if overall_score >= 70 else "一般"
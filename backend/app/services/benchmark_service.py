@@ -0,0 +1,227 @@
+"""
+提交代码基准测试服务
+在代码执行进程池（utils/sandbox.py，受资源限制与尽力而为的隔离，不是完整的安全边界）中
+以递增规模（n = 10 → 10^5）运行 Python 提交，测量耗时与内存并拟合复杂度类别；接口与运行代码一样默认关闭、只允许本机访问
+"""
+
+import json
+import time
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from ..models.problem import ProblemSubmission
+from ..models.benchmark import SubmissionBenchmark
+from ..core.database import get_db
+from ..utils.sandbox import SandboxPool, get_sandbox_pool
+
+
+BENCHMARK_SIZES = [10, 30, 100, 300, 1000, 3000, 10000, 30000, 100000]
+
+# 复杂度类别（由低到高），None 表示常数模型
+COMPLEXITY_CLASSES = [
+    ("O(1)", None),
+    ("O(log n)", lambda n: np.log2(n)),
+    ("O(n)", lambda n: n),
+    ("O(n log n)", lambda n: n * np.log2(n)),
+    ("O(n²)", lambda n: n ** 2),
+]
+
+MIN_FIT_POINTS = 4
+
+
+class SubmissionBenchmarkService:
+    """提交代码基准测试服务类"""
+
+    def __init__(
+        self,
+        pool: Optional[SandboxPool] = None,
+        sizes: Optional[List[int]] = None,
+        run_budget: float = 1.0,
+        total_budget: float = 15.0
+    ):
+        self.db = next(get_db())
+        self.pool = pool
+        self.sizes = sizes or BENCHMARK_SIZES
+        self.run_budget = run_budget
+        self.total_budget = total_budget
+        self.logger = logging.getLogger(__name__)
+        # 同时运行的基准测试会互相争抢CPU导致计时失真，因此串行执行
+        self._lock = threading.Lock()
+
+    def benchmark_submission(self, submission_id: int, method: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """对提交执行基准测试并保存结果；提交不存在时返回 None"""
+        with self._lock:
+            return self._benchmark_submission(submission_id, method)
+
+    def _benchmark_submission(self, submission_id: int, method: Optional[str]) -> Optional[Dict[str, Any]]:
+        submission = self.db.query(ProblemSubmission).filter(ProblemSubmission.id == submission_id).first()
+        if not submission:
+            return None
+        if (submission.language or "").lower() not in ("python", "python3"):
+            raise ValueError(f"仅支持 Python 提交的基准测试，当前语言: {submission.language}")
+        if not (submission.code or "").strip():
+            raise ValueError("提交代码为空")
+
+        result = self.run_benchmark(submission.code, method=method)
+
+        benchmark = SubmissionBenchmark(
+            submission_id=submission.id,
+            problem_id=submission.problem_id,
+            entry_point=method,
+            status=result["status"],
+            time_complexity=result["time_complexity"],
+            space_complexity=result["space_complexity"],
+            time_fit=json.dumps(result["time_fit"]),
+            space_fit=json.dumps(result["space_fit"]),
+            measurements=json.dumps(result["measurements"]),
+            max_size=result["max_size"],
+            total_seconds=result["total_seconds"],
+            error=result["error"],
+        )
+        self.db.add(benchmark)
+
+        # 用户未填写复杂度时用实测值补全，已填写的保持不变
+        if result["time_complexity"] and not submission.time_complexity:
+            submission.time_complexity = result["time_complexity"]
+        if result["space_complexity"] and not submission.space_complexity:
+            submission.space_complexity = result["space_complexity"]
+
+        self.db.commit()
+        self.db.refresh(benchmark)
+        return self._serialize(benchmark)
+
+    def get_latest_benchmark(self, submission_id: int) -> Optional[Dict[str, Any]]:
+        """获取提交最近一次的基准测试结果"""
+        benchmark = self.db.query(SubmissionBenchmark).filter(
+            SubmissionBenchmark.submission_id == submission_id
+        ).order_by(SubmissionBenchmark.id.desc()).first()
+        return self._serialize(benchmark) if benchmark else None
+
+    def run_benchmark(self, code: str, method: Optional[str] = None) -> Dict[str, Any]:
+        """按规模递增逐级测量；单次耗时超出预算或总耗时用尽时停止增长"""
+        pool = self.pool or get_sandbox_pool()
+        start = time.perf_counter()
+        measurements: List[Dict[str, Any]] = []
+        error = None
+
+        for n in self.sizes:
+            remaining = self.total_budget - (time.perf_counter() - start)
+            if remaining <= 0:
+                break
+            if measurements:
+                # 按 O(n²) 悲观估计下一规模的耗时，预计超出剩余预算就不再尝试
+                last = measurements[-1]
+                if last["seconds"] * (n / last["n"]) ** 2 > remaining:
+                    break
+            task = {
+                "code": code,
+                "method": method,
+                "generate": {"n": n, "seed": 0},
+                "min_time": 0.05,
+                "max_repeat": 20,
+                # 耗时已接近预算的规模不再额外跑一次 tracemalloc
+                "measure_memory": not measurements or measurements[-1]["seconds"] < self.run_budget / 4,
+            }
+            # 单个规模最多允许运行预算的数倍，死循环等情况尽早结束
+            limit = min(remaining, self.run_budget * 5)
+            task["cpu_limit"] = limit
+            response = pool.run(task, timeout=limit + 1.0)
+            if not response.get("ok"):
+                if not measurements:
+                    error = response.get("error")
+                break
+            measurements.append({
+                "n": n,
+                "seconds": response["seconds"],
+                "repeat": response["repeat"],
+                "peak_alloc_bytes": response.get("peak_alloc_bytes"),
+                "peak_rss_kb": response.get("peak_rss_kb"),
+            })
+            if response["seconds"] > self.run_budget:
+                break
+
+        time_class, time_fit = None, {}
+        space_class, space_fit = None, {}
+        if len(measurements) >= MIN_FIT_POINTS:
+            sizes = [m["n"] for m in measurements]
+            time_class, time_fit = fit_complexity(sizes, [m["seconds"] for m in measurements])
+            memory = [(m["n"], m["peak_alloc_bytes"]) for m in measurements if m["peak_alloc_bytes"] is not None]
+            if len(memory) >= MIN_FIT_POINTS:
+                # 峰值分配量不足 1KB 的视为常数级噪声
+                space_class, space_fit = fit_complexity(
+                    [n for n, _ in memory], [max(b, 1024) for _, b in memory]
+                )
+
+        if error:
+            status = "failed"
+        elif time_class:
+            status = "completed"
+        else:
+            status = "insufficient_data"
+
+        return {
+            "status": status,
+            "time_complexity": time_class,
+            "space_complexity": space_class,
+            "time_fit": time_fit,
+            "space_fit": space_fit,
+            "measurements": measurements,
+            "max_size": measurements[-1]["n"] if measurements else None,
+            "total_seconds": round(time.perf_counter() - start, 3),
+            "error": error,
+        }
+
+    def _serialize(self, benchmark: SubmissionBenchmark) -> Dict[str, Any]:
+        return {
+            "id": benchmark.id,
+            "submission_id": benchmark.submission_id,
+            "problem_id": benchmark.problem_id,
+            "entry_point": benchmark.entry_point,
+            "status": benchmark.status,
+            "time_complexity": benchmark.time_complexity,
+            "space_complexity": benchmark.space_complexity,
+            "time_fit": json.loads(benchmark.time_fit) if benchmark.time_fit else {},
+            "space_fit": json.loads(benchmark.space_fit) if benchmark.space_fit else {},
+            "measurements": json.loads(benchmark.measurements) if benchmark.measurements else [],
+            "max_size": benchmark.max_size,
+            "total_seconds": benchmark.total_seconds,
+            "error": benchmark.error,
+            "created_at": benchmark.created_at.isoformat() if benchmark.created_at else None
+        }
+
+
+def fit_complexity(
+    sizes: List[int],
+    values: List[float],
+    tolerance: float = 0.25,
+    noise_floor: float = 0.1
+) -> Tuple[str, Dict[str, float]]:
+    """拟合 value ≈ a + b·f(n)，返回复杂度类别及各类别的相对误差
+
+    以 1/value 加权做最小二乘，使各规模的相对误差同等重要；
+    误差不超过 max(最优值 × (1 + tolerance), noise_floor) 的类别中取最低的一个，
+    避免测量噪声把 O(1) 判成 O(log n)、把 O(n) 判成 O(n log n)。
+    """
+    n = np.asarray(sizes, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    weights = 1.0 / y
+
+    residuals: Dict[str, float] = {}
+    for name, basis in COMPLEXITY_CLASSES:
+        if basis is None:
+            design = weights[:, None]
+        else:
+            design = np.column_stack([weights, basis(n) * weights])
+        coef = np.linalg.lstsq(design, np.ones_like(y), rcond=None)[0]
+        if basis is not None and coef[1] < 0:
+            # 斜率为负说明随 n 增长反而变快，退化为常数模型
+            coef = np.linalg.lstsq(weights[:, None], np.ones_like(y), rcond=None)[0]
+            design = weights[:, None]
+        relative_error = design @ coef - 1.0
+        residuals[name] = round(float(np.sqrt(np.mean(relative_error ** 2))), 4)
+
+    threshold = max(min(residuals.values()) * (1 + tolerance), noise_floor)
+    chosen = next(name for name, _ in COMPLEXITY_CLASSES if residuals[name] <= threshold)
+    return chosen, residuals
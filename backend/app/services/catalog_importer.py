@@ -0,0 +1,290 @@
+"""
+题库离线导入服务
+流式解析 JSON Lines / CSV 格式的题库导出文件，按批次事务写入 LeetCodeProblem；
+HTML 格式的题目内容在写入时规范化为 Markdown 与纯文本，分类标签按共享的标签分类表一并写入
+"""
+
+import csv
+import io
+import json
+import os
+import re
+import time
+import logging
+from typing import Dict, List, Optional, Any, Iterator, IO, Callable
+
+from ..models.problem import LeetCodeProblem
+from ..core.database import SessionLocal
+from .tag_taxonomy import categorize_problem_by_tags
+from .content_service import ProblemContentService
+from .tag_label_service import ProblemTagService
+from ..utils.html_normalizer import looks_like_html
+
+
+DIFFICULTY_ALIASES = {
+    "easy": "Easy", "简单": "Easy", "1": "Easy",
+    "medium": "Medium", "中等": "Medium", "2": "Medium",
+    "hard": "Hard", "困难": "Hard", "3": "Hard",
+}
+
+# 导出文件中常见的字段别名（LeetCode GraphQL字段名 / 本项目字段名）
+FIELD_ALIASES = {
+    "leetcode_id": ["leetcode_id", "frontendQuestionId", "questionFrontendId", "frontend_id", "id"],
+    "title": ["title"],
+    "title_slug": ["title_slug", "titleSlug", "slug"],
+    "difficulty": ["difficulty", "level"],
+    "tags": ["tags", "topicTags", "topic_tags"],
+    "content": ["content", "description"],
+    "acceptance_rate": ["acceptance_rate", "acRate", "ac_rate"],
+    "frequency": ["frequency", "freqBar"],
+    "is_premium": ["is_premium", "paidOnly", "isPaidOnly", "paid_only"],
+}
+
+# 导出文件没有提供的字段在新建题目时的取值（更新已有题目时保留原值）
+_UNTAGGED_CATEGORY = categorize_problem_by_tags([])
+NEW_PROBLEM_DEFAULTS = {
+    "tags": "[]",
+    "category": getattr(_UNTAGGED_CATEGORY, "value", _UNTAGGED_CATEGORY),
+    "is_premium": False,
+}
+
+
+class CatalogImporter:
+    """题库导入器"""
+
+    def __init__(self, batch_size: int = 500, progress_every: int = 1000):
+        self.batch_size = batch_size
+        self.progress_every = progress_every
+        self.content_service = ProblemContentService()
+        self.tag_service = ProblemTagService()
+        self.logger = logging.getLogger(__name__)
+
+    def import_file(self, path: str, file_format: Optional[str] = None) -> Dict[str, Any]:
+        """从文件路径导入"""
+        file_format = file_format or detect_format(path)
+        with open(path, "r", encoding="utf-8", newline="") as stream:
+            return self.import_stream(stream, file_format)
+
+    def import_stream(
+        self,
+        stream: IO[str],
+        file_format: str,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """从文本流导入，内存占用只与批次大小有关"""
+        stats = {
+            "rows": 0,
+            "created": 0,
+            "updated": 0,
+            "skipped": 0,
+            "errors": [],
+            "seconds": 0.0,
+            "rows_per_sec": 0.0,
+        }
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            batch: Dict[int, Dict[str, Any]] = {}
+            for line_no, raw in enumerate(iter_rows(stream, file_format), start=1):
+                stats["rows"] += 1
+                try:
+                    row = normalize_row(raw)
+                except ValueError as e:
+                    stats["skipped"] += 1
+                    if len(stats["errors"]) < 20:
+                        stats["errors"].append(f"第{line_no}行: {str(e)}")
+                    continue
+
+                batch[row["leetcode_id"]] = row
+                if len(batch) >= self.batch_size:
+                    self._upsert_batch(db, batch, stats)
+                    batch = {}
+
+                if stats["rows"] % self.progress_every == 0:
+                    self._report_progress(stats, start, on_progress)
+
+            if batch:
+                self._upsert_batch(db, batch, stats)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self._report_progress(stats, start, on_progress)
+        return stats
+
+    def _upsert_batch(self, db, batch: Dict[int, Dict[str, Any]], stats: Dict[str, Any]):
+        """在一个事务内批量写入：一次查询已有题目，再逐条更新或新增"""
+        existing = {
+            p.leetcode_id: p
+            for p in db.query(LeetCodeProblem).filter(LeetCodeProblem.leetcode_id.in_(list(batch.keys()))).all()
+        }
+        problems = dict(existing)
+        for leetcode_id, row in batch.items():
+            problem = existing.get(leetcode_id)
+            if problem:
+                # 只更新导出文件提供了的字段，字段较少的导出文件不会清空已有的内容与统计
+                for key, value in row.items():
+                    if value is not None and hasattr(problem, key):
+                        setattr(problem, key, value)
+                stats["updated"] += 1
+            else:
+                problem = LeetCodeProblem(**{
+                    k: NEW_PROBLEM_DEFAULTS.get(k) if v is None else v
+                    for k, v in row.items() if hasattr(LeetCodeProblem, k)
+                })
+                db.add(problem)
+                problems[leetcode_id] = problem
+                stats["created"] += 1
+
+        db.flush()
+        self.tag_service.label(db, [problems[leetcode_id] for leetcode_id in batch])
+
+        # HTML 内容规范化后入库，题目表保存纯文本
+        html_ids = [leetcode_id for leetcode_id, row in batch.items() if looks_like_html(row.get("content"))]
+        if html_ids:
+            normalized = self.content_service.store(
+                db, {problems[leetcode_id].id: batch[leetcode_id]["content"] for leetcode_id in html_ids}
+            )
+            for leetcode_id in html_ids:
+                problems[leetcode_id].content = normalized[problems[leetcode_id].id].text
+        db.commit()
+
+    def _report_progress(self, stats: Dict[str, Any], start: float, on_progress=None):
+        """更新耗时与吞吐量并输出进度"""
+        elapsed = time.perf_counter() - start
+        stats["seconds"] = round(elapsed, 3)
+        stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed > 0 else 0.0
+        print(f"已处理 {stats['rows']} 行（新增 {stats['created']}，更新 {stats['updated']}，"
+              f"跳过 {stats['skipped']}），{stats['rows_per_sec']} 行/秒")
+        if on_progress:
+            on_progress(stats)
+
+
+def iter_rows(stream: IO[str], file_format: str) -> Iterator[Dict[str, Any]]:
+    """逐行迭代解析，不一次性读入整个文件"""
+    if file_format == "csv":
+        for row in csv.DictReader(stream):
+            yield row
+    elif file_format == "jsonl":
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                # 交给调用方按无效行计数
+                yield {"__error__": f"JSON解析失败: {e.msg}"}
+    else:
+        raise ValueError(f"不支持的导入格式: {file_format}")
+
+
+def normalize_row(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """校验并规范化一行题目数据，导出文件没有的字段为 None"""
+    if not isinstance(raw, dict):
+        # JSON Lines 中的数组、数字等非对象行按无效行计数
+        raise ValueError(f"该行不是 JSON 对象: {type(raw).__name__}")
+    if "__error__" in raw:
+        raise ValueError(raw["__error__"])
+
+    def pick(field: str):
+        for alias in FIELD_ALIASES[field]:
+            value = raw.get(alias)
+            if value not in (None, ""):
+                return value
+        return None
+
+    try:
+        leetcode_id = int(pick("leetcode_id"))
+    except (TypeError, ValueError):
+        raise ValueError("缺少有效的题号")
+
+    title = (pick("title") or "").strip()
+    if not title:
+        raise ValueError("缺少题目标题")
+
+    title_slug = (pick("title_slug") or "").strip() or _slugify(title)
+
+    difficulty = DIFFICULTY_ALIASES.get(str(pick("difficulty") or "").strip().lower())
+    if not difficulty:
+        raise ValueError(f"无效的难度: {pick('difficulty')}")
+
+    raw_tags = pick("tags")
+    tags = _parse_tag_names(raw_tags)
+    category = categorize_problem_by_tags(tags)
+    is_premium = pick("is_premium")
+
+    return {
+        "leetcode_id": leetcode_id,
+        "title": title,
+        "title_slug": title_slug,
+        "difficulty": difficulty,
+        "category": getattr(category, "value", category) if raw_tags is not None else None,
+        "tags": json.dumps(tags, ensure_ascii=False) if raw_tags is not None else None,
+        "content": pick("content"),
+        "acceptance_rate": _to_float(pick("acceptance_rate")),
+        "frequency": _to_float(pick("frequency")),
+        "is_premium": _to_bool(is_premium) if is_premium is not None else None,
+    }
+
+
+def _parse_tag_names(value) -> List[str]:
+    """标签可以是列表、GraphQL topicTags、JSON字符串或以 | / , 分隔的字符串"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("["):
+            try:
+                value = json.loads(text)
+            except json.JSONDecodeError:
+                value = text.strip("[]").split(",")
+        else:
+            value = re.split(r"[|,;]", text)
+    names = []
+    for tag in value:
+        name = tag.get("name", "") if isinstance(tag, dict) else str(tag)
+        name = name.strip().strip("'\"")
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _slugify(title: str) -> str:
+    """由标题生成 slug"""
+    slug = re.sub(r"[^0-9a-zA-Z一-鿿]+", "-", title.lower()).strip("-")
+    return slug or "untitled"
+
+
+def _to_float(value) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    try:
+        return float(str(value).rstrip("%"))
+    except ValueError:
+        return None
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "y", "是")
+
+
+def detect_format(path: str) -> str:
+    """按扩展名判断文件格式；.json 通常是整个数组，无法逐行流式解析，直接拒绝"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".json":
+        raise ValueError("不支持 .json 数组文件，请导出为 JSON Lines（每行一个 JSON 对象，.jsonl）")
+    raise ValueError(f"无法识别的文件格式: {extension}")
+
+
+def open_text_stream(binary: IO[bytes]) -> IO[str]:
+    """将上传文件的二进制流包装为逐行读取的文本流"""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
@@ -0,0 +1,262 @@
+"""
+代码运行服务
+在沙箱进程池中并行运行题目测试用例，返回真实的运行时间与内存；带排队上限，突发请求时直接拒绝而不是压垮主机
+"""
+
+import ast
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from ..models.problem import LeetCodeProblem
+from ..core.database import get_db
+from ..utils.sandbox import SandboxPool, get_sandbox_pool
+
+
+MAX_TEST_CASES = 20
+# 客户端指定的单用例超时下限（秒），过小的超时会让每个用例都超时并反复重启沙箱进程
+MIN_TIMEOUT = 0.1
+# 没有测试用例时自动生成的试运行输入
+GENERATED_CASES = 3
+GENERATED_SIZE = 10
+
+
+class RunQueueFullError(Exception):
+    """运行队列已满"""
+
+
+class CodeRunService:
+    """代码运行服务类"""
+
+    def __init__(self, pool: Optional[SandboxPool] = None, max_pending_cases: Optional[int] = None):
+        self.db = next(get_db())
+        self.pool = pool
+        self.max_pending_cases = max_pending_cases
+        self.logger = logging.getLogger(__name__)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._stats = {"runs": 0, "cases": 0, "rejected": 0}
+
+    def _get_pool(self) -> SandboxPool:
+        if self.pool is None:
+            self.pool = get_sandbox_pool()
+        return self.pool
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # 每个线程同一时刻只占用一个工作进程，线程数与进程数一致即可
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._get_pool().size, thread_name_prefix="code-run"
+            )
+        return self._executor
+
+    async def run(self, run_data: Dict[str, Any]) -> Dict[str, Any]:
+        """运行代码
+
+        测试用例来源（按优先级）：test_cases、test_input（LeetCode 格式，每行一个 JSON 参数）、
+        题目自带的示例用例、按函数签名自动生成的小规模输入。
+        """
+        language = (run_data.get("language") or "python").lower()
+        if language not in ("python", "python3"):
+            raise ValueError(f"暂只支持运行 Python 代码，当前语言: {run_data.get('language')}")
+        code = run_data.get("code") or ""
+        if not code.strip():
+            raise ValueError("代码不能为空")
+
+        method = run_data.get("method")
+        try:
+            arity = _entry_arity(ast.parse(code), method)
+        except SyntaxError as e:
+            return {
+                "status": "Compile Error",
+                "error": f"SyntaxError: {e.msg}（第 {e.lineno} 行）",
+                "cases": [],
+            }
+
+        cases = self._resolve_cases(run_data, arity)
+        if len(cases) > MAX_TEST_CASES:
+            raise ValueError(f"一次最多运行 {MAX_TEST_CASES} 个测试用例")
+
+        pool = self._get_pool()
+        timeout = pool.default_timeout
+        if run_data.get("timeout") is not None:
+            try:
+                requested = float(run_data["timeout"])
+            except (TypeError, ValueError):
+                raise ValueError(f"timeout 必须是数字: {run_data['timeout']!r}")
+            if not requested > 0:
+                raise ValueError("timeout 必须大于 0")
+            timeout = min(max(requested, MIN_TIMEOUT), pool.default_timeout)
+
+        self._admit(len(cases))
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_event_loop()
+            executor = self._get_executor()
+            responses = await asyncio.gather(*(
+                loop.run_in_executor(executor, pool.run, self._build_task(code, method, case, timeout), timeout)
+                for case in cases
+            ))
+        finally:
+            self._pending -= len(cases)
+
+        results = [self._case_result(i, case, response) for i, (case, response) in enumerate(zip(cases, responses))]
+        return {
+            "status": _overall_status(results),
+            "passed": sum(1 for r in results if r["status"] == "Accepted"),
+            "total": len(results),
+            "runtime_ms": max((r["runtime_ms"] for r in results if r["runtime_ms"] is not None), default=None),
+            "memory_mb": max((r["memory_mb"] for r in results if r["memory_mb"] is not None), default=None),
+            "wall_ms": round((time.perf_counter() - start) * 1000, 2),
+            "cases": results,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """运行队列与进程池统计"""
+        return {
+            **self._stats,
+            "pending_cases": self._pending,
+            "max_pending_cases": self._max_pending(),
+            "pool": self._get_pool().get_stats(),
+        }
+
+    def _max_pending(self) -> int:
+        return self.max_pending_cases or self._get_pool().size * 8
+
+    def _admit(self, case_count: int):
+        """排队上限检查：在事件循环线程内执行，检查与计数之间没有 await，无需加锁"""
+        if self._pending and self._pending + case_count > self._max_pending():
+            self._stats["rejected"] += 1
+            raise RunQueueFullError(f"运行队列已满（排队中 {self._pending} 个用例），请稍后重试")
+        self._pending += case_count
+        self._stats["runs"] += 1
+        self._stats["cases"] += case_count
+
+    def _resolve_cases(self, run_data: Dict[str, Any], arity: int) -> List[Dict[str, Any]]:
+        """整理测试用例为 [{"args": [...], "expected": ...}]；自动生成的用例用 generate 描述"""
+        if run_data.get("test_cases"):
+            cases = []
+            for item in run_data["test_cases"]:
+                raw = item.get("input") if isinstance(item, dict) else item
+                args = parse_testcase_lines(raw) if isinstance(raw, str) else list(raw or [])
+                if len(args) != arity:
+                    raise ValueError(f"测试用例参数个数为 {len(args)}，函数需要 {arity} 个参数")
+                case = {"args": args}
+                if isinstance(item, dict) and "expected" in item:
+                    case["expected"] = item["expected"]
+                cases.append(case)
+            return cases
+
+        text = run_data.get("test_input")
+        if not text and run_data.get("problem_id"):
+            problem = self.db.query(LeetCodeProblem).filter(LeetCodeProblem.id == run_data["problem_id"]).first()
+            if problem:
+                text = getattr(problem, "example_testcases", None) or getattr(problem, "sample_test_case", None)
+        if text:
+            values = parse_testcase_lines(text)
+            if arity == 0 or len(values) % arity:
+                raise ValueError(f"测试输入共 {len(values)} 行，无法按 {arity} 个参数分组")
+            return [{"args": values[i:i + arity]} for i in range(0, len(values), arity)]
+
+        count = GENERATED_CASES if arity else 1
+        return [{"generate": {"n": GENERATED_SIZE, "seed": seed}} for seed in range(count)]
+
+    def _build_task(self, code: str, method: Optional[str], case: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        task = {
+            "code": code,
+            "method": method,
+            "return_result": True,
+            "cpu_limit": timeout,
+        }
+        if "generate" in case:
+            task["generate"] = case["generate"]
+            task["return_args"] = True
+        else:
+            task["args"] = case["args"]
+        return task
+
+    def _case_result(self, index: int, case: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+        result = {
+            "index": index,
+            "input": case.get("args", response.get("args")),
+            "expected": case.get("expected"),
+            "output": response.get("result"),
+            "stdout": response.get("stdout", ""),
+            "runtime_ms": round(response["seconds"] * 1000, 3) if response.get("ok") else None,
+            "memory_mb": round(response["peak_rss_kb"] / 1024, 2) if response.get("peak_rss_kb") else None,
+            "memory_delta_mb": (
+                round(response["rss_delta_kb"] / 1024, 2) if response.get("rss_delta_kb") is not None else None
+            ),
+            "error": response.get("error"),
+        }
+        if response.get("ok"):
+            if "expected" not in case:
+                result["status"] = "Finished"
+            elif _outputs_match(response.get("result"), case["expected"]):
+                result["status"] = "Accepted"
+            else:
+                result["status"] = "Wrong Answer"
+        elif response.get("timeout") or response.get("exitcode") == -24:  # SIGXCPU
+            result["status"] = "Time Limit Exceeded"
+        elif (response.get("error") or "").startswith("MemoryError") or response.get("exitcode") == -9:
+            result["status"] = "Memory Limit Exceeded"
+        elif (response.get("error") or "").startswith("SyntaxError"):
+            result["status"] = "Compile Error"
+        else:
+            result["status"] = "Runtime Error"
+        return result
+
+
+def parse_testcase_lines(text: str) -> List[Any]:
+    """解析 LeetCode 测试输入：每行一个 JSON 值"""
+    values = []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            values.append(json.loads(line))
+        except json.JSONDecodeError:
+            raise ValueError(f"测试输入第 {line_no} 行不是合法的 JSON: {line[:50]}")
+    return values
+
+
+def _entry_arity(tree: ast.Module, method: Optional[str]) -> int:
+    """静态分析入口函数的参数个数（不在主进程中执行用户代码）"""
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "Solution":
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and (
+                    item.name == method if method else not item.name.startswith("_")
+                ):
+                    return max(0, len(item.args.args) - 1)
+            raise ValueError(f"Solution 类中找不到方法: {method or '(公有方法)'}")
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and (node.name == method if method else True):
+            return len(node.args.args)
+    raise ValueError("代码中没有找到 Solution 类或指定的函数")
+
+
+def _outputs_match(actual: Any, expected: Any) -> bool:
+    """比较输出；浮点数允许 1e-5 误差，元组与列表视为相同"""
+    if isinstance(expected, float) or isinstance(actual, float):
+        try:
+            return abs(float(actual) - float(expected)) <= 1e-5
+        except (TypeError, ValueError):
+            return False
+    if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+        return len(actual) == len(expected) and all(_outputs_match(a, e) for a, e in zip(actual, expected))
+    return actual == expected
+
+
+def _overall_status(results: List[Dict[str, Any]]) -> str:
+    """整体状态取第一个未通过用例的状态"""
+    for result in results:
+        if result["status"] not in ("Accepted", "Finished"):
+            return result["status"]
+    if results and all(r["status"] == "Accepted" for r in results):
+        return "Accepted"
+    return "Finished"
@@ -0,0 +1,93 @@
+"""
+题目内容服务
+题目 HTML 在入库阶段规范化一次，Markdown 与纯文本写入 ProblemContent，纯文本同时写回 LeetCodeProblem.content 供搜索；
+原始 HTML 一并保存，规范化规则升级后可批量重新转换
+"""
+
+import hashlib
+import logging
+import time
+from typing import Dict, Any
+
+from sqlalchemy.orm import Session
+
+from ..models.problem import LeetCodeProblem
+from ..models.problem_content import ProblemContent
+from ..core.database import SessionLocal
+from ..utils.html_normalizer import NormalizedContent, NORMALIZER_VERSION, normalize_html, looks_like_html
+
+
+class ProblemContentService:
+    """题目内容规范化与存储"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def store(self, db: Session, contents: Dict[int, str]) -> Dict[int, NormalizedContent]:
+        """规范化并写入一批题目内容（problem_id -> HTML），不提交事务；原文与规则版本都未变的题目不重复转换"""
+        if not contents:
+            return {}
+        existing = {
+            row.problem_id: row
+            for row in db.query(ProblemContent).filter(ProblemContent.problem_id.in_(list(contents.keys()))).all()
+        }
+        results = {}
+        for problem_id, html in contents.items():
+            html = html or ""
+            source_hash = hashlib.sha1(html.encode("utf-8")).hexdigest()
+            row = existing.get(problem_id)
+            if row is not None and row.source_hash == source_hash and row.normalizer_version == NORMALIZER_VERSION:
+                results[problem_id] = NormalizedContent(row.markdown or "", row.text or "")
+                continue
+            normalized = normalize_html(html)
+            if row is None:
+                row = ProblemContent(problem_id=problem_id)
+                db.add(row)
+            row.source_html = html
+            row.source_hash = source_hash
+            row.markdown = normalized.markdown
+            row.text = normalized.text
+            row.normalizer_version = NORMALIZER_VERSION
+            results[problem_id] = normalized
+        return results
+
+    def normalize_pending(self, batch_size: int = 200) -> Dict[str, Any]:
+        """批量处理待规范化的内容：规则版本落后的已存内容，以及题目表中仍是 HTML 的内容"""
+        stats = {"reconverted": 0, "converted": 0, "seconds": 0.0}
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            while True:
+                rows = (
+                    db.query(ProblemContent.problem_id, ProblemContent.source_html)
+                    .filter(ProblemContent.normalizer_version < NORMALIZER_VERSION)
+                    .limit(batch_size).all()
+                )
+                if not rows:
+                    break
+                self._apply(db, dict(rows))
+                stats["reconverted"] += len(rows)
+
+            last_id = 0
+            while True:
+                problems = (
+                    db.query(LeetCodeProblem.id, LeetCodeProblem.content)
+                    .filter(LeetCodeProblem.id > last_id, LeetCodeProblem.content.like("%<%>%"))
+                    .order_by(LeetCodeProblem.id).limit(batch_size).all()
+                )
+                if not problems:
+                    break
+                last_id = problems[-1][0]
+                pending = {problem_id: content for problem_id, content in problems if looks_like_html(content)}
+                self._apply(db, pending)
+                stats["converted"] += len(pending)
+        finally:
+            db.close()
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        return stats
+
+    def _apply(self, db: Session, contents: Dict[int, str]):
+        normalized = self.store(db, contents)
+        for problem in db.query(LeetCodeProblem).filter(LeetCodeProblem.id.in_(list(normalized.keys()))).all():
+            problem.content = normalized[problem.id].text
+        db.commit()
@@ -7,20 +7,72 @@ import asyncio
 import aiohttp
 import json
 import time
+import random
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator
+from collections import deque
 from datetime import datetime, timedelta
 import re
 from urllib.parse import urljoin
 from ..models.problem import Difficulty, ProblemCategory
+from ..core.config import settings
+from ..utils.rate_limit import (
+    TokenBucket, AdaptiveLimiter, get_rate_limiter, get_adaptive_limiter, parse_retry_after, backoff_delay
+)
+from ..utils.http_cache import ResponseCache, get_response_cache, payload_hash, FRESH, STALE
+from ..utils.metrics import LatencyHistogram
+from .tag_taxonomy import taxonomy, categorize_problem_by_tags
+
+# 各操作的缓存有效期与过期后可继续返回旧数据的宽限期（秒）
+OPERATION_CACHE_TTLS = {
+    "problems_list": (3600, 86400),
+    "problem_detail": (86400, 7 * 86400),
+    "contest_problems": (86400, 7 * 86400),
+    "problem_details": (86400, 7 * 86400),
+    "search_problems": (600, 3600),
+}
+DEFAULT_CACHE_TTL = (3600, 0)
+
+
+# 批量获取题目详情时每个 GraphQL 文档包含的题目数
+DETAIL_BATCH_SIZE = 10
+# 批量获取只取入库需要的字段
+DETAIL_FIELDS = """
+    questionFrontendId
+    title
+    titleSlug
+    content
+    isPaidOnly
+    difficulty
+    similarQuestions
+    exampleTestcases
+    sampleTestCase
+    topicTags { name slug }
+    hints
+"""
+
+
+class CrawlerPageError(Exception):
+    """分页抓取在某个偏移量处失败"""
+
+    def __init__(self, offset: int, error: str):
+        super().__init__(f"偏移量 {offset} 处抓取失败: {error}")
+        self.offset = offset
+        self.error = error
 
 class CrawlerService:
     """爬虫服务类"""
     
-    def __init__(self):
-        self.base_url = "https://leetcode.com"
-        self.api_base_url = "https://leetcode.com/api"
-        self.graphql_url = "https://leetcode.com/graphql"
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        requests_per_second: Optional[float] = None,
+        cache: Optional[ResponseCache] = None
+    ):
+        self.base_url = (base_url or settings.LEETCODE_BASE_URL).rstrip("/")
+        self.api_base_url = f"{self.base_url}/api"
+        self.graphql_url = f"{self.base_url}/graphql"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'application/json, text/plain, */*',
@@ -28,13 +80,31 @@ class CrawlerService:
             'Content-Type': 'application/json',
         }
         self.session = None
-        self.rate_limit_delay = 1.0  # 请求间隔（秒）
+        self._session_loop = None
+        self.rate_limit_delay = settings.CRAWLER_DELAY  # 重试退避基数（秒）
         self.max_retries = 3
+        
+        # 并发与限速：未指定速率时使用进程内共享的令牌桶和自适应并发限制器，多个爬虫实例共用配额；
+        # max_concurrency 是单个批量任务的预取页数，实际同时在途的请求数由自适应限制器按服务端反馈调整
+        self.max_concurrency = max_concurrency or settings.CRAWLER_CONCURRENCY
+        if requests_per_second:
+            self.rate_limiter = TokenBucket(requests_per_second, capacity=self.max_concurrency)
+            self.concurrency_limiter = AdaptiveLimiter(
+                initial=self.max_concurrency, max_limit=settings.CRAWLER_MAX_CONCURRENCY
+            )
+        else:
+            self.rate_limiter = get_rate_limiter(
+                f"leetcode:{self.base_url}", settings.CRAWLER_RATE_LIMIT, capacity=self.max_concurrency
+            )
+            self.concurrency_limiter = get_adaptive_limiter(
+                f"leetcode:{self.base_url}", settings.CRAWLER_CONCURRENCY, settings.CRAWLER_MAX_CONCURRENCY
+            )
         self.logger = logging.getLogger(__name__)
         
-        # 缓存机制
-        self.cache = {}
-        self.cache_ttl = 3600  # 缓存1小时
+        # 缓存机制：持久化到 SQLite，多个实例和进程共享；过期后在宽限期内先返回旧数据并后台刷新
+        self.cache = cache or get_response_cache()
+        self.cache_ttls = dict(OPERATION_CACHE_TTLS)
+        self._revalidations: Dict[str, asyncio.Task] = {}
         
         # 统计信息
         self.stats = {
@@ -42,24 +112,54 @@ class CrawlerService:
             "successful_requests": 0,
             "failed_requests": 0,
             "cache_hits": 0,
+            "stale_hits": 0,
+            "bytes_received": 0,
+            "retries": 0,
+            "throttled": 0,
             "start_time": None
         }
+        # 按操作统计请求数、重试、流量与延迟分布
+        self.operation_stats: Dict[str, Dict[str, Any]] = {}
     
     async def __aenter__(self):
         """异步上下文管理器入口"""
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """异步上下文管理器出口"""
+        await self.close()
+    
+    async def start(self):
+        """打开连接池；已打开且属于当前事件循环时直接复用"""
+        loop = asyncio.get_running_loop()
+        if self.session and not self.session.closed and self._session_loop is loop:
+            return
+        # 会话绑定创建时的事件循环；旧循环已结束时无法再关闭旧会话，直接换新
         self.session = aiohttp.ClientSession(
             headers=self.headers,
             timeout=aiohttp.ClientTimeout(total=30),
-            connector=aiohttp.TCPConnector(limit=10, limit_per_host=5)
+            # 连接数不低于自适应并发上限，实际并发由 concurrency_limiter 控制
+            connector=aiohttp.TCPConnector(
+                limit=max(10, int(self.concurrency_limiter.max_limit)),
+                limit_per_host=int(self.concurrency_limiter.max_limit)
+            )
         )
-        self.stats["start_time"] = datetime.now()
+        self._session_loop = loop
+        if not self.stats["start_time"]:
+            self.stats["start_time"] = datetime.now()
         self.logger.info("爬虫服务已启动")
-        return self
     
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """异步上下文管理器出口"""
+    async def close(self):
+        """关闭连接池，统计信息保留"""
+        # 等待后台刷新完成后再关闭会话
+        if self._revalidations:
+            await asyncio.gather(*self._revalidations.values(), return_exceptions=True)
         if self.session:
             await self.session.close()
+            self.session = None
+        # 写回缓存中攒下的访问时间和命中统计
+        await asyncio.get_event_loop().run_in_executor(None, self.cache.flush)
         
         # 输出统计信息
         if self.stats["start_time"]:
@@ -71,81 +171,158 @@ class CrawlerService:
                            f"缓存命中: {self.stats['cache_hits']}, "
                            f"运行时间: {duration}")
     
-    def _get_cache_key(self, operation: str, **kwargs) -> str:
-        """生成缓存键"""
-        key_parts = [operation]
-        for k, v in sorted(kwargs.items()):
-            key_parts.append(f"{k}={v}")
-        return ":".join(key_parts)
-    
-    def _get_from_cache(self, cache_key: str) -> Optional[Any]:
-        """从缓存获取数据"""
-        if cache_key in self.cache:
-            data, timestamp = self.cache[cache_key]
-            if datetime.now().timestamp() - timestamp < self.cache_ttl:
-                self.stats["cache_hits"] += 1
-                return data
-            else:
-                # 缓存过期，删除
-                del self.cache[cache_key]
-        return None
+    def _operation_stats(self, operation: str) -> Dict[str, Any]:
+        """取得某个操作的统计项，首次使用时创建"""
+        op = self.operation_stats.get(operation)
+        if op is None:
+            op = self.operation_stats[operation] = {
+                "requests": 0,
+                "successes": 0,
+                "failures": 0,
+                "retries": 0,
+                "throttled": 0,
+                "bytes_received": 0,
+                "cache_hits": 0,
+                "stale_hits": 0,
+                "latency": LatencyHistogram(),
+            }
+        return op
+    
+    def _get_cache_key(self, operation: str, payload: Dict[str, Any]) -> str:
+        """生成缓存键：操作名 + 请求体哈希"""
+        return f"{operation}:{payload_hash(payload)}"
     
-    def _set_cache(self, cache_key: str, data: Any):
-        """设置缓存"""
-        self.cache[cache_key] = (data, datetime.now().timestamp())
+    async def _get_from_cache(self, cache_key: str, operation: str) -> Tuple[Optional[Any], str]:
+        """从缓存获取数据，返回 (数据, 状态)；SQLite 读写在线程池中执行，不阻塞事件循环"""
+        loop = asyncio.get_event_loop()
+        data, state = await loop.run_in_executor(None, self.cache.get, cache_key)
+        if state == FRESH:
+            self.stats["cache_hits"] += 1
+            self._operation_stats(operation)["cache_hits"] += 1
+        elif state == STALE:
+            self.stats["stale_hits"] += 1
+            self._operation_stats(operation)["stale_hits"] += 1
+        return data, state
     
-    async def _make_request_with_retry(self, payload: Dict[str, Any], cache_key: Optional[str] = None) -> Dict[str, Any]:
-        """带重试机制的请求"""
+    async def _set_cache(self, cache_key: str, operation: str, data: Any):
+        """设置缓存（在线程池中执行）"""
+        ttl, stale_ttl = self.cache_ttls.get(operation, DEFAULT_CACHE_TTL)
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.cache.set, cache_key, operation, data, ttl, stale_ttl)
+    
+    def _schedule_revalidation(self, cache_key: str, operation: str, payload: Dict[str, Any]):
+        """后台刷新过期缓存；同一个键同时只刷新一次"""
+        if cache_key in self._revalidations:
+            return
+        
+        async def revalidate():
+            try:
+                data = await self._send_with_retry(payload, operation)
+                if _is_cacheable(data):
+                    await self._set_cache(cache_key, operation, data)
+            except Exception as e:
+                self.logger.warning(f"后台刷新缓存失败: {str(e)}")
+            finally:
+                self._revalidations.pop(cache_key, None)
+        
+        self._revalidations[cache_key] = asyncio.ensure_future(revalidate())
+    
+    async def _make_request_with_retry(
+        self,
+        payload: Dict[str, Any],
+        cache_operation: Optional[str] = None,
+        refresh: bool = False,
+        operation: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """带缓存和重试机制的请求；cache_operation 为空时不使用缓存，refresh 为 True 时跳过读缓存但更新缓存；
+        统计按 cache_operation 或 operation 归类"""
+        if not cache_operation:
+            return await self._send_with_retry(payload, operation or "graphql")
+        
         # 检查缓存
-        if cache_key:
-            cached_data = self._get_from_cache(cache_key)
-            if cached_data:
+        cache_key = self._get_cache_key(cache_operation, payload)
+        if not refresh:
+            cached_data, state = await self._get_from_cache(cache_key, cache_operation)
+            if state == FRESH:
+                return cached_data
+            if state == STALE:
+                if self.session:
+                    self._schedule_revalidation(cache_key, cache_operation, payload)
                 return cached_data
         
+        data = await self._send_with_retry(payload, cache_operation)
+        # 缓存成功的响应
+        if _is_cacheable(data):
+            await self._set_cache(cache_key, cache_operation, data)
+        return data
+    
+    async def _send_with_retry(self, payload: Dict[str, Any], operation: str = "graphql") -> Dict[str, Any]:
+        """发送请求，失败时带抖动退避重试；429/503 与超时会降低共享并发上限，Retry-After 让所有请求一起暂停"""
         last_error = None
+        op = self._operation_stats(operation)
         
         for attempt in range(self.max_retries):
+            retry_after = None
             try:
                 self.stats["requests_made"] += 1
+                op["requests"] += 1
                 
                 if not self.session:
                     return {"success": False, "error": "会话未初始化"}
                 
-                async with self.session.post(self.graphql_url, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        self.stats["successful_requests"] += 1
-                        
-                        # 缓存成功的响应
-                        if cache_key:
-                            self._set_cache(cache_key, data)
-                        
-                        return data
-                    elif response.status == 429:  # 请求过于频繁
-                        wait_time = self.rate_limit_delay * (2 ** attempt)
-                        self.logger.warning(f"请求被限制，等待 {wait_time} 秒后重试...")
-                        await asyncio.sleep(wait_time)
-                        continue
-                    else:
-                        last_error = f"HTTP错误: {response.status}"
+                await self.rate_limiter.acquire()
+                await self.concurrency_limiter.acquire()
+                # 延迟只统计请求本身，不含排队等待令牌和并发名额的时间
+                started = time.perf_counter()
+                try:
+                    async with self.session.post(self.graphql_url, json=payload) as response:
+                        if response.status == 200:
+                            body = await response.read()
+                            self.stats["bytes_received"] += len(body)
+                            op["bytes_received"] += len(body)
+                            data = json.loads(body)
+                            self.stats["successful_requests"] += 1
+                            op["successes"] += 1
+                            self.concurrency_limiter.record_success()
+                            return data
+                        elif response.status in (429, 503):  # 请求过于频繁 / 服务暂不可用
+                            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                            self.concurrency_limiter.record_throttle(retry_after)
+                            self.stats["throttled"] += 1
+                            op["throttled"] += 1
+                            last_error = f"请求被限制: HTTP {response.status}"
+                            self.logger.warning(f"请求被限制（Retry-After: {retry_after}），"
+                                                f"并发上限降为 {int(self.concurrency_limiter.limit)}")
+                        else:
+                            last_error = f"HTTP错误: {response.status}"
+                finally:
+                    op["latency"].observe(time.perf_counter() - started)
+                    await self.concurrency_limiter.release()
                         
             except asyncio.TimeoutError:
+                self.concurrency_limiter.record_timeout()
                 last_error = "请求超时"
                 self.logger.warning(f"请求超时，第 {attempt + 1} 次尝试")
             except Exception as e:
                 last_error = f"请求异常: {str(e)}"
                 self.logger.error(f"请求异常: {str(e)}")
             
-            # 如果不是最后一次尝试，等待后重试
+            # 如果不是最后一次尝试，等待后重试；有 Retry-After 时由限制器统一暂停，这里只加抖动错开重试
             if attempt < self.max_retries - 1:
-                wait_time = self.rate_limit_delay * (2 ** attempt)
+                self.stats["retries"] += 1
+                op["retries"] += 1
+                if retry_after is not None:
+                    wait_time = random.uniform(0, self.rate_limit_delay)
+                else:
+                    wait_time = backoff_delay(attempt, self.rate_limit_delay)
                 await asyncio.sleep(wait_time)
         
         self.stats["failed_requests"] += 1
+        op["failures"] += 1
         return {"success": False, "error": last_error}
     
-    async def get_problems_list(self, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
-        """获取题目列表"""
+    async def get_problems_list(self, limit: int = 100, offset: int = 0, refresh: bool = False) -> Dict[str, Any]:
+        """获取题目列表；refresh 为 True 时绕过缓存直接请求"""
         try:
             # GraphQL查询获取题目列表
             query = """
@@ -191,11 +368,8 @@ class CrawlerService:
                 "variables": variables
             }
             
-            # 生成缓存键
-            cache_key = self._get_cache_key("problems_list", limit=limit, offset=offset)
-            
-            # 使用重试机制发送请求
-            response_data = await self._make_request_with_retry(payload, cache_key)
+            # 使用缓存和重试机制发送请求
+            response_data = await self._make_request_with_retry(payload, "problems_list", refresh=refresh)
             
             if "success" in response_data and not response_data["success"]:
                 return response_data
@@ -247,37 +421,8 @@ class CrawlerService:
             return {"success": False, "error": f"获取题目列表失败: {str(e)}"}
     
     def _categorize_problem_by_tags(self, tags: List[Dict[str, Any]]) -> ProblemCategory:
-        """根据标签分类题目"""
-        tag_names = [tag["name"].lower() for tag in tags]
-        
-        # 分类映射规则
-        category_rules = {
-            ProblemCategory.ARRAY: ["array", "matrix"],
-            ProblemCategory.STRING: ["string"],
-            ProblemCategory.LINKED_LIST: ["linked list"],
-            ProblemCategory.TREE: ["tree", "binary tree", "binary search tree"],
-            ProblemCategory.GRAPH: ["graph", "topological sort"],
-            ProblemCategory.DYNAMIC_PROGRAMMING: ["dynamic programming", "dp"],
-            ProblemCategory.GREEDY: ["greedy"],
-            ProblemCategory.BACKTRACKING: ["backtracking"],
-            ProblemCategory.DIVIDE_AND_CONQUER: ["divide and conquer"],
-            ProblemCategory.BINARY_SEARCH: ["binary search"],
-            ProblemCategory.SORTING: ["sorting"],
-            ProblemCategory.HASH_TABLE: ["hash table", "hash map"],
-            ProblemCategory.STACK: ["stack"],
-            ProblemCategory.QUEUE: ["queue"],
-            ProblemCategory.HEAP: ["heap", "priority queue"],
-            ProblemCategory.MATH: ["math", "geometry", "number theory"],
-            ProblemCategory.BIT_MANIPULATION: ["bit manipulation"]
-        }
-        
-        # 按优先级匹配分类
-        for category, keywords in category_rules.items():
-            for keyword in keywords:
-                if any(keyword in tag_name for tag_name in tag_names):
-                    return category
-        
-        return ProblemCategory.OTHER
+        """根据标签确定主分类（共享标签分类表）"""
+        return categorize_problem_by_tags(tags)
     
     async def get_problem_detail(self, title_slug: str) -> Dict[str, Any]:
         """获取题目详情"""
@@ -362,64 +507,14 @@ class CrawlerService:
                 "variables": variables
             }
             
-            # 生成缓存键
-            cache_key = self._get_cache_key("problem_detail", title_slug=title_slug)
-            
-            # 使用重试机制发送请求
-            response_data = await self._make_request_with_retry(payload, cache_key)
+            # 使用缓存和重试机制发送请求
+            response_data = await self._make_request_with_retry(payload, "problem_detail")
             
             if "success" in response_data and not response_data["success"]:
                 return response_data
             
             if "data" in response_data and "question" in response_data["data"] and response_data["data"]["question"]:
-                question = response_data["data"]["question"]
-                
-                # 处理相似题目
-                similar_questions = []
-                if question.get("similarQuestions"):
-                    try:
-                        similar_data = json.loads(question["similarQuestions"])
-                        similar_questions = similar_data
-                    except json.JSONDecodeError:
-                        self.logger.warning(f"无法解析相似题目数据: {title_slug}")
-                
-                # 处理提示
-                hints = question.get("hints", [])
-                
-                # 处理标签
-                tags = [tag["name"] for tag in question.get("topicTags", [])]
-                
-                # 映射难度
-                difficulty_map = {
-                    "Easy": Difficulty.EASY,
-                    "Medium": Difficulty.MEDIUM,
-                    "Hard": Difficulty.HARD
-                }
-                
-                # 分类题目
-                category = self._categorize_problem_by_tags(question.get("topicTags", []))
-                
-                # 清理HTML内容
-                content = self._clean_html_content(question.get("content", ""))
-                
-                processed_detail = {
-                    "leetcode_id": int(question["questionFrontendId"]),
-                    "title": question["title"],
-                    "title_slug": question["titleSlug"],
-                    "description": content,
-                    "difficulty": difficulty_map.get(question["difficulty"], Difficulty.EASY),
-                    "category": category,
-                    "tags": tags,
-                    "hints": hints,
-                    "similar_questions": similar_questions,
-                    "is_premium": question["isPaidOnly"],
-                    "likes": question.get("likes", 0),
-                    "dislikes": question.get("dislikes", 0),
-                    "sample_test_case": question.get("sampleTestCase", ""),
-                    "code_snippets": question.get("codeSnippets", []),
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                }
+                processed_detail = self._process_question(response_data["data"]["question"])
                 
                 return {
                     "success": True,
@@ -432,34 +527,117 @@ class CrawlerService:
             self.logger.error(f"获取题目详情失败: {str(e)}")
             return {"success": False, "error": f"获取题目详情失败: {str(e)}"}
     
-    def _clean_html_content(self, html_content: str) -> str:
-        """清理HTML内容，转换为纯文本"""
-        if not html_content:
-            return ""
-        
-        # 简单的HTML标签清理
-        import re
-        
-        # 移除HTML标签
-        clean_text = re.sub(r'<[^>]+>', '', html_content)
+    async def fetch_details_batch(self, slugs: List[str]) -> Dict[str, Any]:
+        """一次请求获取多道题目详情：每个 slug 对应 GraphQL 文档中的一个别名字段"""
+        try:
+            variables = {f"s{i}": slug for i, slug in enumerate(slugs)}
+            declarations = ", ".join(f"$s{i}: String!" for i in range(len(slugs)))
+            selections = "\n".join(
+                f"q{i}: question(titleSlug: $s{i}) {{{DETAIL_FIELDS}}}" for i in range(len(slugs))
+            )
+            payload = {
+                "query": f"query batchQuestionData({declarations}) {{\n{selections}\n}}",
+                "variables": variables
+            }
+            
+            response_data = await self._make_request_with_retry(payload, "problem_details")
+            if "success" in response_data and not response_data["success"]:
+                return response_data
+            
+            data = response_data.get("data")
+            if not isinstance(data, dict):
+                return {"success": False, "error": "响应数据格式错误"}
+            
+            details = []
+            missing = []
+            for i, slug in enumerate(slugs):
+                question = data.get(f"q{i}")
+                if question:
+                    details.append(self._process_question(question))
+                else:
+                    missing.append(slug)
+            return {"success": True, "problems": details, "missing": missing}
         
-        # 解码HTML实体
-        html_entities = {
-            '&lt;': '<',
-            '&gt;': '>',
-            '&amp;': '&',
-            '&quot;': '"',
-            '&#39;': "'",
-            '&nbsp;': ' '
+        except Exception as e:
+            self.logger.error(f"批量获取题目详情失败: {str(e)}")
+            return {"success": False, "error": f"批量获取题目详情失败: {str(e)}"}
+    
+    async def iter_problem_details(
+        self,
+        slugs: List[str],
+        batch_size: int = DETAIL_BATCH_SIZE
+    ) -> AsyncIterator[Tuple[List[str], Dict[str, Any]]]:
+        """按批产出 (该批 slugs, fetch_details_batch 结果)，各批在共享限速器约束下并发请求"""
+        chunks = [tuple(slugs[i:i + batch_size]) for i in range(0, len(slugs), batch_size)]
+        async for chunk, result in self._iter_windowed(chunks, lambda chunk: self.fetch_details_batch(list(chunk))):
+            yield list(chunk), result
+    
+    async def batch_fetch_details(self, slugs: List[str], batch_size: int = DETAIL_BATCH_SIZE) -> Dict[str, Any]:
+        """批量获取题目详情，全部结果保存在内存中；入库请使用 iter_problem_details 边抓边写"""
+        details: List[Dict[str, Any]] = []
+        missing: List[str] = []
+        failed: List[str] = []
+        async for chunk, result in self.iter_problem_details(slugs, batch_size):
+            if result["success"]:
+                details.extend(result["problems"])
+                missing.extend(result["missing"])
+            else:
+                failed.extend(chunk)
+        return {
+            "success": not failed,
+            "total_fetched": len(details),
+            "problems": details,
+            "missing_slugs": missing,
+            "failed_slugs": failed
         }
-        
-        for entity, char in html_entities.items():
-            clean_text = clean_text.replace(entity, char)
-        
-        # 清理多余的空白字符
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-        
-        return clean_text
+    
+    def _process_question(self, question: Dict[str, Any]) -> Dict[str, Any]:
+        """整理 GraphQL question 对象"""
+        # 处理相似题目
+        similar_questions = []
+        if question.get("similarQuestions"):
+            try:
+                similar_data = json.loads(question["similarQuestions"])
+                similar_questions = similar_data
+            except json.JSONDecodeError:
+                self.logger.warning(f"无法解析相似题目数据: {question.get('titleSlug')}")
+
+        # 处理提示
+        hints = question.get("hints", [])
+
+        # 处理标签
+        tags = [tag["name"] for tag in question.get("topicTags", [])]
+
+        # 映射难度
+        difficulty_map = {
+            "Easy": Difficulty.EASY,
+            "Medium": Difficulty.MEDIUM,
+            "Hard": Difficulty.HARD
+        }
+
+        # 分类题目
+        category = self._categorize_problem_by_tags(question.get("topicTags", []))
+
+        processed_detail = {
+            "leetcode_id": int(question["questionFrontendId"]),
+            "title": question["title"],
+            "title_slug": question["titleSlug"],
+            "content_html": question.get("content") or "",  # 原始 HTML，入库时统一规范化
+            "difficulty": difficulty_map.get(question["difficulty"], Difficulty.EASY),
+            "category": category,
+            "tags": tags,
+            "hints": hints,
+            "similar_questions": similar_questions,
+            "is_premium": question["isPaidOnly"],
+            "likes": question.get("likes", 0),
+            "dislikes": question.get("dislikes", 0),
+            "sample_test_case": question.get("sampleTestCase", ""),
+            "example_testcases": question.get("exampleTestcases", ""),
+            "code_snippets": question.get("codeSnippets", []),
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+        return processed_detail
     
     async def get_problem_statistics(self) -> Dict[str, Any]:
         """获取题目统计信息"""
@@ -495,153 +673,133 @@ class CrawlerService:
             
             payload = {"query": query}
             
-            if not self.session:
-                return {"success": False, "error": "会话未初始化"}
+            # 使用重试机制发送请求
+            data = await self._make_request_with_retry(payload, operation="problem_statistics")
+            if "success" in data and not data["success"]:
+                return data
             
-            async with self.session.post(self.graphql_url, json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    if "data" in data and "allQuestionsCount" in data["data"]:
-                        stats = {}
-                        for item in data["data"]["allQuestionsCount"]:
-                            stats[item["difficulty"].lower()] = item["count"]
-                        
-                        return {
-                            "success": True,
-                            "statistics": {
-                                "total_problems": sum(stats.values()),
-                                "difficulty_distribution": stats,
-                                "last_updated": datetime.now().isoformat()
-                            }
-                        }
-                    else:
-                        return {"success": False, "error": "统计数据格式错误"}
-                else:
-                    return {"success": False, "error": f"HTTP错误: {response.status}"}
+            if "data" in data and "allQuestionsCount" in data["data"]:
+                stats = {}
+                for item in data["data"]["allQuestionsCount"]:
+                    stats[item["difficulty"].lower()] = item["count"]
+                
+                return {
+                    "success": True,
+                    "statistics": {
+                        "total_problems": sum(stats.values()),
+                        "difficulty_distribution": stats,
+                        "last_updated": datetime.now().isoformat()
+                    }
+                }
+            else:
+                return {"success": False, "error": "统计数据格式错误"}
                     
         except Exception as e:
             return {"success": False, "error": f"获取统计信息失败: {str(e)}"}
     
+    async def iter_problem_pages(
+        self,
+        batch_size: int = 50,
+        max_problems: Optional[int] = None,
+        start_offset: int = 0,
+        refresh: bool = False
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """从 start_offset 开始按偏移量顺序逐页产出 (offset, problems)"""
+        stats_result = await self.get_problem_statistics()
+        if not stats_result["success"]:
+            raise CrawlerPageError(start_offset, stats_result["error"])
+        
+        total_available = stats_result["statistics"]["total_problems"]
+        target_count = min(max_problems or total_available, total_available)
+        offsets = list(range(start_offset, target_count, batch_size))
+        print(f"开始分页获取题目，目标数量: {target_count}，起始偏移量 {start_offset}，"
+              f"共 {len(offsets)} 页，并发数 {self.max_concurrency}")
+        async for page in self.iter_pages(offsets, batch_size, target_count, refresh):
+            yield page
+    
+    async def iter_pages(
+        self,
+        offsets: List[int],
+        batch_size: int,
+        target_count: int,
+        refresh: bool = False
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """按 offsets 给定的顺序逐页产出 (offset, problems)
+
+        最多同时请求 max_concurrency 页，调用方消费慢时不会继续预取，内存占用与并发数成正比。
+        某一页失败时取消其余请求并抛出 CrawlerPageError，之前产出的页不受影响。
+        """
+        async for offset, result in self._iter_windowed(
+            offsets,
+            lambda offset: self.get_problems_list(
+                limit=min(batch_size, target_count - offset), offset=offset, refresh=refresh
+            )
+        ):
+            if not result["success"]:
+                raise CrawlerPageError(offset, result["error"])
+            yield offset, result["problems"]
+    
+    async def _iter_windowed(self, keys: List[Any], fetch) -> AsyncIterator[Tuple[Any, Any]]:
+        """按 keys 顺序产出 (key, await fetch(key))，同时最多 max_concurrency 个请求在途；提前退出时取消其余请求"""
+        pending = deque(keys)
+        in_flight: deque = deque()
+        
+        def submit_next():
+            key = pending.popleft()
+            in_flight.append((key, asyncio.ensure_future(fetch(key))))
+        
+        try:
+            while pending and len(in_flight) < self.max_concurrency:
+                submit_next()
+            while in_flight:
+                key, task = in_flight.popleft()
+                result = await task
+                if pending:
+                    submit_next()
+                yield key, result
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+    
     async def batch_fetch_problems(self, batch_size: int = 50, max_problems: Optional[int] = None) -> Dict[str, Any]:
-        """批量获取题目"""
+        """批量获取题目，全部结果保存在内存中；大批量同步请使用 iter_problem_pages 边抓边写"""
+        all_problems: List[Dict[str, Any]] = []
         try:
-            all_problems = []
-            offset = 0
-            total_fetched = 0
-            
-            # 首先获取统计信息确定总数
-            stats_result = await self.get_problem_statistics()
-            if not stats_result["success"]:
-                return stats_result
-            
-            total_available = stats_result["statistics"]["total_problems"]
-            target_count = min(max_problems or total_available, total_available)
-            
-            print(f"开始批量获取题目，目标数量: {target_count}")
-            
-            while total_fetched < target_count:
-                # 计算本次获取数量
-                current_batch_size = min(batch_size, target_count - total_fetched)
-                
-                print(f"正在获取第 {offset + 1}-{offset + current_batch_size} 题...")
-                
-                # 获取当前批次
-                result = await self.get_problems_list(limit=current_batch_size, offset=offset)
-                
-                if not result["success"]:
-                    return {
-                        "success": False,
-                        "error": f"批量获取在偏移量 {offset} 处失败: {result['error']}",
-                        "partial_data": all_problems
-                    }
-                
-                batch_problems = result["problems"]
-                all_problems.extend(batch_problems)
-                total_fetched += len(batch_problems)
-                offset += current_batch_size
-                
-                # 如果获取的数量少于请求的数量，说明已经到达末尾
-                if len(batch_problems) < current_batch_size:
-                    break
-                
-                # 添加延迟避免被限制
-                await asyncio.sleep(self.rate_limit_delay)
+            async for offset, problems in self.iter_problem_pages(batch_size, max_problems):
+                all_problems.extend(problems)
+                print(f"已获取第 {offset + 1}-{offset + len(problems)} 题")
             
             return {
                 "success": True,
                 "total_fetched": len(all_problems),
-                "problems": all_problems,
-                "statistics": stats_result["statistics"]
+                "problems": all_problems
             }
             
+        except CrawlerPageError as e:
+            return {
+                "success": False,
+                "error": f"批量获取在偏移量 {e.offset} 处失败: {e.error}",
+                "failed_offsets": [e.offset],
+                "partial_data": all_problems
+            }
         except Exception as e:
             return {
                 "success": False,
                 "error": f"批量获取题目失败: {str(e)}",
-                "partial_data": all_problems if 'all_problems' in locals() else []
+                "partial_data": all_problems
             }
     
     def categorize_problems(self, problems: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
-        """按分类整理题目"""
-        categories = {
-            "数组": [],
-            "字符串": [],
-            "链表": [],
-            "树": [],
-            "图": [],
-            "动态规划": [],
-            "贪心算法": [],
-            "回溯": [],
-            "分治": [],
-            "二分查找": [],
-            "排序": [],
-            "哈希表": [],
-            "栈": [],
-            "队列": [],
-            "堆": [],
-            "数学": [],
-            "位运算": [],
-            "其他": []
-        }
+        """按分类整理题目；一道题属于多个分类时在每个分类下都出现，分类内按该分类的权重降序"""
+        weighted: Dict[str, List[Tuple[float, int, Dict[str, Any]]]] = {}
+        for index, problem in enumerate(problems):
+            for category, weight in taxonomy.classify(problem.get("tags", [])):
+                weighted.setdefault(category.value, []).append((weight, index, problem))
         
-        # 标签映射
-        tag_mapping = {
-            "Array": "数组",
-            "String": "字符串", 
-            "Linked List": "链表",
-            "Tree": "树",
-            "Graph": "图",
-            "Dynamic Programming": "动态规划",
-            "Greedy": "贪心算法",
-            "Backtracking": "回溯",
-            "Divide and Conquer": "分治",
-            "Binary Search": "二分查找",
-            "Sorting": "排序",
-            "Hash Table": "哈希表",
-            "Stack": "栈",
-            "Queue": "队列",
-            "Heap": "堆",
-            "Math": "数学",
-            "Bit Manipulation": "位运算"
+        return {
+            category.value: [problem for _, _, problem in sorted(weighted[category.value], key=lambda item: (-item[0], item[1]))]
+            for category in ProblemCategory if category.value in weighted
         }
-        
-        for problem in problems:
-            categorized = False
-            problem_tags = problem.get("tags", [])
-            
-            for tag in problem_tags:
-                if tag in tag_mapping:
-                    category = tag_mapping[tag]
-                    categories[category].append(problem)
-                    categorized = True
-                    break
-            
-            if not categorized:
-                categories["其他"].append(problem)
-        
-        # 移除空分类
-        return {k: v for k, v in categories.items() if v}
     
     async def get_daily_challenge(self) -> Dict[str, Any]:
         """获取每日挑战题目"""
@@ -676,40 +834,36 @@ class CrawlerService:
             
             payload = {"query": query}
             
-            if not self.session:
-                return {"success": False, "error": "会话未初始化"}
+            # 使用重试机制发送请求
+            data = await self._make_request_with_retry(payload, operation="daily_challenge")
+            if "success" in data and not data["success"]:
+                return data
             
-            async with self.session.post(self.graphql_url, json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    if ("data" in data and 
-                        "activeDailyCodingChallengeQuestion" in data["data"] and
-                        data["data"]["activeDailyCodingChallengeQuestion"]):
-                        
-                        challenge = data["data"]["activeDailyCodingChallengeQuestion"]
-                        question = challenge["question"]
-                        
-                        daily_problem = {
-                            "date": challenge["date"],
-                            "leetcode_id": int(question["frontendQuestionId"]),
-                            "title": question["title"],
-                            "title_slug": question["titleSlug"],
-                            "difficulty": question["difficulty"],
-                            "acceptance_rate": question["acRate"],
-                            "is_premium": question["paidOnly"],
-                            "tags": [tag["name"] for tag in question.get("topicTags", [])],
-                            "link": challenge["link"]
-                        }
-                        
-                        return {
-                            "success": True,
-                            "daily_challenge": daily_problem
-                        }
-                    else:
-                        return {"success": False, "error": "今日挑战数据不可用"}
-                else:
-                    return {"success": False, "error": f"HTTP错误: {response.status}"}
+            if ("data" in data and 
+                "activeDailyCodingChallengeQuestion" in data["data"] and
+                data["data"]["activeDailyCodingChallengeQuestion"]):
+                
+                challenge = data["data"]["activeDailyCodingChallengeQuestion"]
+                question = challenge["question"]
+                
+                daily_problem = {
+                    "date": challenge["date"],
+                    "leetcode_id": int(question["frontendQuestionId"]),
+                    "title": question["title"],
+                    "title_slug": question["titleSlug"],
+                    "difficulty": question["difficulty"],
+                    "acceptance_rate": question["acRate"],
+                    "is_premium": question["paidOnly"],
+                    "tags": [tag["name"] for tag in question.get("topicTags", [])],
+                    "link": challenge["link"]
+                }
+                
+                return {
+                    "success": True,
+                    "daily_challenge": daily_problem
+                }
+            else:
+                return {"success": False, "error": "今日挑战数据不可用"}
                     
         except Exception as e:
             return {"success": False, "error": f"获取每日挑战失败: {str(e)}"}
@@ -767,8 +921,7 @@ class CrawlerService:
                 "variables": variables
             }
             
-            cache_key = self._get_cache_key("contest_problems", contest_slug=contest_slug)
-            response_data = await self._make_request_with_retry(payload, cache_key)
+            response_data = await self._make_request_with_retry(payload, "contest_problems")
             
             if "success" in response_data and not response_data["success"]:
                 return response_data
@@ -818,8 +971,7 @@ class CrawlerService:
                 "variables": variables
             }
             
-            cache_key = self._get_cache_key("search_problems", keyword=keyword, limit=limit)
-            response_data = await self._make_request_with_retry(payload, cache_key)
+            response_data = await self._make_request_with_retry(payload, "search_problems")
             
             if "success" in response_data and not response_data["success"]:
                 return response_data
@@ -898,7 +1050,7 @@ class CrawlerService:
                 "variables": variables
             }
             
-            response_data = await self._make_request_with_retry(payload)
+            response_data = await self._make_request_with_retry(payload, operation="problem_submissions")
             
             if "success" in response_data and not response_data["success"]:
                 return response_data
@@ -927,11 +1079,27 @@ class CrawlerService:
                 stats["successful_requests"] / stats["requests_made"] 
                 if stats["requests_made"] > 0 else 0
             )
+            cache_hits = stats["cache_hits"] + stats["stale_hits"]
             stats["cache_hit_rate"] = (
-                stats["cache_hits"] / (stats["requests_made"] + stats["cache_hits"])
-                if (stats["requests_made"] + stats["cache_hits"]) > 0 else 0
+                cache_hits / (stats["requests_made"] + cache_hits)
+                if (stats["requests_made"] + cache_hits) > 0 else 0
             )
         
+        # 持久化缓存的累计统计（所有实例和进程共享）
+        stats["cache"] = self.cache.get_stats()
+        # 当前限速与自适应并发上限
+        stats["limits"] = {
+            "rate": self.rate_limiter.get_stats(),
+            "concurrency": self.concurrency_limiter.get_stats(),
+            "max_retries": self.max_retries,
+            "backoff_base": self.rate_limit_delay,
+        }
+        stats["session_open"] = bool(self.session and not self.session.closed)
+        # 各操作的请求数、重试、流量与延迟分布
+        stats["operations"] = {
+            name: {**op, "latency": op["latency"].to_dict()}
+            for name, op in sorted(self.operation_stats.items())
+        }
         return stats
     
     def clear_cache(self):
@@ -958,7 +1126,7 @@ class CrawlerService:
             """
             
             payload = {"query": query}
-            response_data = await self._make_request_with_retry(payload)
+            response_data = await self._make_request_with_retry(payload, operation="health_check")
             
             if "data" in response_data:
                 return {
@@ -978,4 +1146,27 @@ class CrawlerService:
                 "success": False,
                 "status": "error",
                 "message": f"健康检查失败: {str(e)}"
-            }
\ No newline at end of file
+            }
+
+
+_shared_crawler: Optional[CrawlerService] = None
+
+
+async def get_shared_crawler() -> CrawlerService:
+    """获取进程内长期运行的共享爬虫，所有接口复用同一个连接池并累计统计"""
+    global _shared_crawler
+    if _shared_crawler is None:
+        _shared_crawler = CrawlerService()
+    await _shared_crawler.start()
+    return _shared_crawler
+
+
+async def close_shared_crawler():
+    """关闭共享爬虫的连接池（应用关闭时调用）"""
+    if _shared_crawler is not None:
+        await _shared_crawler.close()
+
+
+def _is_cacheable(data: Dict[str, Any]) -> bool:
+    """只缓存成功且带 data 的 GraphQL 响应"""
+    return isinstance(data, dict) and data.get("data") is not None and not data.get("errors")
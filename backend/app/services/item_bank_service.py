@@ -0,0 +1,212 @@
+"""
+面试题 IRT 题库
+由历史答题记录批量标定每道题的 2PL 参数并写入 interview_item_params，内存中以 numpy 数组保存整个题库供自适应出题；
+还没有答题记录的题目使用先验参数（区分度 1，难度按题目标注的难度取 -1 / 0 / 1）。
+答题记录只有得分没有作答者，按练习日期把同一天的答题视为同一作答者（能力在一天内近似不变），得分达到良好线记为答对。
+标定可按 cron 表达式定时运行
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from ..models.interview import InterviewQuestion, VoiceAnswer
+from ..models.adaptive_session import InterviewItemParam
+from ..core.database import SessionLocal
+from ..utils.cron import CronSchedule
+from ..utils.irt import fit_2pl, information
+
+# 记为答对的最低得分（与「良好」等级一致）
+PASS_SCORE = 70
+# 题目标注难度对应的先验难度
+PRIOR_DIFFICULTY = {
+    "简单": -1.0, "初级": -1.0, "Easy": -1.0,
+    "中等": 0.0, "中级": 0.0, "Medium": 0.0,
+    "困难": 1.0, "高级": 1.0, "Hard": 1.0,
+}
+
+
+def prior_difficulty(label: Optional[str]) -> float:
+    return PRIOR_DIFFICULTY.get(label or "", 0.0)
+
+
+class ItemBankService:
+    """IRT 题库与定时标定"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.question_ids = np.zeros(0, dtype=np.int64)
+        self.discrimination = np.zeros(0)
+        self.difficulty = np.zeros(0)
+        self.categories = np.zeros(0, dtype=object)
+        self._positions: Dict[int, int] = {}
+        self.calibrated_count = 0
+        self.last_calibration: Optional[Dict[str, Any]] = None
+        self._scheduler: Optional[asyncio.Task] = None
+        self.schedule: Optional[CronSchedule] = None
+        self.next_run: Optional[datetime] = None
+
+    def load(self):
+        """加载启用的题目及其标定参数，未标定的题目取先验"""
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                InterviewQuestion.id, InterviewQuestion.category, InterviewQuestion.difficulty,
+                InterviewItemParam.discrimination, InterviewItemParam.difficulty,
+            ).outerjoin(
+                InterviewItemParam, InterviewItemParam.question_id == InterviewQuestion.id
+            ).filter(InterviewQuestion.is_active == True).order_by(InterviewQuestion.id).all()
+        finally:
+            db.close()
+        question_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        discrimination = np.array([row[3] if row[3] is not None else 1.0 for row in rows], dtype=np.float64)
+        difficulty = np.array([row[4] if row[4] is not None else prior_difficulty(row[2]) for row in rows], dtype=np.float64)
+        categories = np.array([row[1] for row in rows], dtype=object)
+        with self._lock:
+            self.question_ids, self.discrimination, self.difficulty, self.categories = (
+                question_ids, discrimination, difficulty, categories
+            )
+            self._positions = {int(question_id): position for position, question_id in enumerate(question_ids)}
+            self.calibrated_count = sum(1 for row in rows if row[3] is not None)
+            self._loaded = True
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def invalidate(self):
+        """题目编辑后调用，下次出题时重新加载"""
+        self._loaded = False
+
+    def params(self, question_id: int) -> Tuple[float, float]:
+        """题目的 (区分度, 难度)；不在题库中时返回先验"""
+        self.ensure_loaded()
+        with self._lock:
+            position = self._positions.get(question_id)
+            if position is None:
+                return 1.0, 0.0
+            return float(self.discrimination[position]), float(self.difficulty[position])
+
+    def select(self, ability: float, exclude: Iterable[int], category: Optional[str] = None) -> Optional[int]:
+        """在能力 ability 处信息量最大的题目；exclude 中的题目与其他分类的题目不参与"""
+        self.ensure_loaded()
+        with self._lock:
+            question_ids, a, b, categories, positions = (
+                self.question_ids, self.discrimination, self.difficulty, self.categories, self._positions
+            )
+        if not question_ids.size:
+            return None
+        info = information(ability, a, b)
+        if category:
+            info = np.where(categories == category, info, -1.0)
+        excluded = [positions[question_id] for question_id in exclude if question_id in positions]
+        if excluded:
+            info[excluded] = -1.0
+        best = int(np.argmax(info))
+        return int(question_ids[best]) if info[best] >= 0 else None
+
+    def calibrate(self) -> Dict[str, Any]:
+        """用全部答题记录标定题目参数并写库，然后刷新内存中的题库"""
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            questions = db.query(InterviewQuestion.id, InterviewQuestion.difficulty).filter(
+                InterviewQuestion.is_active == True
+            ).order_by(InterviewQuestion.id).all()
+            answers = db.query(VoiceAnswer.question_id, VoiceAnswer.quality_score, VoiceAnswer.created_at).filter(
+                VoiceAnswer.quality_score.isnot(None)
+            ).all()
+
+            item_index = {question_id: index for index, (question_id, _) in enumerate(questions)}
+            day_index: Dict[Any, int] = {}
+            person, item, correct = [], [], []
+            for question_id, score, created_at in answers:
+                index = item_index.get(question_id)
+                if index is None:
+                    continue
+                day = created_at.date() if created_at else None
+                person.append(day_index.setdefault(day, len(day_index)))
+                item.append(index)
+                correct.append(score >= PASS_SCORE)
+
+            item_array = np.array(item, dtype=np.int64)
+            result = fit_2pl(
+                np.array(person, dtype=np.int64), item_array, np.array(correct, dtype=bool),
+                len(day_index), len(questions),
+                np.array([prior_difficulty(label) for _, label in questions], dtype=np.float64),
+            )
+            responses = np.bincount(item_array, minlength=len(questions))
+
+            now = datetime.utcnow()
+            db.query(InterviewItemParam).delete()
+            db.bulk_insert_mappings(InterviewItemParam, [
+                {
+                    "question_id": question_id,
+                    "discrimination": round(float(result["discrimination"][index]), 4),
+                    "difficulty": round(float(result["difficulty"][index]), 4),
+                    "responses": int(responses[index]),
+                    "calibrated_at": now,
+                }
+                for index, (question_id, _) in enumerate(questions)
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.load()
+        self.last_calibration = {
+            "questions": len(questions),
+            "responses": len(item),
+            "sessions": len(day_index),
+            "iterations": result["iterations"],
+            "calibrated_at": now.isoformat(),
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+        return self.last_calibration
+
+    def get_stats(self) -> Dict[str, Any]:
+        self.ensure_loaded()
+        with self._lock:
+            return {
+                "questions": int(self.question_ids.size),
+                "calibrated": self.calibrated_count,
+                "last_calibration": self.last_calibration,
+                "schedule": {
+                    "expression": self.schedule.expression,
+                    "next_run": self.next_run.isoformat() if self.next_run else None,
+                } if self.schedule else None,
+            }
+
+    def start_scheduler(self, expression: str):
+        """按 cron 表达式定时标定；表达式为空时不启用"""
+        if not expression:
+            return
+        self.schedule = CronSchedule(expression)
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.ensure_future(self._schedule_loop())
+
+    async def _schedule_loop(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            now = datetime.now()
+            self.next_run = self.schedule.next_after(now)
+            await asyncio.sleep((self.next_run - now).total_seconds())
+            try:
+                stats = await loop.run_in_executor(None, self.calibrate)
+                print(f"定时题目标定完成：{stats['questions']} 道题，{stats['responses']} 条答题记录")
+            except Exception as e:
+                self.logger.error(f"定时题目标定失败: {str(e)}")
+
+    def shutdown(self):
+        if self._scheduler is not None:
+            self._scheduler.cancel()
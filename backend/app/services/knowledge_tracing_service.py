@@ -0,0 +1,291 @@
+"""
+知识点掌握度（贝叶斯知识追踪）
+每个标签维护一个掌握概率 L，每次作答（刷题提交是否通过、面试回答是否达到良好）按 BKT 先做后验更新再计入学习转移：
+    答对: L ← L(1-S) / (L(1-S) + (1-L)G)，答错: L ← LS / (LS + (1-L)(1-G))，然后 L ← L + (1-L)T
+刷题提交与面试答题写入时逐个标签增量更新，读取掌握度即查表。
+两步更新都是线性变换作用于 (已掌握, 未掌握) 的非归一化概率（即隐马尔可夫前向算法），一个标签的全部历史就是 2×2 非负矩阵连乘；
+全量重放把所有事件按 (标签, 时间) 排序后对矩阵数组做分段倍增前缀积，O(log n) 次向量化运算得到每个标签的最终状态
+"""
+
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..models.problem import LeetCodeProblem, ProblemSubmission
+from ..models.interview import InterviewQuestion, VoiceAnswer
+from ..models.knowledge_mastery import KnowledgeMastery
+from ..core.database import SessionLocal
+from ..utils.keypoint_matcher import parse_list_field
+from .tag_taxonomy import TAG_ALIASES, tag_slug
+from .item_bank_service import PASS_SCORE
+
+# BKT 参数：初始掌握、学习转移、失误、猜对
+P_INIT = 0.2
+P_TRANSIT = 0.1
+P_SLIP = 0.1
+P_GUESS = 0.25
+# 掌握度等级
+MASTERED_THRESHOLD = 0.95
+FAMILIAR_THRESHOLD = 0.6
+
+SOURCES = ("leetcode", "interview")
+
+
+def mastery_tag(tag: Any) -> str:
+    """标签键：LeetCode 标签（英文名或已知中文名）统一为 slug，使中英文站点的同一标签合并；其余标签保留原名"""
+    name = str(tag.get("name", "") if isinstance(tag, dict) else tag).strip()
+    if isinstance(tag, dict) or name in TAG_ALIASES or name.isascii():
+        return tag_slug(tag) or name
+    return name
+
+
+def bkt_update(mastery: float, correct: bool) -> float:
+    """一次作答后的掌握概率"""
+    if correct:
+        posterior = mastery * (1 - P_SLIP) / (mastery * (1 - P_SLIP) + (1 - mastery) * P_GUESS)
+    else:
+        posterior = mastery * P_SLIP / (mastery * P_SLIP + (1 - mastery) * (1 - P_GUESS))
+    return posterior + (1 - posterior) * P_TRANSIT
+
+
+def _step_matrix(correct: bool) -> np.ndarray:
+    """bkt_update 的矩阵形式：左乘 (L, 1-L) 后按两分量之和归一化即新的 L；矩阵元素均非负，连乘不会出现相消"""
+    if correct:
+        evidence = np.diag([1 - P_SLIP, P_GUESS])
+    else:
+        evidence = np.diag([P_SLIP, 1 - P_GUESS])
+    transit = np.array([[1.0, P_TRANSIT], [0.0, 1 - P_TRANSIT]])
+    return transit @ evidence
+
+
+def mastery_level(mastery: float) -> str:
+    return "已掌握" if mastery >= MASTERED_THRESHOLD else "熟悉" if mastery >= FAMILIAR_THRESHOLD else "薄弱"
+
+
+def replay_mastery(tag_ids: np.ndarray, correct: np.ndarray, n_tags: int) -> np.ndarray:
+    """
+    按顺序重放全部事件，返回每个标签的掌握概率（没有事件的标签为 P_INIT）
+    tag_ids / correct 为等长数组，同一标签内须已按时间排序
+    """
+    result = np.full(n_tags, P_INIT)
+    count = tag_ids.size
+    if not count:
+        return result
+    order = np.argsort(tag_ids, kind="stable")
+    tag_ids, correct = tag_ids[order], correct[order]
+    matrices = np.where(correct[:, None, None], _step_matrix(True), _step_matrix(False))
+
+    positions = np.arange(count)
+    is_start = np.ones(count, dtype=bool)
+    is_start[1:] = tag_ids[1:] != tag_ids[:-1]
+    segment_start = np.maximum.accumulate(np.where(is_start, positions, 0))
+    longest = int((positions - segment_start).max()) + 1
+
+    # 分段倍增前缀积：第 k 轮后 matrices[i] 为本段内 (i-2^k, i] 的事件按时间顺序的复合
+    step = 1
+    while step < longest:
+        targets = np.nonzero(positions - step >= segment_start)[0]
+        combined = matrices[targets] @ matrices[targets - step]
+        combined /= combined.max(axis=(1, 2), keepdims=True)
+        matrices[targets] = combined
+        step <<= 1
+
+    is_end = np.ones(count, dtype=bool)
+    is_end[:-1] = is_start[1:]
+    final = matrices[is_end]
+    mastered = final[:, 0, 0] * P_INIT + final[:, 0, 1] * (1 - P_INIT)
+    unmastered = final[:, 1, 0] * P_INIT + final[:, 1, 1] * (1 - P_INIT)
+    result[tag_ids[is_end]] = mastered / (mastered + unmastered)
+    return result
+
+
+class KnowledgeTracingService:
+    """标签掌握度追踪"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def observe(self, db: Session, tags: Iterable[Any], correct: bool, source: str,
+                at: Optional[datetime] = None):
+        """记录一次作答涉及的各标签（只写入会话，由调用方提交）"""
+        self.observe_many(db, [(tags, correct, source, at)])
+
+    def observe_many(self, db: Session, events: List[Tuple[Iterable[Any], bool, str, Optional[datetime]]]):
+        """按顺序记录多次作答 (标签, 是否答对, 来源, 时间)，涉及的标签状态一次查询取出"""
+        keyed = []
+        for tags, correct, source, at in events:
+            keys = [tag for tag in dict.fromkeys(mastery_tag(tag) for tag in tags) if tag]
+            if keys:
+                keyed.append((keys, correct, source, at or datetime.utcnow()))
+        if not keyed:
+            return
+        names = {tag for keys, _, _, _ in keyed for tag in keys}
+        states = {
+            state.tag: state
+            for state in db.query(KnowledgeMastery).filter(KnowledgeMastery.tag.in_(names)).all()
+        }
+        for keys, correct, source, at in keyed:
+            for tag in keys:
+                state = states.get(tag)
+                if state is None:
+                    state = states[tag] = KnowledgeMastery(
+                        tag=tag, mastery=P_INIT, observations=0, correct=0,
+                        leetcode_observations=0, interview_observations=0,
+                    )
+                    db.add(state)
+                state.mastery = bkt_update(state.mastery, correct)
+                state.observations += 1
+                state.correct += 1 if correct else 0
+                if source == "leetcode":
+                    state.leetcode_observations += 1
+                else:
+                    state.interview_observations += 1
+                state.last_event_at = at
+
+    def observe_submission(self, db: Session, problem_id: Optional[int], is_accepted: bool,
+                           at: Optional[datetime] = None):
+        """刷题提交：按题目标签更新"""
+        if not problem_id:
+            return
+        tags = db.query(LeetCodeProblem.tags).filter(LeetCodeProblem.id == problem_id).scalar()
+        self.observe(db, parse_list_field(tags), bool(is_accepted), "leetcode", at)
+
+    def observe_answer(self, db: Session, question: Optional[InterviewQuestion], score: float,
+                       at: Optional[datetime] = None):
+        """面试回答：按题目标签更新，得分达到良好线记为答对"""
+        if question is None:
+            return
+        self.observe(db, parse_list_field(question.tags), score >= PASS_SCORE, "interview", at)
+
+    def get_mastery(self, db: Session, min_observations: int = 1) -> List[Dict[str, Any]]:
+        rows = db.query(KnowledgeMastery).filter(
+            KnowledgeMastery.observations >= min_observations
+        ).order_by(KnowledgeMastery.mastery.desc(), KnowledgeMastery.tag).all()
+        return [
+            {
+                "tag": row.tag,
+                "mastery": round(row.mastery, 4),
+                "level": mastery_level(row.mastery),
+                "observations": row.observations,
+                "correct": row.correct,
+                "sources": {"leetcode": row.leetcode_observations, "interview": row.interview_observations},
+                "last_event_at": row.last_event_at.isoformat() if row.last_event_at else None,
+            }
+            for row in rows
+        ]
+
+    def replay(self) -> Dict[str, Any]:
+        """由全部刷题提交与面试答题记录重建所有标签的掌握度"""
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            tags, item_tags, events = self._load_events(db)
+            tag_count = len(tags)
+            if events:
+                event_items = np.array([event[1] for event in events], dtype=np.int64)
+                event_correct = np.array([event[2] for event in events], dtype=bool)
+                event_source = np.array([event[3] for event in events], dtype=np.int64)
+
+                # 每个事件按其题目的标签数展开为 (标签, 事件) 对，保持事件的时间顺序
+                indptr, tag_ids = item_tags
+                counts = indptr[event_items + 1] - indptr[event_items]
+                pair_event = np.repeat(np.arange(len(events)), counts)
+                offsets = np.arange(pair_event.size) - np.repeat(np.cumsum(counts) - counts, counts)
+                pair_tag = tag_ids[np.repeat(indptr[event_items], counts) + offsets]
+                pair_correct = event_correct[pair_event]
+
+                mastery = replay_mastery(pair_tag, pair_correct, tag_count)
+                observations = np.bincount(pair_tag, minlength=tag_count)
+                correct_counts = np.bincount(pair_tag, weights=pair_correct, minlength=tag_count)
+                by_source = [
+                    np.bincount(pair_tag[event_source[pair_event] == index], minlength=tag_count)
+                    for index in range(len(SOURCES))
+                ]
+                last_event = np.full(tag_count, -1, dtype=np.int64)
+                np.maximum.at(last_event, pair_tag, pair_event)
+            else:
+                observations = np.zeros(tag_count, dtype=np.int64)
+
+            now = datetime.utcnow()
+            db.query(KnowledgeMastery).delete()
+            db.bulk_insert_mappings(KnowledgeMastery, [
+                {
+                    "tag": tag,
+                    "mastery": float(mastery[index]),
+                    "observations": int(observations[index]),
+                    "correct": int(correct_counts[index]),
+                    "leetcode_observations": int(by_source[0][index]),
+                    "interview_observations": int(by_source[1][index]),
+                    "last_event_at": events[last_event[index]][0],
+                    "updated_at": now,
+                }
+                for index, tag in enumerate(tags) if observations[index]
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return {
+            "events": len(events),
+            "tags": int(np.count_nonzero(observations)),
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+
+    def needs_replay(self) -> bool:
+        """已有作答记录但还没有掌握度（功能上线前的历史数据）时需要全量重放"""
+        db = SessionLocal()
+        try:
+            if db.query(KnowledgeMastery.tag).first() is not None:
+                return False
+            return (db.query(ProblemSubmission.id).first() is not None
+                    or db.query(VoiceAnswer.id).first() is not None)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _load_events(db: Session) -> Tuple[List[str], Tuple[np.ndarray, np.ndarray], List[Tuple]]:
+        """
+        读取全部事件，返回 (标签列表, 题目→标签的 CSR 表, 按时间排序的事件)
+        事件为 (时间, 题目序号, 是否答对, 来源序号)，刷题题目与面试题统一编号
+        """
+        tag_index: Dict[str, int] = {}
+        item_index: Dict[Tuple[str, int], int] = {}
+        indptr = [0]
+        tag_ids: List[int] = []
+
+        def add_items(source: str, rows):
+            for item_id, raw_tags in rows:
+                item_index[(source, item_id)] = len(item_index)
+                for tag in dict.fromkeys(mastery_tag(tag) for tag in parse_list_field(raw_tags)):
+                    if tag:
+                        tag_ids.append(tag_index.setdefault(tag, len(tag_index)))
+                indptr.append(len(tag_ids))
+
+        add_items("leetcode", db.query(LeetCodeProblem.id, LeetCodeProblem.tags).all())
+        add_items("interview", db.query(InterviewQuestion.id, InterviewQuestion.tags).all())
+
+        events = []
+        for problem_id, is_accepted, created_at in db.query(
+            ProblemSubmission.problem_id, ProblemSubmission.is_accepted, ProblemSubmission.created_at
+        ).all():
+            item = item_index.get(("leetcode", problem_id))
+            if item is not None:
+                events.append((created_at or datetime.min, item, bool(is_accepted), 0))
+        for question_id, score, created_at in db.query(
+            VoiceAnswer.question_id, VoiceAnswer.quality_score, VoiceAnswer.created_at
+        ).filter(VoiceAnswer.quality_score.isnot(None)).all():
+            item = item_index.get(("interview", question_id))
+            if item is not None:
+                events.append((created_at or datetime.min, item, score >= PASS_SCORE, 1))
+        events.sort(key=lambda event: event[0])
+
+        tags = [None] * len(tag_index)
+        for tag, index in tag_index.items():
+            tags[index] = tag
+        return tags, (np.array(indptr, dtype=np.int64), np.array(tag_ids, dtype=np.int64)), events
@@ -10,7 +10,14 @@ from ..models.problem import (
     LeetCodeProblem, ProblemSubmission, StudyPlan, DailyProgress,
     DifficultyEnum
 )
+from ..models.problem_list import ProblemList
+from ..models.problem_content import ProblemContent
+from ..models.problem_tag_label import ProblemTagLabel
 from ..core.database import get_db
+from ..utils.bitmap import (
+    ids_to_bitmap, bitmap_to_ids, popcount, bitmap_to_bytes, bitmap_from_bytes
+)
+from .knowledge_tracing_service import KnowledgeTracingService
 
 
 class LeetCodeService:
@@ -18,6 +25,10 @@ class LeetCodeService:
     
     def __init__(self):
         self.db = next(get_db())
+        # 题单位图缓存，避免每次统计进度都解码；已完成位图每次请求从提交记录构建，其他进程的提交也能反映
+        self._list_bitmaps: Dict[int, int] = {}
+        self._all_lists_loaded = False
+        self.knowledge_service = KnowledgeTracingService()
     
     # 题目管理
     def get_problems(
@@ -35,7 +46,9 @@ class LeetCodeService:
         if difficulty:
             query = query.filter(LeetCodeProblem.difficulty == difficulty)
         if category:
-            query = query.filter(LeetCodeProblem.category == category)
+            # 多分类：主分类或分类标签中包含该分类的题目都算
+            labeled = self.db.query(ProblemTagLabel.problem_id).filter(ProblemTagLabel.category == category)
+            query = query.filter(or_(LeetCodeProblem.category == category, LeetCodeProblem.id.in_(labeled)))
         if search_keyword:
             query = query.filter(
                 or_(
@@ -96,6 +109,8 @@ class LeetCodeService:
             "category": p.category,
             "tags": p.tags if isinstance(p.tags, list) else (eval(p.tags) if p.tags else []),
             "content": p.content,
+            "content_markdown": self._get_content_markdown(p.id),
+            "categories": self._get_categories(p.id),
             "hints": p.hints if isinstance(p.hints, list) else (eval(p.hints) if p.hints else []),
             "acceptance_rate": p.acceptance_rate,
             "frequency": p.frequency,
@@ -104,6 +119,18 @@ class LeetCodeService:
             "is_completed": any(s.is_accepted for s in p.submissions) if p.submissions else False
         }
     
+    def _get_content_markdown(self, problem_id: int) -> Optional[str]:
+        """入库时已规范化的 Markdown 内容，没有原始 HTML 的题目返回 None"""
+        row = self.db.query(ProblemContent.markdown).filter(ProblemContent.problem_id == problem_id).first()
+        return row[0] if row else None
+    
+    def _get_categories(self, problem_id: int) -> List[Dict[str, Any]]:
+        """题目的全部分类及权重，按权重降序"""
+        rows = self.db.query(ProblemTagLabel.category, ProblemTagLabel.weight).filter(
+            ProblemTagLabel.problem_id == problem_id
+        ).order_by(ProblemTagLabel.weight.desc()).all()
+        return [{"category": category, "weight": weight} for category, weight in rows]
+    
     def get_problem_by_leetcode_id(self, leetcode_id: int):
         """根据LeetCode ID获取题目"""
         return self.db.query(LeetCodeProblem).filter(LeetCodeProblem.leetcode_id == leetcode_id).first()
@@ -162,6 +189,7 @@ class LeetCodeService:
             attempt_count=submission_data.get("attempt_count", 1),
         )
         self.db.add(submission)
+        self.knowledge_service.observe_submission(self.db, submission.problem_id, submission.is_accepted)
         self.db.commit()
         self.db.refresh(submission)
         
@@ -273,10 +301,16 @@ class LeetCodeService:
         }
     
     # 推荐系统
-    def get_recommended_problems(self, count: int = 5) -> List[Dict]:
-        """获取推荐题目"""
+    def get_recommended_problems(self, count: int = 5, category: Optional[str] = None) -> List[Dict]:
+        """获取推荐题目；指定分类时按该分类的标签权重从高到低推荐（最能代表该考点的题目优先）"""
+        query = self.db.query(LeetCodeProblem)
+        if category:
+            query = query.join(ProblemTagLabel, ProblemTagLabel.problem_id == LeetCodeProblem.id).filter(
+                ProblemTagLabel.category == category
+            ).order_by(ProblemTagLabel.weight.desc(), LeetCodeProblem.id)
+        
         # 获取未完成的题目
-        uncompleted = self.db.query(LeetCodeProblem).filter(
+        uncompleted = query.filter(
             ~LeetCodeProblem.submissions.any(ProblemSubmission.is_accepted == True)
         ).limit(count).all()
         
@@ -284,7 +318,7 @@ class LeetCodeService:
         if len(uncompleted) < count:
             remaining = count - len(uncompleted)
             existing_ids = [p.id for p in uncompleted]
-            more = self.db.query(LeetCodeProblem).filter(
+            more = query.filter(
                 ~LeetCodeProblem.id.in_(existing_ids) if existing_ids else True
             ).limit(remaining).all()
             uncompleted.extend(more)
@@ -327,7 +361,178 @@ class LeetCodeService:
             "category": p.category,
         }
     
+    # 题单管理
+    def get_problem_lists(self, with_progress: bool = True) -> List[Dict[str, Any]]:
+        """获取所有题单"""
+        lists = self.db.query(ProblemList).order_by(ProblemList.id).all()
+        solved = self._get_solved_bitmap() if with_progress else 0
+        return [self._serialize_problem_list(pl, solved if with_progress else None) for pl in lists]
+    
+    def get_problem_list(self, list_id: int, include_problems: bool = True) -> Optional[Dict[str, Any]]:
+        """获取题单详情"""
+        pl = self.db.query(ProblemList).filter(ProblemList.id == list_id).first()
+        if not pl:
+            return None
+        
+        solved = self._get_solved_bitmap()
+        result = self._serialize_problem_list(pl, solved)
+        if include_problems:
+            bitmap = self._get_list_bitmap(pl)
+            problem_ids = bitmap_to_ids(bitmap)
+            problems = self.db.query(LeetCodeProblem).filter(
+                LeetCodeProblem.id.in_(problem_ids)
+            ).order_by(LeetCodeProblem.leetcode_id).all() if problem_ids else []
+            result["problems"] = [{
+                "id": p.id,
+                "leetcode_id": p.leetcode_id,
+                "title": p.title,
+                "title_slug": p.title_slug,
+                "difficulty": p.difficulty,
+                "category": p.category,
+                "is_completed": bool(solved >> p.id & 1)
+            } for p in problems]
+        return result
+    
+    def create_problem_list(self, list_data: Dict[str, Any]) -> Dict[str, Any]:
+        """创建题单"""
+        name = (list_data.get("name") or "").strip()
+        if not name:
+            raise ValueError("题单名称不能为空")
+        if self.db.query(ProblemList).filter(ProblemList.name == name).first():
+            raise ValueError(f"题单已存在: {name}")
+        
+        bitmap = ids_to_bitmap(self._resolve_list_problem_ids(list_data))
+        pl = ProblemList(
+            name=name,
+            description=list_data.get("description"),
+            source=list_data.get("source", "custom"),
+            bitmap=bitmap_to_bytes(bitmap),
+            problem_count=popcount(bitmap)
+        )
+        self.db.add(pl)
+        self.db.commit()
+        self.db.refresh(pl)
+        self._list_bitmaps[pl.id] = bitmap
+        return self._serialize_problem_list(pl, self._get_solved_bitmap())
+    
+    def update_problem_list(self, list_id: int, list_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """更新题单
+        
+        problem_ids/leetcode_ids 整体替换题目集合，add_ids/remove_ids 增量修改（题目ID）
+        """
+        pl = self.db.query(ProblemList).filter(ProblemList.id == list_id).first()
+        if not pl:
+            return None
+        
+        if "name" in list_data:
+            name = (list_data.get("name") or "").strip()
+            if not name:
+                raise ValueError("题单名称不能为空")
+            duplicate = self.db.query(ProblemList).filter(
+                and_(ProblemList.name == name, ProblemList.id != list_id)
+            ).first()
+            if duplicate:
+                raise ValueError(f"题单已存在: {name}")
+            pl.name = name
+        for field in ["description", "source"]:
+            if field in list_data:
+                setattr(pl, field, list_data[field])
+        
+        bitmap = self._get_list_bitmap(pl)
+        if "problem_ids" in list_data or "leetcode_ids" in list_data:
+            bitmap = ids_to_bitmap(self._resolve_list_problem_ids(list_data))
+        bitmap |= ids_to_bitmap(list_data.get("add_ids") or [])
+        bitmap &= ~ids_to_bitmap(list_data.get("remove_ids") or [])
+        
+        pl.bitmap = bitmap_to_bytes(bitmap)
+        pl.problem_count = popcount(bitmap)
+        pl.updated_at = datetime.utcnow()
+        self.db.commit()
+        self.db.refresh(pl)
+        self._list_bitmaps[pl.id] = bitmap
+        return self._serialize_problem_list(pl, self._get_solved_bitmap())
+    
+    def delete_problem_list(self, list_id: int) -> bool:
+        """删除题单"""
+        pl = self.db.query(ProblemList).filter(ProblemList.id == list_id).first()
+        if not pl:
+            return False
+        self.db.delete(pl)
+        self.db.commit()
+        self._list_bitmaps.pop(list_id, None)
+        return True
+    
+    def get_problem_lists_progress(self) -> Dict[int, Dict[str, Any]]:
+        """获取所有题单的完成进度
+        
+        进度 = popcount(题单位图 & 已完成位图)，题单位图常驻内存，不做关联查询
+        """
+        if not self._all_lists_loaded:
+            for pl in self.db.query(ProblemList).all():
+                self._get_list_bitmap(pl)
+            self._all_lists_loaded = True
+        
+        solved = self._get_solved_bitmap()
+        progress = {}
+        for list_id, bitmap in self._list_bitmaps.items():
+            total = popcount(bitmap)
+            completed = popcount(bitmap & solved)
+            progress[list_id] = {
+                "total": total,
+                "completed": completed,
+                "completion_rate": round(completed / total, 2) if total > 0 else 0
+            }
+        return progress
+    
     # 私有方法
+    def _get_solved_bitmap(self) -> int:
+        """从提交记录构建已完成题目位图；不跨请求缓存，提交可能由其他进程写入"""
+        rows = self.db.query(ProblemSubmission.problem_id).filter(
+            ProblemSubmission.is_accepted == True
+        ).distinct().all()
+        return ids_to_bitmap(pid for (pid,) in rows)
+    
+    def _get_list_bitmap(self, pl: ProblemList) -> int:
+        """获取题单位图（带缓存）"""
+        bitmap = self._list_bitmaps.get(pl.id)
+        if bitmap is None:
+            bitmap = bitmap_from_bytes(pl.bitmap)
+            self._list_bitmaps[pl.id] = bitmap
+        return bitmap
+    
+    def _resolve_list_problem_ids(self, list_data: Dict[str, Any]) -> List[int]:
+        """解析题单题目：problem_ids 为题目ID，leetcode_ids 为LeetCode题号"""
+        problem_ids = list(list_data.get("problem_ids") or [])
+        leetcode_ids = list_data.get("leetcode_ids") or []
+        if leetcode_ids:
+            rows = self.db.query(LeetCodeProblem.id).filter(
+                LeetCodeProblem.leetcode_id.in_(leetcode_ids)
+            ).all()
+            problem_ids.extend(pid for (pid,) in rows)
+        return [int(pid) for pid in problem_ids]
+    
+    def _serialize_problem_list(self, pl: ProblemList, solved: Optional[int]) -> Dict[str, Any]:
+        """序列化题单"""
+        result = {
+            "id": pl.id,
+            "name": pl.name,
+            "description": pl.description,
+            "source": pl.source,
+            "total": pl.problem_count or 0,
+            "created_at": pl.created_at.isoformat() if pl.created_at else None,
+            "updated_at": pl.updated_at.isoformat() if pl.updated_at else None
+        }
+        if solved is not None:
+            bitmap = self._get_list_bitmap(pl)
+            total = popcount(bitmap)
+            completed = popcount(bitmap & solved)
+            result.update({
+                "total": total,
+                "completed": completed,
+                "completion_rate": round(completed / total, 2) if total > 0 else 0
+            })
+        return result
+    
     def _update_daily_progress(self, date):
         """更新每日进度"""
         from datetime import datetime as dt
@@ -0,0 +1,270 @@
+"""
+面试题库检索
+对题目标题、内容、标签与要点建进程内倒排索引：中文按二元组、英文按整词切分（与参考答案相似度共用切词），
+倒排表为升序 int 数组，多词查询以 galloping 求交得到同时包含全部词项的题目，再按字段加权的 BM25 排序。
+题目编辑后只更新该题涉及的倒排表，IDF 与平均长度随之即时生效，无需整体重建
+"""
+
+import gc
+import hashlib
+import math
+import threading
+import time
+import logging
+from array import array
+from collections import Counter
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from ..models.interview import InterviewQuestion
+from ..core.database import SessionLocal
+from ..utils.keypoint_matcher import parse_list_field
+from ..utils.postings import intersect_all, new_postings, postings_add, postings_remove, union_all
+from ..utils.text_tokens import iter_terms
+
+# 各字段词频的权重
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "key_points": 2.0, "content": 1.0}
+
+
+class _IndexedQuestion:
+    __slots__ = ("fingerprint", "terms", "length", "category", "difficulty", "importance")
+
+    def __init__(self, fingerprint: str, terms: Dict[str, float], category: Optional[str],
+                 difficulty: Optional[str], importance: Optional[int]):
+        self.fingerprint = fingerprint
+        self.terms = terms  # 词项 -> 字段加权词频
+        self.length = sum(terms.values())
+        self.category = category
+        self.difficulty = difficulty
+        self.importance = importance or 0
+
+
+def _is_cjk_bigram(term: str) -> bool:
+    return len(term) == 2 and not term.isascii()
+
+
+class QuestionSearchIndex:
+    """面试题倒排索引"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.logger = logging.getLogger(__name__)
+        self._postings: Dict[str, array] = {}
+        # 单个汉字 -> 含该字的二元组，单字查询时合并这些倒排表
+        self._char_terms: Dict[str, Set[str]] = {}
+        self._docs: Dict[int, _IndexedQuestion] = {}
+        self._total_length = 0.0
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.last_load: Optional[Dict[str, Any]] = None
+
+    def load(self) -> Dict[str, int]:
+        """从题库加载全部启用的题目；首次加载整体构建倒排表，之后只处理有变化的题目"""
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            questions = db.query(InterviewQuestion).all()
+        finally:
+            db.close()
+        stats = {"indexed": 0, "removed": 0}
+        with self._lock:
+            if not self._docs:
+                stats["indexed"] = self._build(questions)
+            else:
+                current = set()
+                for question in questions:
+                    current.add(question.id)
+                    if self.update(question):
+                        stats["indexed"] += 1
+                for question_id in [qid for qid in self._docs if qid not in current]:
+                    self.remove(question_id)
+                    stats["removed"] += 1
+            self._loaded = True
+        self.last_load = dict(stats, seconds=round(time.perf_counter() - start, 4))
+        return stats
+
+    def ensure_loaded(self):
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+    def update(self, question: InterviewQuestion) -> bool:
+        """题目新增或编辑后调用；停用的题目移出索引。返回索引是否有变化"""
+        with self._lock:
+            old = self._docs.get(question.id)
+            doc = self._make_doc(question, old)
+            if doc is old:
+                return False
+            if doc is None:
+                self.remove(question.id)
+                return True
+            old_terms = old.terms if old is not None else {}
+            for term in old_terms:
+                if term not in doc.terms:
+                    self._drop_posting(term, question.id)
+            for term in doc.terms:
+                if term not in old_terms:
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = new_postings()
+                        self._register_term(term)
+                    postings_add(postings, question.id)
+            self._total_length += doc.length - (old.length if old is not None else 0)
+            self._docs[question.id] = doc
+            return True
+
+    def remove(self, question_id: int):
+        with self._lock:
+            doc = self._docs.pop(question_id, None)
+            if doc is None:
+                return
+            for term in doc.terms:
+                self._drop_posting(term, question_id)
+            self._total_length -= doc.length
+
+    def search(self, query: str, category: Optional[str] = None,
+               difficulty: Optional[str] = None) -> List[Tuple[float, int]]:
+        """返回同时包含查询全部词项的题目 [(得分, 题目 ID)]，按得分降序、ID 升序"""
+        self.ensure_loaded()
+        query_terms = list(dict.fromkeys(iter_terms(query)))
+        if not query_terms:
+            return []
+        with self._lock:
+            groups = []
+            for term in query_terms:
+                concrete = self._expand(term)
+                if not concrete:
+                    return []
+                postings = union_all([self._postings[name] for name in concrete])
+                groups.append((concrete, postings))
+            candidates = intersect_all([postings for _, postings in groups])
+
+            doc_count = len(self._docs)
+            avg_length = self._total_length / doc_count if doc_count else 1.0
+            idfs = [math.log1p((doc_count - len(postings) + 0.5) / (len(postings) + 0.5)) for _, postings in groups]
+            docs = self._docs
+            if category or difficulty:
+                candidates = [
+                    question_id for question_id in candidates
+                    if (not category or docs[question_id].category == category)
+                    and (not difficulty or docs[question_id].difficulty == difficulty)
+                ]
+            scores = dict.fromkeys(candidates, 0.0)
+            for (concrete, _), idf in zip(groups, idfs):
+                if len(concrete) == 1:
+                    name = concrete[0]
+                    tfs = {question_id: docs[question_id].terms[name] for question_id in scores}
+                else:
+                    # 单字扩展出的多个二元组：沿各自的倒排表累加词频，避免逐题遍历全部扩展词项
+                    tfs = dict.fromkeys(scores, 0.0)
+                    for name in concrete:
+                        for question_id in self._postings[name]:
+                            if question_id in tfs:
+                                tfs[question_id] += docs[question_id].terms[name]
+                for question_id, tf in tfs.items():
+                    norm = self.k1 * (1 - self.b + self.b * docs[question_id].length / avg_length)
+                    scores[question_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            results = [(round(score, 6), question_id) for question_id, score in scores.items()]
+        results.sort(key=lambda item: (-item[0], item[1]))
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "questions": len(self._docs),
+                "terms": len(self._postings),
+                "postings": sum(len(postings) for postings in self._postings.values()),
+                "last_load": self.last_load,
+            }
+
+    def _make_doc(self, question: InterviewQuestion,
+                  old: Optional[_IndexedQuestion] = None) -> Optional[_IndexedQuestion]:
+        """切分题目各字段；停用的题目返回 None，内容未变时原样返回 old"""
+        if not question.is_active:
+            return None
+        fields = self._field_texts(question)
+        fingerprint = hashlib.sha1("\x1f".join(
+            [fields[name] for name in FIELD_WEIGHTS]
+            + [str(question.category), str(question.difficulty), str(question.importance)]
+        ).encode("utf-8")).hexdigest()
+        if old is not None and old.fingerprint == fingerprint:
+            return old
+        terms: Dict[str, float] = {}
+        for name, weight in FIELD_WEIGHTS.items():
+            for term, count in Counter(iter_terms(fields[name])).items():
+                terms[term] = terms.get(term, 0.0) + count * weight
+        return _IndexedQuestion(fingerprint, terms, question.category, question.difficulty, question.importance)
+
+    def _build(self, questions: List[InterviewQuestion]) -> int:
+        """整体构建：按题目 ID 升序追加到各倒排表，最后一次性转为 int 数组。
+        构建期间会新建大量小容器，暂停分代回收避免其反复扫描已建好的部分"""
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._build_postings(questions)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _build_postings(self, questions: List[InterviewQuestion]) -> int:
+        lists: Dict[str, List[int]] = {}
+        for question in sorted(questions, key=lambda row: row.id):
+            doc = self._make_doc(question)
+            if doc is None:
+                continue
+            question_id = question.id
+            self._docs[question_id] = doc
+            self._total_length += doc.length
+            for term in doc.terms:
+                ids = lists.get(term)
+                if ids is None:
+                    lists[term] = [question_id]
+                else:
+                    ids.append(question_id)
+        for term, ids in lists.items():
+            self._postings[term] = array("i", ids)
+            self._register_term(term)
+        return len(self._docs)
+
+    def _register_term(self, term: str):
+        if _is_cjk_bigram(term):
+            for ch in term:
+                self._char_terms.setdefault(ch, set()).add(term)
+
+    def _expand(self, term: str) -> List[str]:
+        """查询词项对应的索引词项：单个汉字扩展为所有含该字的二元组"""
+        concrete = [term] if term in self._postings else []
+        if len(term) == 1 and not term.isascii():
+            concrete.extend(sorted(self._char_terms.get(term, ())))
+        return concrete
+
+    def _drop_posting(self, term: str, question_id: int):
+        postings = self._postings.get(term)
+        if postings is None:
+            return
+        postings_remove(postings, question_id)
+        if not postings:
+            del self._postings[term]
+            if _is_cjk_bigram(term):
+                for ch in term:
+                    names = self._char_terms.get(ch)
+                    if names is not None:
+                        names.discard(term)
+                        if not names:
+                            del self._char_terms[ch]
+
+    @staticmethod
+    def _field_texts(question: InterviewQuestion) -> Dict[str, str]:
+        key_points = []
+        for entry in parse_list_field(question.key_points):
+            if isinstance(entry, dict):
+                key_points.append(str(entry.get("point") or ""))
+                key_points.extend(str(alias) for alias in entry.get("aliases") or [])
+            else:
+                key_points.append(str(entry))
+        return {
+            "title": question.title or "",
+            "tags": " ".join(str(tag) for tag in parse_list_field(question.tags)),
+            "key_points": " ".join(key_points),
+            "content": question.content or "",
+        }
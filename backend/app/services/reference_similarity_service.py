@@ -0,0 +1,186 @@
+"""
+参考答案相似度
+每道题的参考答案预先切分为中文二元组/英文词项并保存词频，按 BM25 加权后以 CSR 稀疏矩阵（numpy 数组）存放，每行按 L1 归一化；
+回答得分为参考答案行与回答词项指示向量的稀疏点积，即回答覆盖了参考答案多少比例的加权词项（0-1）。
+题库变化时只重新切分变化的题目，IDF 与行权重由向量化计算整体刷新
+"""
+
+import hashlib
+import threading
+import time
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.interview import InterviewQuestion
+from ..core.database import SessionLocal
+from ..utils.text_tokens import iter_terms
+
+
+class ReferenceAnswerIndex:
+    """参考答案 BM25 向量索引"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.logger = logging.getLogger(__name__)
+        self.vocab: Dict[str, int] = {}
+        # 题目 ID -> (参考答案哈希, 词项 ID（升序）, 词频, 与词项 ID 对齐的词项)
+        self._docs: Dict[int, Tuple[str, np.ndarray, np.ndarray, Tuple[str, ...]]] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = True
+        self._rows: Dict[int, int] = {}
+        self._row_terms: List[Tuple[str, ...]] = []
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.data = np.zeros(0, dtype=np.float32)
+        self.last_build: Optional[Dict[str, Any]] = None
+
+    def load(self) -> Dict[str, int]:
+        """从题库加载全部参考答案；已加载过时只处理有变化的题目"""
+        db = SessionLocal()
+        try:
+            rows = db.query(InterviewQuestion.id, InterviewQuestion.reference_answer).all()
+        finally:
+            db.close()
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        with self._lock:
+            current = set()
+            for question_id, reference_answer in rows:
+                current.add(question_id)
+                existed = question_id in self._docs
+                if self.update(question_id, reference_answer):
+                    stats["updated" if existed else "added"] += 1
+            for question_id in [qid for qid in self._docs if qid not in current]:
+                self.remove(question_id)
+                stats["removed"] += 1
+            self._loaded = True
+        return stats
+
+    def update(self, question_id: int, reference_answer: Optional[str]) -> bool:
+        """更新一道题的参考答案，内容未变时不重新切分；返回是否有变化"""
+        text = reference_answer or ""
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._docs.get(question_id)
+            if cached is not None and cached[0] == digest:
+                return False
+            counter = Counter(iter_terms(text))
+            if not counter:
+                if cached is None:
+                    return False
+                del self._docs[question_id]
+            else:
+                entries = sorted((self._term_id(term), count, term) for term, count in counter.items())
+                self._docs[question_id] = (
+                    digest,
+                    np.array([entry[0] for entry in entries], dtype=np.int32),
+                    np.array([entry[1] for entry in entries], dtype=np.float32),
+                    tuple(entry[2] for entry in entries),
+                )
+            self._dirty = True
+            return True
+
+    def remove(self, question_id: int):
+        with self._lock:
+            if self._docs.pop(question_id, None) is not None:
+                self._dirty = True
+
+    def score(self, question: Optional[InterviewQuestion], answer_text: str) -> Optional[float]:
+        """回答对参考答案的覆盖度；题目没有参考答案时返回 None"""
+        return self.score_many([(question, answer_text)])[0]
+
+    def score_many(self, pairs: Sequence[Tuple[Optional[InterviewQuestion], str]]) -> List[Optional[float]]:
+        """批量计算覆盖度：逐对求参考答案词项在回答中的命中掩码，再对全部行做一次加权求和"""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            for question, _ in pairs:
+                if question is not None:
+                    self.update(question.id, question.reference_answer)
+            if self._dirty:
+                self._build()
+            rows, indptr, data, row_terms = self._rows, self.indptr, self.data, self._row_terms
+
+        masks = []
+        owners = []
+        slices = []
+        has_reference = []
+        for position, (question, answer_text) in enumerate(pairs):
+            row = rows.get(question.id) if question is not None else None
+            has_reference.append(row is not None)
+            if row is None:
+                continue
+            # 只查参考答案的词项是否出现在回答里，查找集合只有回答本身的大小
+            answer_terms = set(iter_terms(answer_text))
+            terms = row_terms[row]
+            masks.append(np.fromiter((term in answer_terms for term in terms), dtype=bool, count=len(terms)))
+            owners.append(np.full(len(terms), position, dtype=np.int64))
+            slices.append(np.arange(indptr[row], indptr[row + 1]))
+
+        scores = np.zeros(len(pairs), dtype=np.float64)
+        if slices:
+            hit = np.concatenate(masks)
+            scores = np.bincount(
+                np.concatenate(owners)[hit], weights=data[np.concatenate(slices)[hit]], minlength=len(pairs)
+            )
+        return [
+            round(float(min(scores[i], 1.0)), 4) if has_reference[i] else None
+            for i in range(len(pairs))
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "questions": len(self._docs),
+                "vocabulary": len(self.vocab),
+                "nnz": int(self.indices.size),
+                "memory_bytes": int(self.indptr.nbytes + self.indices.nbytes + self.data.nbytes),
+                "last_build": self.last_build,
+            }
+
+    def _term_id(self, term: str) -> int:
+        term_id = self.vocab.get(term)
+        if term_id is None:
+            term_id = self.vocab[term] = len(self.vocab)
+        return term_id
+
+    def _build(self):
+        """由各题词频重建 CSR 权重矩阵：IDF、文档长度归一化与行归一化均为整体向量运算"""
+        start = time.perf_counter()
+        question_ids = sorted(self._docs)
+        self._rows = {question_id: row for row, question_id in enumerate(question_ids)}
+        self._row_terms = [self._docs[question_id][3] for question_id in question_ids]
+        if not question_ids:
+            self.indptr = np.zeros(1, dtype=np.int64)
+            self.indices = np.zeros(0, dtype=np.int32)
+            self.data = np.zeros(0, dtype=np.float32)
+            self._dirty = False
+            return
+
+        docs = [self._docs[question_id] for question_id in question_ids]
+        nnz = np.array([doc[1].size for doc in docs], dtype=np.int64)
+        indptr = np.zeros(len(docs) + 1, dtype=np.int64)
+        np.cumsum(nnz, out=indptr[1:])
+        indices = np.concatenate([doc[1] for doc in docs])
+        counts = np.concatenate([doc[2] for doc in docs])
+
+        doc_count = len(docs)
+        doc_freq = np.bincount(indices, minlength=len(self.vocab)).astype(np.float64)
+        idf = np.log1p((doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+        lengths = np.add.reduceat(counts.astype(np.float64), indptr[:-1])
+        norm = np.repeat(1 - self.b + self.b * lengths / lengths.mean(), nnz)
+        weights = idf[indices] * counts * (self.k1 + 1) / (counts + self.k1 * norm)
+        row_sums = np.add.reduceat(weights, indptr[:-1])
+        weights /= np.repeat(row_sums, nnz)
+
+        self.indptr, self.indices, self.data = indptr, indices, weights.astype(np.float32)
+        self._dirty = False
+        self.last_build = {
+            "questions": doc_count,
+            "nnz": int(indices.size),
+            "seconds": round(time.perf_counter() - start, 4),
+        }
@@ -0,0 +1,185 @@
+"""
+相似题目服务
+基于题目标签预计算近邻表：Jaccard相似度 + 难度相近加分
+"""
+
+import json
+import time
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+
+import numpy as np
+from ..models.problem import LeetCodeProblem
+from ..models.problem_similarity import ProblemSimilarity
+from ..core.database import get_db, SessionLocal
+
+
+DIFFICULTY_LEVELS = {"Easy": 0, "Medium": 1, "Hard": 2}
+
+
+class ProblemSimilarityService:
+    """相似题目服务类"""
+    
+    def __init__(self, top_k: int = 10, difficulty_bonus: float = 0.1, block_size: int = 512):
+        self.db = next(get_db())
+        self.top_k = top_k
+        self.difficulty_bonus = difficulty_bonus
+        self.block_size = block_size
+        self.logger = logging.getLogger(__name__)
+        self.last_build: Optional[Dict[str, Any]] = None
+        self._rebuild_lock = threading.Lock()
+    
+    def rebuild(self) -> Dict[str, Any]:
+        """重新计算全部题目的近邻表（题库变化后调用）
+        
+        计算量随题库增大，调用方应在线程池中运行；使用独立的数据库会话，同一时间只运行一次重建
+        """
+        with self._rebuild_lock:
+            db = SessionLocal()
+            try:
+                return self._rebuild(db)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+    
+    def needs_rebuild(self) -> bool:
+        """还没有近邻表（首次使用）时需要重建"""
+        return self.last_build is None and self.db.query(ProblemSimilarity).first() is None
+    
+    def _rebuild(self, db) -> Dict[str, Any]:
+        start = time.perf_counter()
+        rows = db.query(
+            LeetCodeProblem.id, LeetCodeProblem.tags, LeetCodeProblem.difficulty
+        ).all()
+        
+        problem_ids = np.array([r[0] for r in rows], dtype=np.int64)
+        tag_lists = [_parse_tags(r[1]) for r in rows]
+        levels = np.array([DIFFICULTY_LEVELS.get(_difficulty_value(r[2]), 1) for r in rows], dtype=np.int64)
+        
+        neighbours = self._compute_neighbours(tag_lists, levels)
+        
+        created_at = datetime.utcnow()
+        records = []
+        for row_idx, (cols, scores) in enumerate(neighbours):
+            pid = int(problem_ids[row_idx])
+            related_ids = problem_ids[cols].tolist()
+            rounded = np.round(scores.astype(np.float64), 4).tolist()
+            records.extend(
+                {
+                    "problem_id": pid,
+                    "rank": rank,
+                    "related_id": related_ids[rank],
+                    "score": rounded[rank],
+                    "created_at": created_at,
+                }
+                for rank in range(len(related_ids))
+            )
+        
+        # 用表级 insert 批量执行，避免逐行构造ORM对象，参数风格由方言处理
+        table = ProblemSimilarity.__table__
+        db.execute(table.delete())
+        if records:
+            db.execute(table.insert(), records)
+        db.commit()
+        
+        self.last_build = {
+            "problems": len(rows),
+            "pairs": len(records),
+            "seconds": round(time.perf_counter() - start, 3),
+            "built_at": created_at.isoformat()
+        }
+        self.logger.info(f"相似题目索引已重建: {self.last_build}")
+        return self.last_build
+    
+    def get_related(self, problem_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """获取相似题目（按 problem_id 索引读取近邻表，近邻表需已构建，见 needs_rebuild）"""
+        query = self.db.query(ProblemSimilarity, LeetCodeProblem).join(
+            LeetCodeProblem, LeetCodeProblem.id == ProblemSimilarity.related_id
+        ).filter(ProblemSimilarity.problem_id == problem_id).order_by(ProblemSimilarity.rank)
+        if limit:
+            query = query.limit(limit)
+        
+        return [{
+            "id": p.id,
+            "leetcode_id": p.leetcode_id,
+            "title": p.title,
+            "title_slug": p.title_slug,
+            "difficulty": p.difficulty,
+            "category": p.category,
+            "score": s.score
+        } for s, p in query.all()]
+    
+    def _compute_neighbours(self, tag_lists: List[List[str]], levels: np.ndarray):
+        """分块计算近邻
+        
+        题目×标签矩阵极窄（标签仅几十个），按行分块做矩阵乘法得到交集大小，
+        再换算为Jaccard，避免一次性生成 n×n 的完整矩阵
+        """
+        n = len(tag_lists)
+        if n == 0:
+            return []
+        
+        vocab: Dict[str, int] = {}
+        for tags in tag_lists:
+            for tag in tags:
+                vocab.setdefault(tag, len(vocab))
+        
+        matrix = np.zeros((n, max(len(vocab), 1)), dtype=np.float32)
+        for row, tags in enumerate(tag_lists):
+            for tag in tags:
+                matrix[row, vocab[tag]] = 1.0
+        sizes = matrix.sum(axis=1)
+        gaps = np.abs(np.arange(3)[:, None] - np.arange(3)[None, :])
+        bonus_table = (self.difficulty_bonus * (1.0 - gaps / 2.0)).astype(np.float32)
+        
+        k = min(self.top_k, n - 1)
+        neighbours = []
+        for start in range(0, n, self.block_size):
+            end = min(start + self.block_size, n)
+            inter = matrix[start:end] @ matrix.T
+            union = sizes[start:end, None] + sizes[None, :] - inter
+            scores = inter / np.maximum(union, 1.0)
+            
+            # 难度越接近加分越多，只作用于有共同标签的题目
+            bonus = bonus_table[levels[start:end, None], levels[None, :]]
+            scores += bonus * (inter > 0)
+            scores[np.arange(end - start), np.arange(start, end)] = -1.0
+            
+            if k <= 0:
+                empty = np.empty(0, dtype=np.int64)
+                neighbours.extend((empty, empty.astype(np.float32)) for _ in range(end - start))
+                continue
+            
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            
+            for cols, row_scores in zip(top, top_scores):
+                keep = row_scores > 0
+                neighbours.append((cols[keep], row_scores[keep]))
+        
+        return neighbours
+
+
+def _parse_tags(tags) -> List[str]:
+    """解析题目标签（数据库中可能是列表或JSON字符串）"""
+    if isinstance(tags, list):
+        return [str(t) for t in tags]
+    if not tags:
+        return []
+    try:
+        parsed = json.loads(tags)
+    except (TypeError, ValueError):
+        return []
+    return [str(t) for t in parsed] if isinstance(parsed, list) else []
+
+
+def _difficulty_value(difficulty) -> str:
+    """兼容枚举与字符串两种难度表示"""
+    return getattr(difficulty, "value", difficulty) or ""
@@ -0,0 +1,453 @@
+"""
+学习计划服务
+按课程依赖图（分类拓扑序）和难度阶梯生成逐日刷题计划，并按天物化存储
+"""
+
+import json
+import heapq
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, date, timedelta
+
+from ..models.problem import LeetCodeProblem, ProblemSubmission, StudyPlan
+from ..models.study_plan import StudyPlanSchedule, StudyPlanDay
+from ..core.database import get_db
+
+
+# 课程依赖图：分类 -> 前置分类
+CURRICULUM_PREREQUISITES = {
+    "数组": [],
+    "字符串": ["数组"],
+    "哈希表": ["数组"],
+    "链表": ["数组"],
+    "栈": ["数组"],
+    "队列": ["栈"],
+    "排序": ["数组"],
+    "二分查找": ["排序"],
+    "数学": [],
+    "位运算": ["数学"],
+    "树": ["链表", "栈", "队列"],
+    "堆": ["树"],
+    "回溯": ["树"],
+    "分治": ["排序", "树"],
+    "贪心算法": ["排序"],
+    "图": ["树", "队列", "哈希表"],
+    "动态规划": ["回溯", "哈希表"],
+    "其他": [],
+}
+
+# 难度阶梯及单题预估用时（分钟）
+DIFFICULTY_LADDER = {"Easy": 0, "Medium": 1, "Hard": 2}
+DIFFICULTY_MINUTES = {"Easy": 15, "Medium": 30, "Hard": 45}
+
+
+class StudyPlanService:
+    """学习计划服务类"""
+
+    def __init__(self):
+        self.db = next(get_db())
+
+    def generate_plan(
+        self,
+        target_date: date,
+        daily_minutes: int,
+        weak_categories: Optional[List[str]] = None,
+        name: Optional[str] = None,
+        start_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """生成学习计划"""
+        start_date = start_date or datetime.now().date()
+        if target_date < start_date:
+            raise ValueError("目标日期不能早于开始日期")
+        if daily_minutes < 10:
+            raise ValueError("每日学习时间不能少于10分钟")
+        weak_categories = [c for c in (weak_categories or []) if c]
+
+        problems = self._load_candidate_problems()
+        categories = {p["category"] for p in problems}
+        order = topological_category_order(categories, weak_categories)
+
+        total_days = (target_date - start_date).days + 1
+        queue = self._select_problems(problems, order, weak_categories, total_days * daily_minutes)
+        # 装箱会在每天末尾留下零头，超出目标日期的部分直接截掉
+        days = pack_days(queue, daily_minutes)[:total_days]
+        queue = [p for d in days for p in d]
+
+        plan = StudyPlan()
+        plan_fields = {
+            "name": name or f"刷题计划（截至{target_date.isoformat()}）",
+            "title": name or f"刷题计划（截至{target_date.isoformat()}）",
+            "description": f"每日{daily_minutes}分钟，重点: {', '.join(weak_categories) or '无'}",
+            "start_date": datetime.combine(start_date, datetime.min.time()),
+            "target_date": datetime.combine(target_date, datetime.min.time()),
+            "end_date": datetime.combine(target_date, datetime.min.time()),
+            "daily_goal": max((len(d) for d in days), default=0),
+            "target_problems": len(queue),
+            "is_active": True,
+        }
+        for key, value in plan_fields.items():
+            if hasattr(StudyPlan, key):
+                setattr(plan, key, value)
+        # 会话在服务实例间共享，写入失败时回滚，避免残留的半个计划随下一次提交写入
+        try:
+            self.db.add(plan)
+            self.db.flush()
+
+            schedule = StudyPlanSchedule(
+                plan_id=plan.id,
+                start_date=start_date,
+                target_date=target_date,
+                daily_minutes=daily_minutes,
+                weak_categories=json.dumps(weak_categories, ensure_ascii=False),
+                category_order=json.dumps(order, ensure_ascii=False),
+                total_days=len(days),
+                revision=1
+            )
+            self.db.add(schedule)
+            self._write_days(plan.id, start_date, 0, days, revision=1)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return self.get_plan(plan.id, include_days=False)
+
+    def get_plan(self, plan_id: int, include_days: bool = True) -> Optional[Dict[str, Any]]:
+        """获取学习计划概要"""
+        schedule = self.db.query(StudyPlanSchedule).filter(StudyPlanSchedule.plan_id == plan_id).first()
+        if not schedule:
+            return None
+
+        result = self._serialize_schedule(schedule)
+        if include_days:
+            days = self.db.query(StudyPlanDay).filter(
+                StudyPlanDay.plan_id == plan_id
+            ).order_by(StudyPlanDay.day_index).all()
+            result["days"] = [self._serialize_day(d) for d in days]
+        return result
+
+    def list_plans(self) -> List[Dict[str, Any]]:
+        """获取所有学习计划"""
+        schedules = self.db.query(StudyPlanSchedule).order_by(StudyPlanSchedule.plan_id.desc()).all()
+        return [self._serialize_schedule(s) for s in schedules]
+
+    def get_day(self, plan_id: int, day: date) -> Optional[Dict[str, Any]]:
+        """获取某一天的任务（按主键直接读取）"""
+        schedule = self.db.query(StudyPlanSchedule).filter(StudyPlanSchedule.plan_id == plan_id).first()
+        if not schedule:
+            return None
+
+        day_index = (day - schedule.start_date).days
+        plan_day = self.db.query(StudyPlanDay).filter(
+            StudyPlanDay.plan_id == plan_id,
+            StudyPlanDay.day_index == day_index
+        ).first()
+        if not plan_day:
+            return {"plan_id": plan_id, "date": day.isoformat(), "day_index": day_index, "problems": []}
+
+        result = self._serialize_day(plan_day)
+        problem_ids = result["problem_ids"]
+        problems = self.db.query(LeetCodeProblem).filter(
+            LeetCodeProblem.id.in_(problem_ids)
+        ).all() if problem_ids else []
+        solved = self._get_solved_ids(problem_ids)
+        by_id = {p.id: p for p in problems}
+        result["problems"] = [{
+            "id": pid,
+            "leetcode_id": by_id[pid].leetcode_id,
+            "title": by_id[pid].title,
+            "title_slug": by_id[pid].title_slug,
+            "difficulty": _difficulty_value(by_id[pid].difficulty),
+            "category": _category_value(by_id[pid].category),
+            "is_completed": pid in solved
+        } for pid in problem_ids if pid in by_id]
+        return result
+
+    def replan(self, plan_id: int, daily_minutes: Optional[int] = None, today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+        """从偏离点开始增量重排
+
+        偏离点为第一个截至今天仍有未完成题目的日期；之前的排期保持不变，
+        偏离点之后的未完成题目保持原有顺序，从今天起重新装箱到剩余天数中。
+        """
+        schedule = self.db.query(StudyPlanSchedule).filter(StudyPlanSchedule.plan_id == plan_id).first()
+        if not schedule:
+            return None
+
+        today = today or datetime.now().date()
+        if daily_minutes:
+            if daily_minutes < 10:
+                raise ValueError("每日学习时间不能少于10分钟")
+            schedule.daily_minutes = daily_minutes
+
+        days = self.db.query(StudyPlanDay).filter(
+            StudyPlanDay.plan_id == plan_id
+        ).order_by(StudyPlanDay.day_index).all()
+        all_ids = [pid for d in days for pid in json.loads(d.problem_ids or "[]")]
+        solved = self._get_solved_ids(all_ids)
+
+        today_index = (today - schedule.start_date).days
+        divergence = None
+        for d in days:
+            if d.day_index >= today_index:
+                break
+            if any(pid not in solved for pid in json.loads(d.problem_ids or "[]")):
+                divergence = d.day_index
+                break
+
+        if divergence is None and not daily_minutes:
+            return {"replanned": False, "message": "计划进度正常，无需重排", **self._serialize_schedule(schedule)}
+
+        start_index = divergence if divergence is not None else max(today_index, 0)
+        pending_days = [d for d in days if d.day_index >= start_index]
+        remaining = [pid for d in pending_days for pid in json.loads(d.problem_ids or "[]") if pid not in solved]
+
+        revision = (schedule.revision or 1) + 1
+        try:
+            # 偏离点到昨天之间的日期只保留已完成的题目，作为历史记录
+            for d in pending_days:
+                if d.day_index < today_index:
+                    done = self._load_items([pid for pid in json.loads(d.problem_ids or "[]") if pid in solved])
+                    d.problem_ids = json.dumps([p["id"] for p in done])
+                    d.estimated_minutes = sum(p["minutes"] for p in done)
+                    d.categories = ",".join(dict.fromkeys(p["category"] for p in done))[:200]
+                    d.revision = revision
+                else:
+                    self.db.delete(d)
+            self.db.flush()
+
+            items = self._load_items(remaining)
+            new_days = pack_days(items, schedule.daily_minutes)
+            pack_start = max(today_index, start_index)
+            self._write_days(plan_id, schedule.start_date, pack_start, new_days, revision=revision)
+
+            schedule.revision = revision
+            schedule.replanned_from = start_index
+            schedule.total_days = pack_start + len(new_days)
+            schedule.updated_at = datetime.utcnow()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        result = self._serialize_schedule(schedule)
+        result.update({
+            "replanned": True,
+            "divergence_day": start_index,
+            "rescheduled_problems": len(remaining),
+        })
+        return result
+
+    # 私有方法
+    def _load_candidate_problems(self) -> List[Dict[str, Any]]:
+        """加载未完成的题目"""
+        solved_rows = self.db.query(ProblemSubmission.problem_id).filter(
+            ProblemSubmission.is_accepted == True
+        ).distinct().all()
+        solved = {pid for (pid,) in solved_rows}
+
+        rows = self.db.query(
+            LeetCodeProblem.id, LeetCodeProblem.category, LeetCodeProblem.difficulty,
+            LeetCodeProblem.frequency
+        ).all()
+        problems = []
+        for pid, category, difficulty, frequency in rows:
+            if pid in solved:
+                continue
+            difficulty = _difficulty_value(difficulty)
+            problems.append({
+                "id": pid,
+                "category": _category_value(category) or "其他",
+                "difficulty": difficulty,
+                "frequency": frequency or 0,
+                "minutes": DIFFICULTY_MINUTES.get(difficulty, 30)
+            })
+        return problems
+
+    def _load_items(self, problem_ids: List[int]) -> List[Dict[str, Any]]:
+        """按给定顺序加载题目的排期信息"""
+        if not problem_ids:
+            return []
+        rows = self.db.query(
+            LeetCodeProblem.id, LeetCodeProblem.category, LeetCodeProblem.difficulty
+        ).filter(LeetCodeProblem.id.in_(problem_ids)).all()
+        info = {
+            pid: {
+                "id": pid,
+                "category": _category_value(category) or "其他",
+                "difficulty": _difficulty_value(difficulty),
+                "minutes": DIFFICULTY_MINUTES.get(_difficulty_value(difficulty), 30)
+            }
+            for pid, category, difficulty in rows
+        }
+        return [info[pid] for pid in problem_ids if pid in info]
+
+    def _select_problems(
+        self,
+        problems: List[Dict[str, Any]],
+        order: List[str],
+        weak_categories: List[str],
+        capacity: int
+    ) -> List[Dict[str, Any]]:
+        """在总时间预算内挑选题目，薄弱分类优先保留，结果按拓扑序+难度阶梯排列"""
+        by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for p in problems:
+            by_category.setdefault(p["category"], []).append(p)
+        for items in by_category.values():
+            items.sort(key=lambda p: (DIFFICULTY_LADDER.get(p["difficulty"], 1), -p["frequency"], p["id"]))
+
+        weak = set(weak_categories)
+        selected: Dict[str, List[Dict[str, Any]]] = {}
+
+        # 薄弱分类全部纳入（预算不足时按阶梯截断）
+        budget = capacity
+        for category in order:
+            if category not in weak:
+                continue
+            taken = []
+            for p in by_category.get(category, []):
+                if p["minutes"] > budget:
+                    break
+                taken.append(p)
+                budget -= p["minutes"]
+            selected[category] = taken
+
+        # 其余分类轮流各取一题（从简单题开始），平分剩余预算
+        others = [c for c in order if c not in weak and by_category.get(c)]
+        for category in others:
+            selected[category] = []
+        while budget > 0 and others:
+            still_open = []
+            for category in others:
+                taken = selected[category]
+                pool = by_category[category]
+                if len(taken) < len(pool) and pool[len(taken)]["minutes"] <= budget:
+                    taken.append(pool[len(taken)])
+                    budget -= taken[-1]["minutes"]
+                    still_open.append(category)
+            others = [c for c in still_open if len(selected[c]) < len(by_category[c])]
+
+        return [p for category in order for p in selected.get(category, [])]
+
+    def _write_days(self, plan_id: int, start_date: date, first_index: int, days: List[List[Dict[str, Any]]], revision: int):
+        """写入物化的逐日排期"""
+        for offset, items in enumerate(days):
+            day_index = first_index + offset
+            categories = []
+            for p in items:
+                if p["category"] not in categories:
+                    categories.append(p["category"])
+            self.db.add(StudyPlanDay(
+                plan_id=plan_id,
+                day_index=day_index,
+                plan_date=start_date + timedelta(days=day_index),
+                problem_ids=json.dumps([p["id"] for p in items]),
+                categories=",".join(categories)[:200],
+                estimated_minutes=sum(p["minutes"] for p in items),
+                revision=revision
+            ))
+
+    def _get_solved_ids(self, problem_ids: List[int]) -> set:
+        """查询给定题目中已通过的题目"""
+        if not problem_ids:
+            return set()
+        rows = self.db.query(ProblemSubmission.problem_id).filter(
+            ProblemSubmission.problem_id.in_(set(problem_ids)),
+            ProblemSubmission.is_accepted == True
+        ).distinct().all()
+        return {pid for (pid,) in rows}
+
+    def _serialize_schedule(self, schedule: StudyPlanSchedule) -> Dict[str, Any]:
+        """序列化计划概要"""
+        end_date = schedule.start_date + timedelta(days=max((schedule.total_days or 1) - 1, 0))
+        return {
+            "plan_id": schedule.plan_id,
+            "start_date": schedule.start_date.isoformat(),
+            "target_date": schedule.target_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "daily_minutes": schedule.daily_minutes,
+            "weak_categories": json.loads(schedule.weak_categories or "[]"),
+            "category_order": json.loads(schedule.category_order or "[]"),
+            "total_days": schedule.total_days,
+            "overflow_days": max((end_date - schedule.target_date).days, 0),
+            "revision": schedule.revision,
+            "replanned_from": schedule.replanned_from
+        }
+
+    def _serialize_day(self, plan_day: StudyPlanDay) -> Dict[str, Any]:
+        """序列化单日任务"""
+        return {
+            "plan_id": plan_day.plan_id,
+            "day_index": plan_day.day_index,
+            "date": plan_day.plan_date.isoformat(),
+            "problem_ids": json.loads(plan_day.problem_ids or "[]"),
+            "categories": plan_day.categories.split(",") if plan_day.categories else [],
+            "estimated_minutes": plan_day.estimated_minutes,
+            "revision": plan_day.revision
+        }
+
+
+def topological_category_order(categories, weak_categories: Optional[List[str]] = None) -> List[str]:
+    """按课程依赖图对分类做拓扑排序
+
+    入度为0的分类中，薄弱分类优先，其次按依赖图中的声明顺序；
+    不在依赖图中的分类视为无前置依赖。
+    """
+    weak = set(weak_categories or [])
+    declared = list(CURRICULUM_PREREQUISITES.keys())
+    nodes = set(categories)
+    # 补全前置分类，保证依赖链完整
+    pending = list(nodes)
+    while pending:
+        category = pending.pop()
+        for pre in CURRICULUM_PREREQUISITES.get(category, []):
+            if pre not in nodes:
+                nodes.add(pre)
+                pending.append(pre)
+
+    def priority(category: str) -> Tuple[int, int, str]:
+        rank = declared.index(category) if category in declared else len(declared)
+        return (0 if category in weak else 1, rank, category)
+
+    indegree = {c: 0 for c in nodes}
+    dependents: Dict[str, List[str]] = {c: [] for c in nodes}
+    for category in nodes:
+        for pre in CURRICULUM_PREREQUISITES.get(category, []):
+            indegree[category] += 1
+            dependents[pre].append(category)
+
+    heap = [priority(c) for c, deg in indegree.items() if deg == 0]
+    heapq.heapify(heap)
+    order = []
+    while heap:
+        _, _, category = heapq.heappop(heap)
+        order.append(category)
+        for nxt in dependents[category]:
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                heapq.heappush(heap, priority(nxt))
+    return [c for c in order if c in set(categories)]
+
+
+def pack_days(items: List[Dict[str, Any]], daily_minutes: int) -> List[List[Dict[str, Any]]]:
+    """按每日时间预算顺序装箱（单题超出预算时独占一天）"""
+    days: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    used = 0
+    for item in items:
+        if current and used + item["minutes"] > daily_minutes:
+            days.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += item["minutes"]
+    if current:
+        days.append(current)
+    return days
+
+
+def _difficulty_value(difficulty) -> str:
+    """兼容枚举与字符串两种难度表示"""
+    return getattr(difficulty, "value", difficulty) or ""
+
+
+def _category_value(category) -> str:
+    """兼容枚举与字符串两种分类表示"""
+    return getattr(category, "value", category) or ""
@@ -0,0 +1,277 @@
+"""
+同步任务管理
+每次同步对应一条持久化的任务记录：同类任务同时只运行一个，重复提交直接返回正在运行的任务；
+运行中的任务可以取消（已写入的页和断点保留），进度按页更新并估算剩余时间；
+可按 cron 表达式定时提交同步任务
+"""
+
+import json
+import time
+import asyncio
+import functools
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Callable
+
+from ..models.sync import SyncJob
+from ..core.database import SessionLocal
+from ..utils.cron import CronSchedule
+from .sync_service import ProblemSyncService
+
+
+JOB_KINDS = ("problems", "details")
+ACTIVE_STATUSES = ("queued", "running")
+# 运行中进度写库的最小间隔（秒），查询时以内存中的实时进度为准
+PROGRESS_FLUSH_INTERVAL = 2.0
+
+
+class SyncJobManager:
+    """同步任务管理器"""
+
+    def __init__(self, sync_service: ProblemSyncService, on_rows_changed: Optional[Callable[[], Any]] = None):
+        self.sync_service = sync_service
+        self.on_rows_changed = on_rows_changed  # 题目有增改时调用，如重建相似题索引
+        self.logger = logging.getLogger(__name__)
+        self._active: Dict[str, int] = {}  # 任务类型 -> 运行中的任务 ID
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._progress: Dict[int, Dict[str, Any]] = {}
+        self._scheduler: Optional[asyncio.Task] = None
+        self.schedule: Optional[CronSchedule] = None
+        self.schedule_params: Dict[str, Any] = {}
+        self.next_run: Optional[datetime] = None
+
+    def submit(self, kind: str, params: Dict[str, Any], trigger: str = "manual") -> Dict[str, Any]:
+        """提交同步任务；同类任务正在运行时不再新建，返回该任务并标记 deduplicated"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"不支持的同步任务类型: {kind}")
+        active_id = self._active.get(kind)
+        if active_id is not None:
+            job = self.get_job(active_id)
+            job["deduplicated"] = True
+            return job
+
+        db = SessionLocal()
+        try:
+            job = SyncJob(kind=kind, params=json.dumps(params, ensure_ascii=False), trigger=trigger, status="queued")
+            db.add(job)
+            db.commit()
+            job_id = job.id
+        finally:
+            db.close()
+
+        self._active[kind] = job_id
+        self._progress[job_id] = {"pages_done": 0, "pages_total": None, "rows_upserted": 0, "rows_unchanged": 0}
+        task = asyncio.ensure_future(self._execute(job_id, kind, params))
+        task.add_done_callback(lambda _: self._release(job_id, kind))
+        self._tasks[job_id] = task
+        job = self.get_job(job_id)
+        job["deduplicated"] = False
+        return job
+
+    async def _execute(self, job_id: int, kind: str, params: Dict[str, Any]):
+        progress = self._progress[job_id]
+        loop = asyncio.get_event_loop()
+        started = time.monotonic()
+        flushed = started
+        pending: Optional[asyncio.Future] = None
+        await self._write_job(job_id, status="running", started_at=datetime.utcnow())
+        progress["started"] = started
+
+        def on_progress(update: Dict[str, int]):
+            nonlocal flushed, pending
+            progress.update(update)
+            now = time.monotonic()
+            # 写库放到线程池，上一次还没写完就跳过本次，查询时以内存中的实时进度为准
+            if now - flushed >= PROGRESS_FLUSH_INTERVAL and (pending is None or pending.done()):
+                flushed = now
+                pending = loop.run_in_executor(None, functools.partial(self._update_job, job_id, **update))
+
+        async def finish(**fields):
+            # 等进度写入完成再写最终状态，避免旧进度覆盖结果
+            if pending is not None:
+                await asyncio.gather(pending, return_exceptions=True)
+            await self._write_job(job_id, finished_at=datetime.utcnow(), **_progress_fields(progress), **fields)
+
+        try:
+            if kind == "problems":
+                result = await self.sync_service.sync(progress=on_progress, **params)
+            else:
+                result = await self.sync_service.hydrate_details(progress=on_progress, **params)
+            status = "completed" if result["success"] else "failed"
+            error = result.get("error")
+            if kind == "details" and result.get("failed_slugs"):
+                error = f"{len(result['failed_slugs'])} 题详情获取失败"
+            await finish(status=status, error=error, result=json.dumps(result, ensure_ascii=False, default=str))
+            print(f"同步任务 {job_id}（{kind}）{'完成' if result['success'] else '失败'}: "
+                  f"{progress['pages_done']} 页，写入 {progress['rows_upserted']} 题，"
+                  f"耗时 {time.monotonic() - started:.1f} 秒" + (f"，{error}" if error else ""))
+            if kind == "problems" and result.get("rows_changed") and self.on_rows_changed:
+                try:
+                    # 后处理（如相似题全量重建）是同步的计算任务，放到线程池中运行，不阻塞事件循环
+                    await loop.run_in_executor(None, self.on_rows_changed)
+                except Exception as e:
+                    self.logger.warning(f"同步后处理失败: {str(e)}")
+        except asyncio.CancelledError:
+            await finish(status="cancelled")
+            print(f"同步任务 {job_id}（{kind}）已取消")
+            raise
+        except Exception as e:
+            self.logger.error(f"同步任务 {job_id} 异常: {str(e)}")
+            await finish(status="failed", error=str(e))
+
+    def _release(self, job_id: int, kind: str):
+        """任务结束后释放占位；开始执行前就被取消的任务在这里补记状态"""
+        if self._active.get(kind) == job_id:
+            del self._active[kind]
+        self._tasks.pop(job_id, None)
+        self._progress.pop(job_id, None)
+        job = self.get_job(job_id)
+        if job is not None and job["status"] in ACTIVE_STATUSES:
+            self._update_job(job_id, status="cancelled", finished_at=datetime.utcnow())
+
+    def cancel(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """取消任务；任务不存在返回 None，已结束的任务抛出 ValueError"""
+        job = self.get_job(job_id)
+        if job is None:
+            return None
+        task = self._tasks.get(job_id)
+        if task is not None and not task.done():
+            task.cancel()
+            job["status"] = "cancelling"
+            return job
+        if job["status"] in ACTIVE_STATUSES:
+            # 进程重启前遗留的任务，没有对应的运行实例
+            self._update_job(job_id, status="cancelled", finished_at=datetime.utcnow())
+            return self.get_job(job_id)
+        raise ValueError(f"任务已结束（{job['status']}），无法取消")
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """获取任务状态；运行中的任务返回实时进度和预计剩余时间"""
+        db = SessionLocal()
+        try:
+            job = db.query(SyncJob).filter(SyncJob.id == job_id).first()
+            return self._job_to_dict(job) if job else None
+        finally:
+            db.close()
+
+    def list_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """最近的同步任务"""
+        db = SessionLocal()
+        try:
+            jobs = db.query(SyncJob).order_by(SyncJob.id.desc()).limit(limit).all()
+            return [self._job_to_dict(job) for job in jobs]
+        finally:
+            db.close()
+
+    def recover_interrupted(self) -> int:
+        """服务启动时将上次进程遗留的未结束任务标记为失败，返回处理的任务数"""
+        db = SessionLocal()
+        try:
+            jobs = db.query(SyncJob).filter(SyncJob.status.in_(ACTIVE_STATUSES)).all()
+            for job in jobs:
+                job.status = "failed"
+                job.error = "服务重启，任务中断"
+                job.finished_at = datetime.utcnow()
+            db.commit()
+            return len(jobs)
+        finally:
+            db.close()
+
+    def start_scheduler(self, expression: str, params: Dict[str, Any]):
+        """按 cron 表达式定时提交题目同步任务；表达式为空时不启用"""
+        if not expression:
+            return
+        self.schedule = CronSchedule(expression)
+        self.schedule_params = dict(params)
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.ensure_future(self._schedule_loop())
+
+    async def _schedule_loop(self):
+        while True:
+            now = datetime.now()
+            self.next_run = self.schedule.next_after(now)
+            await asyncio.sleep((self.next_run - now).total_seconds())
+            try:
+                job = self.submit("problems", self.schedule_params, trigger="schedule")
+                if job["deduplicated"]:
+                    print(f"定时同步跳过：任务 {job['id']} 仍在运行")
+                else:
+                    print(f"定时同步任务 {job['id']} 已启动")
+            except Exception as e:
+                self.logger.error(f"定时同步启动失败: {str(e)}")
+
+    def get_schedule(self) -> Optional[Dict[str, Any]]:
+        """定时同步配置与下次运行时间"""
+        if self.schedule is None:
+            return None
+        return {
+            "expression": self.schedule.expression,
+            "params": self.schedule_params,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+        }
+
+    async def shutdown(self):
+        """停止定时器并取消运行中的任务，已写入的数据和断点保留"""
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _write_job(self, job_id: int, **fields):
+        """在线程池中更新任务记录，不阻塞事件循环"""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, functools.partial(self._update_job, job_id, **fields))
+
+    def _update_job(self, job_id: int, **fields):
+        db = SessionLocal()
+        try:
+            job = db.query(SyncJob).filter(SyncJob.id == job_id).first()
+            if job is None:
+                return
+            for key, value in fields.items():
+                setattr(job, key, value)
+            db.commit()
+        finally:
+            db.close()
+
+    def _job_to_dict(self, job: SyncJob) -> Dict[str, Any]:
+        data = {
+            "id": job.id,
+            "kind": job.kind,
+            "params": json.loads(job.params) if job.params else {},
+            "trigger": job.trigger,
+            "status": job.status,
+            "pages_done": job.pages_done or 0,
+            "pages_total": job.pages_total,
+            "rows_upserted": job.rows_upserted or 0,
+            "rows_unchanged": job.rows_unchanged or 0,
+            "error": job.error,
+            "result": json.loads(job.result) if job.result else None,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+            "eta_seconds": None,
+        }
+        live = self._progress.get(job.id)
+        if live is not None and job.status in ACTIVE_STATUSES:
+            data.update(_progress_fields(live))
+            data["eta_seconds"] = _estimate_eta(live)
+        total = data["pages_total"]
+        data["percent"] = round(data["pages_done"] * 100 / total, 1) if total else None
+        return data
+
+
+def _progress_fields(progress: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: progress[key] for key in ("pages_done", "pages_total", "rows_upserted", "rows_unchanged")}
+
+
+def _estimate_eta(progress: Dict[str, Any]) -> Optional[float]:
+    """按已完成页的平均耗时估算剩余秒数"""
+    done, total = progress["pages_done"], progress["pages_total"]
+    if not done or not total or "started" not in progress:
+        return None
+    elapsed = time.monotonic() - progress["started"]
+    return round(elapsed / done * max(total - done, 0), 1)
@@ -0,0 +1,525 @@
+"""
+题库同步服务
+爬虫按页产出题目放入有界队列，消费者逐页写入数据库并在同一事务中推进断点；
+同步中断后下次从已提交的偏移量继续，内存占用只与队列深度和并发数有关。
+增量模式只抓取水位之后的新题和轮换抽查的少量旧页，按内容哈希只写入有变化的题目
+（通过率、频率等统计字段每次都会变化，不计入哈希，单独刷新且不算作题目变更）；
+题目详情按批合并为一个 GraphQL 请求并发抓取，逐批写入题目内容
+"""
+
+import json
+import time
+import hashlib
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator, Callable
+from sqlalchemy import func, update
+
+from ..models.problem import LeetCodeProblem
+from ..models.sync import SyncCheckpoint, SyncWatermark, ProblemSyncHash
+from ..core.database import SessionLocal
+from .crawler_service import CrawlerService, CrawlerPageError, DETAIL_BATCH_SIZE, get_shared_crawler
+from .content_service import ProblemContentService
+from .tag_label_service import ProblemTagService
+
+
+PROBLEMS_CHECKPOINT = "problems"
+SYNC_MODES = ("full", "delta")
+# 增量同步每次抽查的已有题目页数，多次同步后轮换覆盖整个题库
+DELTA_ROTATION_PAGES = 2
+# 参与内容哈希的题库字段，变化时才算作题目变更（触发重新打标签和相似题重建）
+CATALOG_FIELDS = ("leetcode_id", "title", "title_slug", "difficulty", "category", "tags", "is_premium", "content")
+# 随提交量变化的统计字段，只刷新数值
+VOLATILE_FIELDS = ("acceptance_rate", "frequency")
+
+# 进度回调，参数为 pages_done / pages_total / rows_upserted / rows_unchanged
+ProgressCallback = Callable[[Dict[str, int]], None]
+
+
+class ProblemSyncService:
+    """题库同步服务类"""
+
+    def __init__(self, queue_size: int = 4):
+        self.queue_size = queue_size
+        self.content_service = ProblemContentService()
+        self.tag_service = ProblemTagService()
+        self.logger = logging.getLogger(__name__)
+
+    async def sync(
+        self,
+        batch_size: int = 50,
+        max_problems: Optional[int] = None,
+        resume: bool = True,
+        mode: str = "full",
+        crawler: Optional[CrawlerService] = None,
+        rotation_pages: int = DELTA_ROTATION_PAGES,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """同步题目列表
+
+        full: 按偏移量全量同步；resume 为 True 且上次同步参数相同、未完成时从断点继续
+        delta: 只抓取水位之后的新题和 rotation_pages 页轮换抽查的旧题；没有水位时退化为全量同步
+        每写入一页调用一次 progress；任务被取消时断点标记为 cancelled，下次可继续
+        """
+        if mode not in SYNC_MODES:
+            raise ValueError(f"不支持的同步模式: {mode}")
+        if crawler is None:
+            crawler = await get_shared_crawler()
+        return await self._sync(crawler, batch_size, max_problems, resume, mode, rotation_pages, progress)
+
+    async def _sync(
+        self,
+        crawler: CrawlerService,
+        batch_size: int,
+        max_problems: Optional[int],
+        resume: bool,
+        mode: str,
+        rotation_pages: int,
+        progress: Optional[ProgressCallback]
+    ) -> Dict[str, Any]:
+        watermark = self.get_watermark() if mode == "delta" else None
+        if mode == "delta" and watermark is None:
+            print("尚无同步水位，本次改为全量同步")
+            mode = "full"
+
+        bytes_before = crawler.stats["bytes_received"]
+        # 先取题目总数，以便规划页数、报告进度
+        stats_result = await crawler.get_problem_statistics()
+        if not stats_result["success"]:
+            return {"success": False, "mode": mode, "error": stats_result["error"]}
+        total = stats_result["statistics"]["total_problems"]
+
+        if mode == "full":
+            target_count = min(max_problems or total, total)
+            checkpoint = self._prepare_checkpoint(batch_size, max_problems, resume)
+            offsets = list(range(checkpoint["start_offset"], target_count, batch_size))
+            print(f"全量同步：目标 {target_count} 题，起始偏移量 {checkpoint['start_offset']}，共 {len(offsets)} 页")
+            pages = crawler.iter_pages(offsets, batch_size, target_count, refresh=True)
+            result = await self._run(pages, checkpoint["id"], checkpoint["start_offset"], len(offsets), progress)
+            result["resumed"] = checkpoint["resumed"]
+            result["start_offset"] = checkpoint["start_offset"]
+            known_total = result["committed_offset"]
+            next_rotation = 0
+        else:
+            offsets, next_rotation = plan_delta_offsets(
+                total, batch_size, watermark["known_total"], watermark["rotation_offset"], rotation_pages
+            )
+            print(f"增量同步：题库共 {total} 题，已同步 {watermark['known_total']} 题，本次抓取 {len(offsets)} 页")
+            pages = crawler.iter_pages(offsets, batch_size, total, refresh=True)
+            result = await self._run(pages, None, 0, len(offsets), progress)
+            known_total = total
+
+        result["mode"] = mode
+        result["bytes"] = crawler.stats["bytes_received"] - bytes_before
+        result["rows_changed"] = result["created"] + result["updated"]
+        if result["success"]:
+            self._save_watermark(mode, known_total, next_rotation, result)
+        return result
+
+    async def hydrate_details(
+        self,
+        only_missing: bool = True,
+        limit: Optional[int] = None,
+        batch_size: int = DETAIL_BATCH_SIZE,
+        crawler: Optional[CrawlerService] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """抓取题目详情（内容、提示、示例）并逐批写库；only_missing 为 True 时只处理还没有内容的题目"""
+        slugs = self._detail_slugs(only_missing, limit)
+        if crawler is None:
+            crawler = await get_shared_crawler()
+        return await self._hydrate(crawler, slugs, batch_size, progress)
+
+    async def _hydrate(
+        self,
+        crawler: CrawlerService,
+        slugs: List[str],
+        batch_size: int,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        result = {
+            "success": True,
+            "total": len(slugs),
+            "batches": 0,
+            "updated": 0,
+            "missing_slugs": [],
+            "failed_slugs": [],
+        }
+        start = time.perf_counter()
+        requests_before = crawler.stats["requests_made"]
+        bytes_before = crawler.stats["bytes_received"]
+        loop = asyncio.get_event_loop()
+        batches_total = -(-len(slugs) // batch_size)
+        print(f"开始获取题目详情: {len(slugs)} 题，每批 {batch_size} 题")
+        # 生成器只预取 max_concurrency 批，写库时不会无限积压
+        async for chunk, batch in crawler.iter_problem_details(slugs, batch_size):
+            result["batches"] += 1
+            if not batch["success"]:
+                result["failed_slugs"].extend(chunk)
+                self.logger.warning(f"获取题目详情失败: {batch['error']}")
+            else:
+                result["missing_slugs"].extend(batch["missing"])
+                result["updated"] += await loop.run_in_executor(None, self._commit_details, batch["problems"])
+            if progress:
+                progress({
+                    "pages_done": result["batches"],
+                    "pages_total": batches_total,
+                    "rows_upserted": result["updated"],
+                    "rows_unchanged": 0,
+                })
+        result["success"] = not result["failed_slugs"]
+        result["requests"] = crawler.stats["requests_made"] - requests_before
+        result["bytes"] = crawler.stats["bytes_received"] - bytes_before
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def _detail_slugs(self, only_missing: bool, limit: Optional[int]) -> List[str]:
+        db = SessionLocal()
+        try:
+            query = db.query(LeetCodeProblem.title_slug).filter(LeetCodeProblem.title_slug.isnot(None))
+            if only_missing:
+                query = query.filter((LeetCodeProblem.content.is_(None)) | (LeetCodeProblem.content == ""))
+            query = query.order_by(LeetCodeProblem.leetcode_id)
+            if limit:
+                query = query.limit(limit)
+            return [row[0] for row in query.all()]
+        finally:
+            db.close()
+
+    def _commit_details(self, details: List[Dict[str, Any]]) -> int:
+        """一批题目详情在一个事务中写入；题目 HTML 在这里规范化一次，Markdown 与纯文本一并保存"""
+        db = SessionLocal()
+        try:
+            by_slug = {detail["title_slug"]: detail for detail in details}
+            problems = db.query(LeetCodeProblem).filter(LeetCodeProblem.title_slug.in_(list(by_slug.keys()))).all()
+            normalized = self.content_service.store(
+                db, {problem.id: by_slug[problem.title_slug].get("content_html") for problem in problems}
+            )
+            now = datetime.utcnow()
+            for problem in problems:
+                for key, value in _to_detail_row(by_slug[problem.title_slug]).items():
+                    setattr(problem, key, value)
+                problem.content = normalized[problem.id].text
+                problem.updated_at = now
+            db.commit()
+            return len(problems)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """获取题目同步断点"""
+        db = SessionLocal()
+        try:
+            checkpoint = db.query(SyncCheckpoint).filter(SyncCheckpoint.name == PROBLEMS_CHECKPOINT).first()
+            return _checkpoint_to_dict(checkpoint) if checkpoint else None
+        finally:
+            db.close()
+
+    def get_watermark(self) -> Optional[Dict[str, Any]]:
+        """获取增量同步水位与最近一次同步报告"""
+        db = SessionLocal()
+        try:
+            watermark = db.query(SyncWatermark).filter(SyncWatermark.name == PROBLEMS_CHECKPOINT).first()
+            if watermark is None:
+                return None
+            return {
+                "max_leetcode_id": watermark.max_leetcode_id,
+                "known_total": watermark.known_total,
+                "rotation_offset": watermark.rotation_offset,
+                "last_mode": watermark.last_mode,
+                "last_report": json.loads(watermark.last_report) if watermark.last_report else None,
+                "updated_at": watermark.updated_at.isoformat() if watermark.updated_at else None,
+            }
+        finally:
+            db.close()
+
+    def _save_watermark(self, mode: str, known_total: int, rotation_offset: int, report: Dict[str, Any]):
+        db = SessionLocal()
+        try:
+            watermark = db.query(SyncWatermark).filter(SyncWatermark.name == PROBLEMS_CHECKPOINT).first()
+            if watermark is None:
+                watermark = SyncWatermark(name=PROBLEMS_CHECKPOINT)
+                db.add(watermark)
+            watermark.max_leetcode_id = db.query(func.max(ProblemSyncHash.leetcode_id)).scalar() or 0
+            watermark.known_total = max(known_total, watermark.known_total or 0) if mode == "delta" else known_total
+            watermark.rotation_offset = rotation_offset
+            watermark.last_mode = mode
+            watermark.last_report = json.dumps(report, ensure_ascii=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _prepare_checkpoint(self, batch_size: int, max_problems: Optional[int], resume: bool) -> Dict[str, Any]:
+        """读取或重置断点，返回本次同步的起始状态"""
+        db = SessionLocal()
+        try:
+            checkpoint = db.query(SyncCheckpoint).filter(SyncCheckpoint.name == PROBLEMS_CHECKPOINT).first()
+            resumable = (
+                resume and checkpoint is not None
+                and checkpoint.status != "completed"
+                and checkpoint.batch_size == batch_size
+                and checkpoint.max_problems == max_problems
+            )
+            if checkpoint is None:
+                checkpoint = SyncCheckpoint(name=PROBLEMS_CHECKPOINT, batch_size=batch_size)
+                db.add(checkpoint)
+            if not resumable:
+                checkpoint.batch_size = batch_size
+                checkpoint.max_problems = max_problems
+                checkpoint.committed_offset = 0
+                checkpoint.pages_committed = 0
+                checkpoint.rows_created = 0
+                checkpoint.rows_updated = 0
+                checkpoint.started_at = datetime.utcnow()
+            checkpoint.status = "running"
+            checkpoint.error = None
+            checkpoint.completed_at = None
+            db.commit()
+            return {"id": checkpoint.id, "start_offset": checkpoint.committed_offset, "resumed": resumable}
+        finally:
+            db.close()
+
+    async def _run(
+        self,
+        pages: AsyncIterator,
+        checkpoint_id: Optional[int],
+        start_offset: int = 0,
+        pages_total: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """生产者抓取分页放入有界队列，消费者逐页写库；checkpoint_id 不为空时同时推进断点"""
+        result = {
+            "success": True,
+            "committed_offset": start_offset,
+            "pages": 0,
+            "created": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "stats_refreshed": 0,
+            "seconds": 0.0,
+        }
+        start = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async def produce():
+            try:
+                async for page in pages:
+                    await queue.put(page)
+            except Exception as e:
+                await queue.put(e)
+            else:
+                await queue.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        loop = asyncio.get_event_loop()
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                offset, problems = item
+                page_stats = await loop.run_in_executor(None, self._commit_page, checkpoint_id, offset, problems)
+                result["pages"] += 1
+                for key in ("created", "updated", "unchanged", "stats_refreshed"):
+                    result[key] += page_stats[key]
+                result["committed_offset"] = max(result["committed_offset"], offset + len(problems))
+                print(f"已写入第 {offset + 1}-{offset + len(problems)} 题"
+                      f"（新增 {page_stats['created']}，更新 {page_stats['updated']}）")
+                if progress:
+                    progress({
+                        "pages_done": result["pages"],
+                        "pages_total": pages_total or result["pages"],
+                        "rows_upserted": result["created"] + result["updated"],
+                        "rows_unchanged": result["unchanged"],
+                    })
+            if checkpoint_id:
+                self._finish_checkpoint(checkpoint_id, "completed")
+        except asyncio.CancelledError:
+            # 已提交的页不受影响，断点保留，下次同步从这里继续
+            if checkpoint_id:
+                self._finish_checkpoint(checkpoint_id, "cancelled")
+            raise
+        except Exception as e:
+            error = f"同步在偏移量 {e.offset} 处失败: {e.error}" if isinstance(e, CrawlerPageError) else str(e)
+            self.logger.error(error)
+            if checkpoint_id:
+                self._finish_checkpoint(checkpoint_id, "failed", error)
+            result["success"] = False
+            result["error"] = error
+        finally:
+            if not producer.done():
+                producer.cancel()
+            result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def _commit_page(self, checkpoint_id: Optional[int], offset: int, problems: List[Dict[str, Any]]) -> Dict[str, int]:
+        """写入一页题目：内容哈希未变的题目只刷新统计字段；断点与题目在同一事务中提交"""
+        stats = {"created": 0, "updated": 0, "unchanged": 0, "stats_refreshed": 0}
+        db = SessionLocal()
+        try:
+            rows = {row["leetcode_id"]: row for row in (_to_row(p) for p in problems)}
+            hashes = {leetcode_id: content_hash(row) for leetcode_id, row in rows.items()}
+            stored = dict(
+                db.query(ProblemSyncHash.leetcode_id, ProblemSyncHash.content_hash)
+                .filter(ProblemSyncHash.leetcode_id.in_(list(rows.keys()))).all()
+            )
+            changed_ids = [leetcode_id for leetcode_id in rows if stored.get(leetcode_id) != hashes[leetcode_id]]
+            unchanged_ids = [leetcode_id for leetcode_id in rows if stored.get(leetcode_id) == hashes[leetcode_id]]
+            stats["unchanged"] = len(unchanged_ids)
+
+            if unchanged_ids:
+                # 题库字段没变，只按主键批量更新有变化的统计字段，不修改 updated_at
+                refreshed = []
+                current = db.query(
+                    LeetCodeProblem.id, LeetCodeProblem.leetcode_id,
+                    *(getattr(LeetCodeProblem, key) for key in VOLATILE_FIELDS)
+                ).filter(LeetCodeProblem.leetcode_id.in_(unchanged_ids)).all()
+                for record in current:
+                    values = {key: rows[record.leetcode_id][key] for key in VOLATILE_FIELDS if key in rows[record.leetcode_id]}
+                    if any(getattr(record, key) != value for key, value in values.items()):
+                        refreshed.append({"id": record.id, **values})
+                if refreshed:
+                    db.execute(update(LeetCodeProblem), refreshed)
+                    stats["stats_refreshed"] += len(refreshed)
+
+            if changed_ids:
+                existing = {
+                    p.leetcode_id: p
+                    for p in db.query(LeetCodeProblem).filter(LeetCodeProblem.leetcode_id.in_(changed_ids)).all()
+                }
+                now = datetime.utcnow()
+                written = []
+                for leetcode_id in changed_ids:
+                    row = rows[leetcode_id]
+                    problem = existing.get(leetcode_id)
+                    if problem is None:
+                        problem = LeetCodeProblem(**row)
+                        db.add(problem)
+                        stats["created"] += 1
+                    else:
+                        changed = False
+                        refreshed = False
+                        for key, value in row.items():
+                            if getattr(problem, key) != value:
+                                setattr(problem, key, value)
+                                if key in VOLATILE_FIELDS:
+                                    refreshed = True
+                                else:
+                                    changed = True
+                        if changed:
+                            problem.updated_at = now
+                            stats["updated"] += 1
+                        else:
+                            # 库中已有相同的题库数据，只是还没有哈希记录（或哈希规则变化）
+                            stats["unchanged"] += 1
+                            stats["stats_refreshed"] += int(refreshed)
+                    written.append(problem)
+                    db.merge(ProblemSyncHash(leetcode_id=leetcode_id, content_hash=hashes[leetcode_id], synced_at=now))
+                db.flush()
+                self.tag_service.label(db, written)
+
+            if checkpoint_id:
+                checkpoint = db.query(SyncCheckpoint).filter(SyncCheckpoint.id == checkpoint_id).first()
+                checkpoint.committed_offset = offset + len(problems)
+                checkpoint.pages_committed += 1
+                checkpoint.rows_created += stats["created"]
+                checkpoint.rows_updated += stats["updated"]
+            db.commit()
+            return stats
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _finish_checkpoint(self, checkpoint_id: int, status: str, error: Optional[str] = None):
+        db = SessionLocal()
+        try:
+            checkpoint = db.query(SyncCheckpoint).filter(SyncCheckpoint.id == checkpoint_id).first()
+            checkpoint.status = status
+            checkpoint.error = error
+            if status == "completed":
+                checkpoint.completed_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+
+def _to_row(problem: Dict[str, Any]) -> Dict[str, Any]:
+    """爬虫题目数据转换为 LeetCodeProblem 字段"""
+    row = {}
+    for key, value in problem.items():
+        if key in ("created_at", "updated_at") or not hasattr(LeetCodeProblem, key):
+            continue
+        if key == "tags" and isinstance(value, list):
+            value = json.dumps(value, ensure_ascii=False)
+        row[key] = getattr(value, "value", value)
+    return row
+
+
+def _to_detail_row(detail: Dict[str, Any]) -> Dict[str, Any]:
+    """题目详情转换为 LeetCodeProblem 字段（题目内容另行规范化），模型中没有的字段跳过"""
+    row = {
+        "hints": json.dumps(detail.get("hints") or [], ensure_ascii=False),
+    }
+    optional = {
+        "similar_questions": json.dumps(detail.get("similar_questions") or [], ensure_ascii=False),
+        "sample_test_case": detail.get("sample_test_case"),
+        "example_testcases": detail.get("example_testcases"),
+    }
+    for key, value in optional.items():
+        if hasattr(LeetCodeProblem, key):
+            row[key] = value
+    return row
+
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """题目的内容哈希，只覆盖题库字段，统计字段的变化不影响哈希"""
+    catalog = {key: row[key] for key in CATALOG_FIELDS if key in row}
+    canonical = json.dumps(catalog, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def plan_delta_offsets(
+    total: int,
+    batch_size: int,
+    known_total: int,
+    rotation_offset: int,
+    rotation_pages: int
+) -> Tuple[List[int], int]:
+    """规划增量同步要抓取的页：轮换抽查的旧页 + 水位之后的新页，返回 (偏移量列表, 下次抽查起点)
+
+    题目列表按题号升序，新题追加在末尾；从已同步前缀所在的页开始抓取即可覆盖全部新题。
+    """
+    new_start = min(known_total, total) // batch_size * batch_size
+    existing_pages = new_start // batch_size
+    offsets = []
+    page = (rotation_offset // batch_size) % existing_pages if existing_pages else 0
+    for _ in range(min(rotation_pages, existing_pages)):
+        offsets.append(page * batch_size)
+        page = (page + 1) % existing_pages
+    offsets.extend(range(new_start, total, batch_size))
+    return offsets, page * batch_size
+
+
+def _checkpoint_to_dict(checkpoint: SyncCheckpoint) -> Dict[str, Any]:
+    return {
+        "name": checkpoint.name,
+        "status": checkpoint.status,
+        "batch_size": checkpoint.batch_size,
+        "max_problems": checkpoint.max_problems,
+        "committed_offset": checkpoint.committed_offset,
+        "pages_committed": checkpoint.pages_committed,
+        "rows_created": checkpoint.rows_created,
+        "rows_updated": checkpoint.rows_updated,
+        "error": checkpoint.error,
+        "started_at": checkpoint.started_at.isoformat() if checkpoint.started_at else None,
+        "updated_at": checkpoint.updated_at.isoformat() if checkpoint.updated_at else None,
+        "completed_at": checkpoint.completed_at.isoformat() if checkpoint.completed_at else None,
+    }
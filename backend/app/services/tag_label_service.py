@@ -0,0 +1,118 @@
+"""
+题目分类标签服务
+按共享的标签分类表为题目写入多分类标签（ProblemTagLabel），并同步主分类到 LeetCodeProblem.category；
+分类表调整后可对整个题库批量重新分类
+"""
+
+import json
+import time
+import logging
+from typing import Dict, Any, Iterable, List
+
+from sqlalchemy import func, exists
+from sqlalchemy.orm import Session
+
+from ..models.problem import LeetCodeProblem
+from ..models.problem_tag_label import ProblemTagLabel
+from ..core.database import SessionLocal
+from .tag_taxonomy import taxonomy
+
+
+class ProblemTagService:
+    """题目分类标签的写入与批量重分类"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def label(self, db: Session, problems: Iterable[LeetCodeProblem]) -> int:
+        """为一批已有 ID 的题目重写分类标签并更新主分类，不提交事务；返回写入的标签数"""
+        labels: Dict[int, List[Dict[str, Any]]] = {}
+        for problem in problems:
+            rows = self._classify(problem.id, problem.tags)
+            labels[problem.id] = rows
+            problem.category = rows[0]["category"]
+        return self._replace(db, labels)
+
+    def reclassify_all(self, batch_size: int = 1000, only_unlabeled: bool = False, on_progress=None) -> Dict[str, Any]:
+        """按当前分类表重新分类整个题库：分批读取标签，批量重写标签表，只更新主分类有变化的题目；
+        only_unlabeled 时只处理还没有分类标签的题目（如种子数据和分类表上线前入库的题目）"""
+        stats = {"problems": 0, "labels": 0, "category_changed": 0, "multi_label": 0, "seconds": 0.0}
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            query = db.query(LeetCodeProblem.id, LeetCodeProblem.tags, LeetCodeProblem.category)
+            if only_unlabeled:
+                query = query.filter(~exists().where(ProblemTagLabel.problem_id == LeetCodeProblem.id))
+            last_id = 0
+            while True:
+                rows = query.filter(LeetCodeProblem.id > last_id).order_by(LeetCodeProblem.id).limit(batch_size).all()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                labels = {}
+                changed = []
+                for problem_id, tags, category in rows:
+                    labels[problem_id] = self._classify(problem_id, tags)
+                    primary = labels[problem_id][0]["category"]
+                    if primary != category:
+                        changed.append({"id": problem_id, "category": primary})
+                    if len(labels[problem_id]) > 1:
+                        stats["multi_label"] += 1
+                stats["labels"] += self._replace(db, labels)
+                if changed:
+                    db.bulk_update_mappings(LeetCodeProblem, changed)
+                db.commit()
+                stats["problems"] += len(rows)
+                stats["category_changed"] += len(changed)
+                if on_progress:
+                    on_progress(stats)
+        finally:
+            db.close()
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        return stats
+
+    def get_category_counts(self) -> Dict[str, int]:
+        """各分类下的题目数（多分类题目在每个分类中各计一次）"""
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(ProblemTagLabel.category, func.count(ProblemTagLabel.problem_id))
+                .group_by(ProblemTagLabel.category).all()
+            )
+            return {category: count for category, count in rows}
+        finally:
+            db.close()
+
+    def _classify(self, problem_id: int, tags) -> List[Dict[str, Any]]:
+        return [
+            {
+                "problem_id": problem_id,
+                "category": category.value,
+                "weight": weight,
+                "is_primary": index == 0,
+            }
+            for index, (category, weight) in enumerate(taxonomy.classify(_parse_tags(tags)))
+        ]
+
+    def _replace(self, db: Session, labels: Dict[int, List[Dict[str, Any]]]) -> int:
+        if not labels:
+            return 0
+        db.query(ProblemTagLabel).filter(
+            ProblemTagLabel.problem_id.in_(list(labels.keys()))
+        ).delete(synchronize_session=False)
+        mappings = [row for rows in labels.values() for row in rows]
+        db.bulk_insert_mappings(ProblemTagLabel, mappings)
+        return len(mappings)
+
+
+def _parse_tags(tags) -> List[str]:
+    """解析题目标签（数据库中可能是列表或JSON字符串）"""
+    if isinstance(tags, list):
+        return [str(t) for t in tags]
+    if not tags:
+        return []
+    try:
+        parsed = json.loads(tags)
+    except (TypeError, ValueError):
+        return []
+    return [str(t) for t in parsed] if isinstance(parsed, list) else []
@@ -0,0 +1,186 @@
+"""
+题目标签分类表
+以 LeetCode 标签 slug 为键直接映射到分类及权重，一道题可同时属于多个分类（如「二叉搜索树」同时属于树和二分查找）；
+分类只需对题目标签逐个查表，爬虫、离线导入与推荐共用同一张表
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..models.problem import ProblemCategory
+
+C = ProblemCategory
+
+# 标签 slug -> [(分类, 权重)]；权重越高越能代表题目的考点，数组、字符串等通用容器标签权重较低
+TAG_TAXONOMY: Dict[str, List[Tuple[ProblemCategory, float]]] = {
+    "array": [(C.ARRAY, 0.4)],
+    "matrix": [(C.ARRAY, 0.5)],
+    "prefix-sum": [(C.ARRAY, 0.7)],
+    "two-pointers": [(C.ARRAY, 0.5), (C.STRING, 0.3)],
+    "sliding-window": [(C.ARRAY, 0.6), (C.STRING, 0.4)],
+    "string": [(C.STRING, 0.5)],
+    "string-matching": [(C.STRING, 1.0)],
+    "suffix-array": [(C.STRING, 1.0)],
+    "trie": [(C.STRING, 0.8), (C.TREE, 0.6)],
+    "linked-list": [(C.LINKED_LIST, 1.0)],
+    "doubly-linked-list": [(C.LINKED_LIST, 1.0)],
+    "tree": [(C.TREE, 1.0)],
+    "binary-tree": [(C.TREE, 1.0)],
+    "binary-search-tree": [(C.TREE, 1.0), (C.BINARY_SEARCH, 0.6)],
+    "segment-tree": [(C.TREE, 0.9), (C.DIVIDE_AND_CONQUER, 0.4)],
+    "binary-indexed-tree": [(C.TREE, 0.8), (C.BIT_MANIPULATION, 0.3)],
+    "depth-first-search": [(C.GRAPH, 0.6), (C.TREE, 0.5), (C.BACKTRACKING, 0.3)],
+    "breadth-first-search": [(C.GRAPH, 0.6), (C.TREE, 0.4), (C.QUEUE, 0.4)],
+    "graph": [(C.GRAPH, 1.0)],
+    "topological-sort": [(C.GRAPH, 1.0), (C.SORTING, 0.3)],
+    "union-find": [(C.GRAPH, 0.9)],
+    "shortest-path": [(C.GRAPH, 1.0), (C.HEAP, 0.4)],
+    "minimum-spanning-tree": [(C.GRAPH, 1.0), (C.GREEDY, 0.4)],
+    "strongly-connected-component": [(C.GRAPH, 1.0)],
+    "biconnected-component": [(C.GRAPH, 1.0)],
+    "eulerian-circuit": [(C.GRAPH, 1.0)],
+    "dynamic-programming": [(C.DYNAMIC_PROGRAMMING, 1.0)],
+    "memoization": [(C.DYNAMIC_PROGRAMMING, 0.8)],
+    "greedy": [(C.GREEDY, 1.0)],
+    "backtracking": [(C.BACKTRACKING, 1.0)],
+    "recursion": [(C.BACKTRACKING, 0.4), (C.DIVIDE_AND_CONQUER, 0.4)],
+    "divide-and-conquer": [(C.DIVIDE_AND_CONQUER, 1.0)],
+    "merge-sort": [(C.SORTING, 0.9), (C.DIVIDE_AND_CONQUER, 0.6)],
+    "quickselect": [(C.SORTING, 0.8), (C.DIVIDE_AND_CONQUER, 0.6)],
+    "binary-search": [(C.BINARY_SEARCH, 1.0)],
+    "sorting": [(C.SORTING, 0.7)],
+    "counting-sort": [(C.SORTING, 0.9)],
+    "bucket-sort": [(C.SORTING, 0.9)],
+    "radix-sort": [(C.SORTING, 0.9)],
+    "hash-table": [(C.HASH_TABLE, 0.6)],
+    "hash-function": [(C.HASH_TABLE, 0.9)],
+    "rolling-hash": [(C.HASH_TABLE, 0.7), (C.STRING, 0.6)],
+    "counting": [(C.HASH_TABLE, 0.4)],
+    "stack": [(C.STACK, 1.0)],
+    "monotonic-stack": [(C.STACK, 1.0)],
+    "queue": [(C.QUEUE, 1.0)],
+    "monotonic-queue": [(C.QUEUE, 1.0)],
+    "heap-priority-queue": [(C.HEAP, 1.0)],
+    "heap": [(C.HEAP, 1.0)],
+    "priority-queue": [(C.HEAP, 1.0)],
+    "math": [(C.MATH, 0.6)],
+    "geometry": [(C.MATH, 1.0)],
+    "number-theory": [(C.MATH, 1.0)],
+    "combinatorics": [(C.MATH, 1.0)],
+    "probability-and-statistics": [(C.MATH, 1.0)],
+    "game-theory": [(C.MATH, 0.8), (C.DYNAMIC_PROGRAMMING, 0.3)],
+    "bit-manipulation": [(C.BIT_MANIPULATION, 1.0)],
+    "bitmask": [(C.BIT_MANIPULATION, 0.8), (C.DYNAMIC_PROGRAMMING, 0.4)],
+}
+
+# 中文标签名 -> slug（种子数据和力扣中国站使用中文标签）
+TAG_ALIASES: Dict[str, str] = {
+    "数组": "array",
+    "矩阵": "matrix",
+    "前缀和": "prefix-sum",
+    "双指针": "two-pointers",
+    "滑动窗口": "sliding-window",
+    "字符串": "string",
+    "字符串匹配": "string-matching",
+    "后缀数组": "suffix-array",
+    "字典树": "trie",
+    "链表": "linked-list",
+    "双向链表": "doubly-linked-list",
+    "树": "tree",
+    "二叉树": "binary-tree",
+    "二叉搜索树": "binary-search-tree",
+    "线段树": "segment-tree",
+    "树状数组": "binary-indexed-tree",
+    "深度优先搜索": "depth-first-search",
+    "广度优先搜索": "breadth-first-search",
+    "图": "graph",
+    "拓扑排序": "topological-sort",
+    "并查集": "union-find",
+    "最短路": "shortest-path",
+    "最小生成树": "minimum-spanning-tree",
+    "强连通分量": "strongly-connected-component",
+    "双连通分量": "biconnected-component",
+    "欧拉回路": "eulerian-circuit",
+    "动态规划": "dynamic-programming",
+    "记忆化搜索": "memoization",
+    "贪心": "greedy",
+    "贪心算法": "greedy",
+    "回溯": "backtracking",
+    "递归": "recursion",
+    "分治": "divide-and-conquer",
+    "归并排序": "merge-sort",
+    "快速选择": "quickselect",
+    "二分查找": "binary-search",
+    "排序": "sorting",
+    "计数排序": "counting-sort",
+    "桶排序": "bucket-sort",
+    "基数排序": "radix-sort",
+    "哈希表": "hash-table",
+    "哈希函数": "hash-function",
+    "滚动哈希": "rolling-hash",
+    "计数": "counting",
+    "栈": "stack",
+    "单调栈": "monotonic-stack",
+    "队列": "queue",
+    "单调队列": "monotonic-queue",
+    "堆（优先队列）": "heap-priority-queue",
+    "堆": "heap",
+    "优先队列": "priority-queue",
+    "数学": "math",
+    "几何": "geometry",
+    "数论": "number-theory",
+    "组合数学": "combinatorics",
+    "概率与统计": "probability-and-statistics",
+    "博弈": "game-theory",
+    "位运算": "bit-manipulation",
+    "状态压缩": "bitmask",
+}
+
+# 权重相同时的主分类优先级：按枚举声明顺序
+_CATEGORY_RANK = {category: rank for rank, category in enumerate(ProblemCategory)}
+_NON_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def tag_slug(tag: Any) -> str:
+    """标签统一为 slug：GraphQL 标签优先取 slug 字段，标签名按 LeetCode 规则转换（Hash Table -> hash-table）"""
+    if isinstance(tag, dict):
+        slug = tag.get("slug")
+        if slug:
+            return str(slug).lower()
+        tag = tag.get("name", "")
+    name = str(tag).strip()
+    if name in TAG_ALIASES:
+        return TAG_ALIASES[name]
+    return _NON_SLUG.sub("-", name.lower()).strip("-")
+
+
+class TagTaxonomy:
+    """标签分类索引：按标签逐个查表得到多个分类及权重"""
+
+    def __init__(self, table: Dict[str, List[Tuple[ProblemCategory, float]]]):
+        self.table = table
+        self.categories = sorted({category for labels in table.values() for category, _ in labels}, key=_CATEGORY_RANK.get)
+
+    def classify(self, tags: Optional[Iterable[Any]]) -> List[Tuple[ProblemCategory, float]]:
+        """题目的全部分类，按权重降序；同一分类取各标签中的最高权重，没有可识别标签时归入「其他」"""
+        weights: Dict[ProblemCategory, float] = {}
+        for tag in tags or ():
+            for category, weight in self.table.get(tag_slug(tag), ()):
+                if weight > weights.get(category, 0.0):
+                    weights[category] = weight
+        if not weights:
+            return [(ProblemCategory.OTHER, 1.0)]
+        return sorted(weights.items(), key=lambda item: (-item[1], _CATEGORY_RANK[item[0]]))
+
+    def primary(self, tags: Optional[Iterable[Any]]) -> ProblemCategory:
+        """主分类：权重最高的分类"""
+        return self.classify(tags)[0][0]
+
+
+# 进程内共享的分类索引
+taxonomy = TagTaxonomy(TAG_TAXONOMY)
+
+
+def categorize_problem_by_tags(tags: Optional[Iterable[Any]]) -> ProblemCategory:
+    """根据标签确定主分类（标签可以是GraphQL返回的字典或标签名字符串）"""
+    return taxonomy.primary(tags)
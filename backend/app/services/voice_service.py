@@ -10,6 +10,18 @@ from typing import Dict, Optional, Any, List
 from datetime import datetime
 import tempfile
 
+
+def sniff_audio_format(header: bytes) -> str:
+    """按文件头识别音频格式并返回扩展名（WAV: RIFF....WAVE；MP3: ID3 标签或帧同步字；M4A: ftyp 盒），无法识别时抛出 ValueError"""
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return ".wav"
+    if header[:3] == b"ID3" or (len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0 and header[1] & 0x06):
+        return ".mp3"
+    if header[4:8] == b"ftyp":
+        return ".m4a"
+    raise ValueError("无法识别的音频文件头，支持 WAV / MP3 / M4A")
+
+
 class VoiceService:
     """语音处理服务类"""
     
@@ -19,6 +31,7 @@ class VoiceService:
         self.sample_width = 2
         self.max_duration = 300  # 最大录音时长（秒）
         self.supported_formats = ['.wav', '.mp3', '.m4a']
+        self.max_file_size = 50 * 1024 * 1024  # 最大文件大小
     
     def validate_audio_file(self, file_path: str) -> Dict[str, Any]:
         """验证音频文件"""
@@ -33,10 +46,10 @@ class VoiceService:
             }
         
         try:
-            # 检查文件大小（限制为50MB）
+            # 检查文件大小
             file_size = os.path.getsize(file_path)
-            if file_size > 50 * 1024 * 1024:
-                return {"valid": False, "error": "文件大小超过50MB限制"}
+            if file_size > self.max_file_size:
+                return {"valid": False, "error": f"文件大小超过{self.max_file_size // 1024 // 1024}MB限制"}
             
             # 如果是WAV文件，检查音频参数
             if file_ext == '.wav':
@@ -0,0 +1,54 @@
+"""
+题目位图工具
+使用Python整数作为位集（第i位表示题目ID为i），用于题单与完成进度的快速集合运算
+"""
+
+import zlib
+from typing import Iterable, List
+
+
+def ids_to_bitmap(ids: Iterable[int]) -> int:
+    """将题目ID集合转换为位图"""
+    bitmap = 0
+    for problem_id in ids:
+        if problem_id is None:
+            continue
+        problem_id = int(problem_id)
+        if problem_id < 0:
+            continue
+        bitmap |= 1 << problem_id
+    return bitmap
+
+
+def bitmap_to_ids(bitmap: int) -> List[int]:
+    """将位图展开为升序的题目ID列表"""
+    ids = []
+    base = 0
+    # 按64位分块扫描，跳过全零块
+    while bitmap:
+        chunk = bitmap & 0xFFFFFFFFFFFFFFFF
+        while chunk:
+            low = chunk & -chunk
+            ids.append(base + low.bit_length() - 1)
+            chunk ^= low
+        bitmap >>= 64
+        base += 64
+    return ids
+
+
+def popcount(bitmap: int) -> int:
+    """统计位图中置位的数量"""
+    return bitmap.bit_count()
+
+
+def bitmap_to_bytes(bitmap: int) -> bytes:
+    """序列化位图（小端字节序 + zlib压缩），用于数据库存储"""
+    raw = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    return zlib.compress(raw)
+
+
+def bitmap_from_bytes(data: bytes) -> int:
+    """从数据库存储的字节反序列化位图"""
+    if not data:
+        return 0
+    return int.from_bytes(zlib.decompress(data), "little")
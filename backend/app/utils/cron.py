@@ -0,0 +1,83 @@
+"""
+cron 表达式解析
+支持五段格式「分 时 日 月 周」，每段可用 *、数字、a-b 区间、逗号列表和 /n 步长；周 0 和 7 都表示周日
+"""
+
+from datetime import datetime, timedelta
+from typing import Set
+
+# 各字段取值范围：分、时、日、月、周
+_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+# 最多向后查找的天数，超过仍无匹配视为表达式永不触发（如 2 月 30 日）
+_MAX_LOOKAHEAD_DAYS = 366 * 5
+
+
+def _parse_field(field: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    try:
+        for part in field.split(","):
+            step = 1
+            has_step = "/" in part
+            if has_step:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = high if has_step else start
+            if not low <= start <= end <= high:
+                raise ValueError
+            values.update(range(start, end + 1, step))
+    except ValueError:
+        raise ValueError(f"无效的 cron 字段: {field}")
+    return values
+
+
+class CronSchedule:
+    """cron 定时规则"""
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron 表达式需要 5 段（分 时 日 月 周）: {expression}")
+        self.expression = expression
+        fields = [_parse_field(part, low, high) for part, (low, high) in zip(parts, _FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = {day % 7 for day in weekdays}
+        # 日和周都有限制时满足其一即可（与标准 cron 一致）
+        self.days_restricted = parts[2] != "*"
+        self.weekdays_restricted = parts[4] != "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_match = moment.day in self.days
+        weekday_match = moment.isoweekday() % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_match or weekday_match
+        if self.days_restricted:
+            return day_match
+        if self.weekdays_restricted:
+            return weekday_match
+        return True
+
+    def next_after(self, after: datetime) -> datetime:
+        """after 之后（不含）的下一个触发时间，精确到分钟"""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=_MAX_LOOKAHEAD_DAYS)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"cron 表达式没有可触发的时间: {self.expression}")
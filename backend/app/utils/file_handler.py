@@ -6,14 +6,28 @@
 import os
 import shutil
 import uuid
-from typing import Dict, Any, Optional
+import asyncio
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, BinaryIO
 from datetime import datetime
 from fastapi import UploadFile
 import mimetypes
 
+# 上传写盘的分块大小
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """上传文件超过大小限制"""
+
 
 class FileHandler:
     """文件处理器"""
+
+    # 上传写盘线程池（各实例共享）：无论多少上传并发，同时驻留内存的只有每个线程手上的一个分块
+    _upload_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="upload-writer")
     
     def __init__(self):
         self.upload_dir = "data/uploads"
@@ -39,28 +53,64 @@ class FileHandler:
             file_extension = os.path.splitext(file.filename)[1].lower()
             unique_filename = f"{uuid.uuid4().hex}{file_extension}"
             
-            # 创建保存路径
+            # 分块保存文件
             save_dir = os.path.join(self.upload_dir, subfolder)
-            os.makedirs(save_dir, exist_ok=True)
-            
-            file_path = os.path.join(save_dir, unique_filename)
+            saved = await self.save_upload_stream(file, save_dir, self.max_file_size, filename=unique_filename)
             
-            # 保存文件
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-            
-            return file_path
+            return saved["path"]
             
         except Exception as e:
             raise Exception(f"保存文件失败: {str(e)}")
+
+    async def save_upload_stream(self, file: UploadFile, save_dir: str, max_size: int,
+                                 check_header: Optional[Callable[[bytes], str]] = None,
+                                 filename: Optional[str] = None) -> Dict[str, Any]:
+        """
+        在线程池中把上传文件按固定大小分块写入 save_dir，不把整个文件读进内存。
+        边写边累计大小（超过 max_size 立即停止并抛出 UploadTooLargeError）并计算 SHA-256；
+        check_header 收到第一个分块，文件头不合法时抛出 ValueError，合法时返回文件扩展名。
+        未指定 filename 时以「SHA-256 + 扩展名」命名，内容相同的文件只保存一份。
+        返回 {"path", "filename", "size", "sha256", "extension"}
+        """
+        if file.size is not None and file.size > max_size:
+            raise UploadTooLargeError(f"文件大小超过限制 ({max_size / 1024 / 1024:g}MB)")
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._upload_executor, self._copy_upload, file.file, save_dir, max_size, check_header, filename
+        )
+
+    @staticmethod
+    def _copy_upload(source: BinaryIO, save_dir: str, max_size: int,
+                     check_header: Optional[Callable[[bytes], str]], filename: Optional[str]) -> Dict[str, Any]:
+        os.makedirs(save_dir, exist_ok=True)
+        source.seek(0)
+        digest = hashlib.sha256()
+        size = 0
+        extension = ""
+        fd, temp_path = tempfile.mkstemp(dir=save_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as target:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if check_header is not None:
+                    extension = check_header(chunk)
+                while chunk:
+                    size += len(chunk)
+                    if size > max_size:
+                        raise UploadTooLargeError(f"文件大小超过限制 ({max_size / 1024 / 1024:g}MB)")
+                    digest.update(chunk)
+                    target.write(chunk)
+                    chunk = source.read(UPLOAD_CHUNK_SIZE)
+            sha256 = digest.hexdigest()
+            filename = filename or f"{sha256}{extension}"
+            file_path = os.path.join(save_dir, filename)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return {"path": file_path, "filename": filename, "size": size, "sha256": sha256, "extension": extension}
     
     def _validate_file(self, file: UploadFile):
-        """验证文件"""
-        # 检查文件大小
-        if hasattr(file, 'size') and file.size > self.max_file_size:
-            raise ValueError(f"文件大小超过限制 ({self.max_file_size / 1024 / 1024}MB)")
-        
+        """验证文件（大小在分块写入时检查）"""
         # 检查文件扩展名
         if file.filename:
             file_extension = os.path.splitext(file.filename)[1].lower()
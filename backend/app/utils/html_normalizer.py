@@ -0,0 +1,267 @@
+"""
+题目 HTML 规范化
+用标准库 html.parser 单次扫描，把题目 HTML 同时转换为 Markdown 和纯文本：
+保留 <pre> 代码块的原始换行与缩进、有序/无序列表和 <sup> 指数（10<sup>4</sup> → 10^4），实体由解析器统一解码
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List, NamedTuple, Optional, Tuple
+
+# 规范化规则版本，规则变化后据此识别需要重新转换的内容
+NORMALIZER_VERSION = 1
+
+_WHITESPACE = re.compile(r"[ \t\r\n\f\u00a0]+")
+_HTML_TAG = re.compile(r"<(?:p|div|pre|code|ul|ol|li|br|strong|em|sup|sub|img|a|span|b|i)\b[^>]*>", re.IGNORECASE)
+
+_BLOCK_TAGS = {"p", "div", "section", "article", "blockquote", "table", "header", "footer"}
+_HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_EMPHASIS_MARKS = {"strong": "**", "b": "**", "em": "*", "i": "*"}
+_SKIP_TAGS = {"script", "style"}
+
+
+class NormalizedContent(NamedTuple):
+    markdown: str
+    text: str
+
+
+def looks_like_html(content: Optional[str]) -> bool:
+    """粗略判断字符串是否为 HTML（导入数据中题目内容可能已是纯文本）"""
+    return bool(content) and _HTML_TAG.search(content) is not None
+
+
+def normalize_html(html: Optional[str]) -> NormalizedContent:
+    """将题目 HTML 转换为 (Markdown, 纯文本)"""
+    if not html:
+        return NormalizedContent("", "")
+    parser = _ContentParser()
+    parser.feed(html)
+    parser.close()
+    return parser.result()
+
+
+class _ContentParser(HTMLParser):
+    """同时写两个输出：md 与 text；换行和空格延迟到下一段文字输出前再写，避免多余空行"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._md: List[str] = []
+        self._text: List[str] = []
+        self._pending_breaks = 0
+        self._hard_break = False
+        self._pending_space = False
+        self._started = False  # 已输出过文字
+        self._line_start = True
+        self._pre_depth = 0
+        self._pre_fresh = False  # 刚进入 <pre>，忽略紧随其后的一个换行
+        self._lists: List[List] = []  # [标签, 当前序号]
+        self._item_marker: Optional[str] = None
+        self._links: List[Optional[str]] = []
+        self._skip_depth = 0
+        self._code_depth = 0
+
+    # 输出
+
+    def _write(self, md: str, text: Optional[str] = None):
+        self._md.append(md)
+        self._text.append(md if text is None else text)
+
+    def _block(self, breaks: int = 2):
+        if self._started:
+            self._pending_breaks = max(self._pending_breaks, breaks)
+        self._pending_space = False
+
+    def _flush(self, keep_space: bool = True):
+        """写出积攒的换行、列表标记与空格"""
+        if self._pending_breaks:
+            if self._hard_break and self._pending_breaks == 1:
+                self._write("  \n", "\n")
+            else:
+                self._write("\n" * self._pending_breaks)
+            self._pending_breaks = 0
+            self._hard_break = False
+            self._pending_space = False
+            self._line_start = True
+        if self._line_start:
+            indent = "   " * max(len(self._lists) - 1, 0)
+            if self._item_marker is not None:
+                self._write(indent + self._item_marker)
+                self._item_marker = None
+            elif self._lists:
+                self._write(indent + "   ")
+            self._line_start = False
+            self._pending_space = False
+        elif self._pending_space and keep_space:
+            self._write(" ")
+            self._pending_space = False
+        self._started = True
+
+    def _inline(self, md: str, text: str = "", closing: bool = False):
+        """写入行内标记；闭合标记不吞掉其后的空格"""
+        if closing:
+            self._write(md, text)
+        else:
+            self._flush()
+            self._write(md, text)
+
+    # 解析回调
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if self._pre_depth:
+            if tag == "sup":
+                self._write("^")
+            elif tag == "sub":
+                self._write("_")
+            elif tag == "br":
+                self._write("\n")
+            return
+        attributes = dict(attrs)
+        if tag in _BLOCK_TAGS:
+            self._block()
+        elif tag in _HEADING_TAGS:
+            self._block()
+            self._inline("#" * _HEADING_TAGS[tag] + " ")
+        elif tag == "pre":
+            self._block()
+            self._flush()
+            self._write("```\n", "")
+            self._pre_depth += 1
+            self._pre_fresh = True
+        elif tag == "br":
+            if self._started:
+                self._pending_breaks = max(self._pending_breaks, 1)
+                self._hard_break = True
+            self._pending_space = False
+        elif tag in ("ul", "ol"):
+            self._block(2 if not self._lists else 1)
+            self._lists.append([tag, 0])
+        elif tag == "li":
+            self._block(1)
+            if self._lists:
+                self._lists[-1][1] += 1
+                kind, number = self._lists[-1]
+                self._item_marker = f"{number}. " if kind == "ol" else "- "
+            else:
+                self._item_marker = "- "
+            self._line_start = True
+        elif tag == "tr":
+            self._block(1)
+        elif tag in ("td", "th"):
+            self._pending_space = True
+        elif tag == "hr":
+            self._block()
+            self._inline("---", "")
+            self._block()
+        elif tag == "code":
+            self._code_depth += 1
+            if self._code_depth == 1:
+                self._inline("`", "")
+        elif tag in _EMPHASIS_MARKS and not self._code_depth:
+            self._inline(_EMPHASIS_MARKS[tag], "")
+        elif tag == "sup":
+            self._inline("^", "^", closing=True)
+        elif tag == "sub":
+            self._inline("_", "_", closing=True)
+        elif tag == "a":
+            href = attributes.get("href")
+            self._links.append(href)
+            if href and not self._code_depth:
+                self._inline("[", "")
+        elif tag == "img":
+            alt = attributes.get("alt") or ""
+            src = attributes.get("src") or ""
+            if src:
+                self._inline(f"![{alt}]({src})", alt)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+            return
+        if tag == "pre" and self._pre_depth:
+            self._pre_depth -= 1
+            if not self._pre_depth:
+                # 代码块结尾的换行由闭合围栏/段落分隔代替
+                _strip_last_newline(self._md)
+                _strip_last_newline(self._text)
+                self._write("\n```", "")
+                self._started = True
+                self._line_start = False
+                self._block()
+            return
+        if self._pre_depth:
+            return
+        if tag in _BLOCK_TAGS or tag in _HEADING_TAGS:
+            self._block()
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            self._block(2 if not self._lists else 1)
+        elif tag == "li":
+            self._item_marker = None
+            self._block(1)
+        elif tag == "code":
+            self._code_depth = max(self._code_depth - 1, 0)
+            if not self._code_depth:
+                self._inline("`", "", closing=True)
+        elif tag in _EMPHASIS_MARKS and not self._code_depth:
+            self._inline(_EMPHASIS_MARKS[tag], "", closing=True)
+        elif tag == "a":
+            href = self._links.pop() if self._links else None
+            if href and not self._code_depth:
+                self._inline(f"]({href})", "", closing=True)
+
+    def handle_data(self, data: str):
+        if self._skip_depth or not data:
+            return
+        if self._pre_depth:
+            if self._pre_fresh:
+                self._pre_fresh = False
+                if data.startswith("\r\n"):
+                    data = data[2:]
+                elif data.startswith("\n"):
+                    data = data[1:]
+                if not data:
+                    return
+            data = data.replace("\u00a0", " ").replace("\r\n", "\n")
+            self._write(data)
+            return
+        collapsed = _WHITESPACE.sub(" ", data)
+        if collapsed.startswith(" "):
+            self._pending_space = True
+            collapsed = collapsed[1:]
+        if not collapsed:
+            return
+        trailing = collapsed.endswith(" ")
+        if trailing:
+            collapsed = collapsed[:-1]
+        self._flush()
+        self._write(_escape_markdown(collapsed) if not self._code_depth else collapsed, collapsed)
+        self._pending_space = trailing
+
+    def result(self) -> NormalizedContent:
+        return NormalizedContent("".join(self._md).strip(), "".join(self._text).strip())
+
+
+def _strip_last_newline(parts: List[str]) -> bool:
+    """去掉输出末尾的一个换行"""
+    for i in range(len(parts) - 1, -1, -1):
+        if parts[i]:
+            if parts[i].endswith("\n"):
+                parts[i] = parts[i][:-1]
+                return True
+            return False
+    return False
+
+
+_MARKDOWN_SPECIAL = re.compile(r"([\\`*_])")
+
+
+def _escape_markdown(text: str) -> str:
+    """转义正文中会被当作 Markdown 标记的字符"""
+    return _MARKDOWN_SPECIAL.sub(r"\\\1", text)
@@ -0,0 +1,262 @@
+"""
+持久化响应缓存
+基于 SQLite 文件，按请求体哈希存储 JSON 响应，多个实例和进程共享：
+按操作类型设置有效期，过期后在宽限期内仍可先返回旧数据再后台刷新，总大小超限时按最近访问时间淘汰。
+总大小由触发器维护在 response_cache_size 中，写入时只读一行计数，不做全表求和；
+读取时的最近访问时间和命中统计先记在内存中，攒够一批或到达间隔后在一个事务中写回，读缓存本身不写库。
+所有方法都是同步阻塞的，异步调用方应放到线程池中执行
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+# 缓存状态
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+# 内存中待写回的访问记录达到该数量或距上次写回超过该间隔（秒）时写回
+FLUSH_BATCH = 256
+FLUSH_INTERVAL = 5.0
+
+
+def payload_hash(payload: Dict[str, Any]) -> str:
+    """请求体的规范化哈希"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite 持久化响应缓存"""
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._pending_lock = threading.Lock()
+        self._pending_access: Dict[str, float] = {}  # 键 -> 最近访问时间
+        self._pending_stats: Dict[str, int] = {}
+        self._flushed_at = time.monotonic()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    operation TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    raw_bytes INTEGER NOT NULL,
+                    stored_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    stale_until REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_last_access ON response_cache (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_stale_until ON response_cache (stale_until)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache_stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # 条目总大小计数：首次创建时按已有条目初始化，之后由触发器随增删改维护（多进程共享同一计数）
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS response_cache_size (
+                        id INTEGER PRIMARY KEY CHECK (id = 0),
+                        total INTEGER NOT NULL
+                    )
+                """)
+                conn.execute(
+                    "INSERT OR IGNORE INTO response_cache_size (id, total) "
+                    "SELECT 0, COALESCE(SUM(stored_bytes), 0) FROM response_cache"
+                )
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS tr_response_cache_insert AFTER INSERT ON response_cache BEGIN
+                        UPDATE response_cache_size SET total = total + new.stored_bytes WHERE id = 0;
+                    END
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS tr_response_cache_delete AFTER DELETE ON response_cache BEGIN
+                        UPDATE response_cache_size SET total = total - old.stored_bytes WHERE id = 0;
+                    END
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS tr_response_cache_update AFTER UPDATE OF stored_bytes ON response_cache BEGIN
+                        UPDATE response_cache_size SET total = total - old.stored_bytes + new.stored_bytes WHERE id = 0;
+                    END
+                """)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每个线程一个连接；跨进程并发由 SQLite 文件锁保证
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Tuple[Optional[Any], str]:
+        """读取缓存，返回 (数据, 状态)；状态为 fresh / stale / miss"""
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, raw_bytes, expires_at, stale_until FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[3] < now:
+            if row is not None:
+                conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self._record(None, now, {"misses": 1})
+            return None, MISS
+
+        value, raw_bytes, expires_at, _ = row
+        state = FRESH if expires_at >= now else STALE
+        self._record(key, now, {"hits" if state == FRESH else "stale_hits": 1, "bytes_saved": raw_bytes})
+        return json.loads(zlib.decompress(value)), state
+
+    def _record(self, key: Optional[str], now: float, deltas: Dict[str, int]):
+        """在内存中记下访问时间与统计增量，需要时写回"""
+        with self._pending_lock:
+            if key is not None:
+                self._pending_access[key] = now
+            for name, delta in deltas.items():
+                self._pending_stats[name] = self._pending_stats.get(name, 0) + delta
+            due = (
+                len(self._pending_access) >= FLUSH_BATCH
+                or time.monotonic() - self._flushed_at >= FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """将内存中的访问时间和统计增量在一个事务中写回；进程退出前未写回的部分只影响 LRU 顺序和统计"""
+        with self._pending_lock:
+            access, self._pending_access = self._pending_access, {}
+            deltas, self._pending_stats = self._pending_stats, {}
+            self._flushed_at = time.monotonic()
+        if not access and not deltas:
+            return
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            # 其他进程可能已写入更晚的访问时间，只向后推进
+            conn.executemany(
+                "UPDATE response_cache SET last_access = ? WHERE key = ? AND last_access < ?",
+                [(accessed, key, accessed) for key, accessed in access.items()]
+            )
+            self._increment(conn, deltas)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def set(self, key: str, operation: str, data: Any, ttl: float, stale_ttl: float = 0.0):
+        """写入缓存，总大小超出容量时淘汰"""
+        now = time.time()
+        raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        value = zlib.compress(raw)
+        conn = self._connect()
+        # 用 UPSERT 而不是 INSERT OR REPLACE：REPLACE 删除旧行时不触发删除触发器，总大小计数会偏大
+        conn.execute(
+            "INSERT INTO response_cache "
+            "(key, operation, value, raw_bytes, stored_bytes, created_at, expires_at, stale_until, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET operation = excluded.operation, value = excluded.value, "
+            "raw_bytes = excluded.raw_bytes, stored_bytes = excluded.stored_bytes, created_at = excluded.created_at, "
+            "expires_at = excluded.expires_at, stale_until = excluded.stale_until, last_access = excluded.last_access",
+            (key, operation, value, len(raw), len(value), now, now + ttl, now + ttl + stale_ttl, now)
+        )
+        if self._total_bytes(conn) > self.max_bytes:
+            # 先写回访问时间，按最新的 LRU 顺序淘汰
+            self.flush()
+            self._evict(conn, now)
+
+    def _total_bytes(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT total FROM response_cache_size WHERE id = 0").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """先删除超过宽限期的条目，仍超限时按 LRU 分批淘汰直到总大小不超过上限"""
+        conn.execute("DELETE FROM response_cache WHERE stale_until < ?", (now,))
+        total = self._total_bytes(conn)
+        evicted = 0
+        while total > self.max_bytes:
+            batch = conn.execute(
+                "SELECT key, stored_bytes FROM response_cache ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not batch:
+                break
+            keys = []
+            for key, stored_bytes in batch:
+                if total <= self.max_bytes:
+                    break
+                keys.append(key)
+                total -= stored_bytes
+            conn.executemany("DELETE FROM response_cache WHERE key = ?", [(key,) for key in keys])
+            evicted += len(keys)
+            total = self._total_bytes(conn)
+        if evicted:
+            self._record(None, now, {"evictions": evicted})
+
+    def _increment(self, conn: sqlite3.Connection, deltas: Dict[str, int]):
+        for name, delta in deltas.items():
+            if delta:
+                conn.execute(
+                    "INSERT INTO response_cache_stats (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (name, delta)
+                )
+
+    def clear(self):
+        """清空缓存条目（保留累计统计）"""
+        self._connect().execute("DELETE FROM response_cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计：条目数、占用字节、命中率与节省的下载字节数（跨进程累计，其他进程未写回的部分不含在内）"""
+        self.flush()
+        conn = self._connect()
+        entries = conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        stored = self._total_bytes(conn)
+        counters = dict(conn.execute("SELECT name, value FROM response_cache_stats").fetchall())
+        hits = counters.get("hits", 0)
+        stale_hits = counters.get("stale_hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + stale_hits + misses
+        return {
+            "entries": entries,
+            "stored_bytes": stored,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "stale_hits": stale_hits,
+            "misses": misses,
+            "hit_ratio": round((hits + stale_hits) / lookups, 4) if lookups else 0.0,
+            "bytes_saved": counters.get("bytes_saved", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """获取进程内共享的爬虫响应缓存"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from ..core.config import settings
+            _cache = ResponseCache(settings.CRAWLER_CACHE_PATH, settings.CRAWLER_CACHE_MAX_MB * 1024 * 1024)
+        return _cache
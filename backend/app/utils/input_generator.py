@@ -0,0 +1,114 @@
+"""
+基准测试输入生成工具
+根据函数签名（类型注解优先，其次参数名）为给定规模 n 生成随机输入
+"""
+
+import inspect
+import math
+import random
+import string
+from typing import Any, Callable, List
+
+# 无类型注解时按参数名推断
+NAME_HINTS = {
+    "list_int": ["nums", "nums1", "nums2", "arr", "array", "prices", "height", "heights",
+                 "numbers", "candidates", "coins", "cost", "costs", "temperatures", "piles"],
+    "list_str": ["words", "strs", "tokens", "wordlist", "worddict"],
+    "str": ["s", "t", "p", "word", "text", "text1", "text2", "word1", "word2", "haystack", "needle"],
+    "matrix_int": ["matrix", "grid", "mat", "intervals", "edges", "points"],
+    "matrix_str": ["board"],
+    "int": ["n", "m", "k", "target", "amount", "x", "num", "numrows", "rowindex"],
+}
+
+# 规范化后的类型注解 -> 输入种类
+ANNOTATION_KINDS = {
+    "int": "int",
+    "float": "float",
+    "bool": "bool",
+    "str": "str",
+    "list[int]": "list_int",
+    "list[float]": "list_float",
+    "list[str]": "list_str",
+    "list[list[int]]": "matrix_int",
+    "list[list[str]]": "matrix_str",
+}
+
+# 与规模无关的整数参数（如 k、target）的取值上限
+SMALL_INT_LIMIT = 10
+
+
+def generate_arguments(func: Callable, n: int, seed: int = 0) -> List[Any]:
+    """为函数生成规模为 n 的参数列表
+
+    第一个非整数参数承载规模 n；若所有参数都是整数，则第一个整数取 n。
+    """
+    params = [
+        p for p in inspect.signature(func).parameters.values()
+        if p.name != "self" and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+    ]
+    kinds = [_param_kind(p) for p in params]
+    size_slot = next((i for i, kind in enumerate(kinds) if kind != "int"), 0)
+
+    rng = random.Random(seed * 1000003 + n)
+    args = []
+    for i, kind in enumerate(kinds):
+        if kind == "int" and i != size_slot:
+            args.append(rng.randint(1, max(1, min(n, SMALL_INT_LIMIT))))
+        else:
+            args.append(_generate(kind, n, rng))
+    return args
+
+
+def _param_kind(param: inspect.Parameter) -> str:
+    """推断参数的输入种类"""
+    if param.annotation is not inspect.Parameter.empty:
+        text = _annotation_text(param.annotation)
+        if text in ANNOTATION_KINDS:
+            return ANNOTATION_KINDS[text]
+        raise ValueError(f"暂不支持的参数类型: {param.name}: {text}")
+
+    name = param.name.lower()
+    for kind, names in NAME_HINTS.items():
+        if name in names:
+            return kind
+    return "list_int"
+
+
+def _annotation_text(annotation) -> str:
+    """将类型注解规范化为 list[int] 形式的字符串"""
+    if isinstance(annotation, str):
+        text = annotation
+    elif isinstance(annotation, type):
+        text = annotation.__name__
+    else:
+        text = repr(annotation)
+    text = text.replace("typing.", "").replace(" ", "").lower()
+    if text.startswith("optional[") and text.endswith("]"):
+        text = text[len("optional["):-1]
+    return text
+
+
+def _generate(kind: str, n: int, rng: random.Random) -> Any:
+    """生成单个参数"""
+    if kind == "int":
+        return n
+    if kind == "float":
+        return float(n)
+    if kind == "bool":
+        return rng.random() < 0.5
+    if kind == "str":
+        return "".join(rng.choices(string.ascii_lowercase, k=n))
+    if kind == "list_int":
+        return rng.choices(range(n + 1), k=n)
+    if kind == "list_float":
+        return [rng.random() * n for _ in range(n)]
+    if kind == "list_str":
+        return ["".join(rng.choices(string.ascii_lowercase, k=5)) for _ in range(n)]
+
+    # 二维输入按 √n × √n 生成，使元素总数与 n 同阶
+    side = max(1, int(math.isqrt(n)))
+    if kind == "matrix_int":
+        return [rng.choices(range(n + 1), k=side) for _ in range(side)]
+    if kind == "matrix_str":
+        return [rng.choices(string.ascii_lowercase, k=side) for _ in range(side)]
+    raise ValueError(f"未知的输入种类: {kind}")
@@ -0,0 +1,212 @@
+"""
+回答要点匹配
+把一道题的全部关键要点及其别名编译为一个 Aho–Corasick 自动机，对回答文本单次线性扫描即可得到命中的要点及位置；
+要点中的「a/b」「主词（细节）」写法自动拆出可选说法，常见术语另有同义词表
+"""
+
+import ast
+import json
+import re
+from collections import deque
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# 常见技术术语的同义说法（小写），要点或其拆分出的说法命中键时自动加入
+KEYPOINT_SYNONYMS: Dict[str, List[str]] = {
+    "大o表示法": ["big o", "大o", "o(n)", "渐进复杂度"],
+    "哈希函数": ["散列函数", "hash function", "hash函数"],
+    "负载因子": ["装载因子", "load factor"],
+    "扩容机制": ["扩容", "rehash", "resize"],
+    "链地址法": ["拉链法", "separate chaining"],
+    "开放寻址法": ["开放定址法", "线性探测", "open addressing"],
+    "分治思想": ["分治", "divide and conquer"],
+    "基准选择": ["选择基准", "pivot", "枢轴"],
+    "分区操作": ["分区", "partition", "划分"],
+    "递归": ["recursion", "递归调用"],
+    "原地排序": ["in-place", "原地"],
+    "不稳定排序": ["不稳定", "unstable"],
+    "最优子结构": ["optimal substructure"],
+    "重叠子问题": ["子问题重叠", "overlapping subproblems"],
+    "状态转移方程": ["状态转移", "转移方程", "递推公式"],
+    "自顶向下": ["记忆化搜索", "top-down"],
+    "自底向上": ["递推", "bottom-up"],
+    "空间优化": ["滚动数组", "压缩空间"],
+    "层序": ["层次遍历", "bfs", "广度优先"],
+    "迭代实现": ["迭代", "非递归"],
+    "morris遍历": ["morris"],
+    "空间换时间": ["以空间换时间", "用空间换时间"],
+}
+
+_ALTERNATIVES = re.compile(r"[/／|、]")
+_BRACKETED = re.compile(r"[（(]([^（）()]*)[）)]")
+
+
+class KeyPointMatch(NamedTuple):
+    point: str
+    spans: List[Tuple[int, int]]  # 命中位置 [start, end)，基于原始回答文本
+    matched_by: List[str]  # 实际命中的说法
+
+
+def parse_list_field(value: Any) -> List[Any]:
+    """解析题目的 key_points / tags 字段（列表、JSON 字符串或旧数据中的 Python 列表字面量），不执行任意代码"""
+    if isinstance(value, list):
+        return value
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return []
+    return parsed if isinstance(parsed, list) else []
+
+
+def expand_aliases(point: str, aliases: Optional[List[str]] = None) -> List[str]:
+    """要点的全部可匹配说法（小写、去重）：原文、括号外主词、括号内与斜杠分隔的各个说法及其同义词"""
+    text = point.strip().lower()
+    variants = [text]
+    outer = _BRACKETED.sub("", text).strip()
+    variants.append(outer)
+    for inner in _BRACKETED.findall(text):
+        variants.extend(_ALTERNATIVES.split(inner))
+    variants.extend(_ALTERNATIVES.split(outer))
+    variants.extend(alias.lower() for alias in aliases or [])
+    for variant in list(variants):
+        variants.extend(KEYPOINT_SYNONYMS.get(variant.strip(), []))
+    seen = []
+    for variant in variants:
+        variant = variant.strip()
+        if len(variant) >= 2 and variant not in seen:
+            seen.append(variant)
+    return seen
+
+
+class AhoCorasick:
+    """多模式串自动机：goto 转移表 + 失败指针，输出表合并了失败链上的所有模式"""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(index)
+        # 根状态下用首字符集合的正则在 C 层跳过与所有模式无关的文本
+        first_chars = sorted(self.goto[0].keys())
+        self._next_start = re.compile("[" + "".join(re.escape(ch) for ch in first_chars) + "]").search if first_chars else None
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """返回全部命中 (模式序号, start, end)，包括重叠的命中"""
+        hits = []
+        if self._next_start is None:
+            return hits
+        goto, fail, output, next_start = self.goto, self.fail, self.output, self._next_start
+        state = 0
+        position = 0
+        length = len(text)
+        while position < length:
+            if not state:
+                found = next_start(text, position)
+                if found is None:
+                    break
+                position = found.start()
+            ch = text[position]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            position += 1
+            if output[state]:
+                for index in output[state]:
+                    hits.append((index, position - len(self.patterns[index]), position))
+        return hits
+
+
+class KeyPointMatcher:
+    """一道题的预编译要点匹配器"""
+
+    def __init__(self, key_points: List[Any]):
+        self.points: List[str] = []
+        patterns: List[str] = []
+        pattern_index: Dict[str, int] = {}
+        self._pattern_owners: List[List[int]] = []
+        for entry in key_points:
+            if isinstance(entry, dict):
+                point, aliases = str(entry.get("point") or ""), entry.get("aliases") or []
+            elif isinstance(entry, str):
+                point, aliases = entry, []
+            else:
+                continue
+            if not point.strip():
+                continue
+            owner = len(self.points)
+            self.points.append(point)
+            for variant in expand_aliases(point, aliases):
+                if variant not in pattern_index:
+                    pattern_index[variant] = len(patterns)
+                    patterns.append(variant)
+                    self._pattern_owners.append([])
+                if owner not in self._pattern_owners[pattern_index[variant]]:
+                    self._pattern_owners[pattern_index[variant]].append(owner)
+        self.pattern_count = len(patterns)
+        self.automaton = AhoCorasick(patterns)
+
+    def match(self, answer_text: str) -> List[KeyPointMatch]:
+        """单次扫描回答，按要点顺序返回命中的要点"""
+        spans: Dict[int, List[Tuple[int, int]]] = {}
+        matched_by: Dict[int, List[str]] = {}
+        text = _lower_same_length(answer_text)
+        for index, start, end in self.automaton.find_all(text):
+            if not _on_word_boundary(text, start, end):
+                continue
+            for owner in self._pattern_owners[index]:
+                spans.setdefault(owner, []).append((start, end))
+                pattern = self.automaton.patterns[index]
+                if pattern not in matched_by.setdefault(owner, []):
+                    matched_by[owner].append(pattern)
+        return [
+            KeyPointMatch(self.points[owner], sorted(spans[owner]), matched_by[owner])
+            for owner in sorted(spans)
+        ]
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and (ch.isalnum() or ch == "_")
+
+
+def _on_word_boundary(text: str, start: int, end: int) -> bool:
+    """英文说法需按整词命中（cap 不匹配 capture），中文说法不受限制"""
+    if _is_word_char(text[start]) and start > 0 and _is_word_char(text[start - 1]):
+        return False
+    if _is_word_char(text[end - 1]) and end < len(text) and _is_word_char(text[end]):
+        return False
+    return True
+
+
+def _lower_same_length(text: str) -> str:
+    """转小写且保持长度不变，保证命中位置与原文一致"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
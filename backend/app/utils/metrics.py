@@ -0,0 +1,56 @@
+"""
+运行指标工具
+固定分桶的延迟直方图，内存占用恒定，可在长期运行的服务中持续累计并估算分位数
+"""
+
+import bisect
+from typing import Dict, Optional, Sequence
+
+# 默认延迟分桶上界（毫秒），最后一个桶收集超过最大上界的样本
+DEFAULT_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """延迟直方图：按上界分桶计数，分位数取所在桶的上界（不超过观测到的最大值）"""
+
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        self.buckets = tuple(sorted(buckets or DEFAULT_LATENCY_BUCKETS_MS))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float):
+        """记录一次耗时（秒）"""
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q: float) -> float:
+        """估算分位数（毫秒）"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                upper = self.buckets[i] if i < len(self.buckets) else self.max_ms
+                return round(min(upper, self.max_ms), 1)
+        return round(self.max_ms, 1)
+
+    def to_dict(self) -> Dict[str, object]:
+        buckets = {f"le_{int(b)}ms": n for b, n in zip(self.buckets, self.counts)}
+        buckets[f"gt_{int(self.buckets[-1])}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": buckets,
+        }
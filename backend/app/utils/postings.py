@@ -0,0 +1,81 @@
+"""
+倒排表工具
+倒排表为升序的 int 数组（array('i')），求交时以最短的表为基准，在较长的表中倍增（galloping）探测再二分定位，
+长度相差悬殊时只需访问长表的 O(m·log(n/m)) 个元素
+"""
+
+from array import array
+from bisect import bisect_left, insort
+from typing import Iterable, List, Sequence
+
+
+def new_postings(ids: Iterable[int] = ()) -> array:
+    """由题目 ID 构造升序去重的倒排表"""
+    return array("i", sorted(set(ids)))
+
+
+def postings_add(postings: array, doc_id: int):
+    """有序插入，已存在时不重复"""
+    index = bisect_left(postings, doc_id)
+    if index == len(postings) or postings[index] != doc_id:
+        insort(postings, doc_id, index)
+
+
+def postings_remove(postings: array, doc_id: int):
+    index = bisect_left(postings, doc_id)
+    if index < len(postings) and postings[index] == doc_id:
+        del postings[index]
+
+
+def gallop_to(postings: Sequence[int], target: int, low: int) -> int:
+    """从 low 开始按 1, 2, 4, ... 步长探测，返回第一个 >= target 的位置"""
+    length = len(postings)
+    if low >= length or postings[low] >= target:
+        return low
+    step = 1
+    high = low + 1
+    while high < length and postings[high] < target:
+        low = high
+        step <<= 1
+        high = low + step
+    return bisect_left(postings, target, low + 1, min(high, length))
+
+
+def intersect(short: Sequence[int], long: Sequence[int]) -> List[int]:
+    """两个升序表求交"""
+    if len(short) > len(long):
+        short, long = long, short
+    result = []
+    position = 0
+    length = len(long)
+    for doc_id in short:
+        position = gallop_to(long, doc_id, position)
+        if position >= length:
+            break
+        if long[position] == doc_id:
+            result.append(doc_id)
+            position += 1
+    return result
+
+
+def intersect_all(lists: Sequence[Sequence[int]]) -> List[int]:
+    """多个升序表求交，按长度从短到长依次收窄"""
+    if not lists:
+        return []
+    ordered = sorted(lists, key=len)
+    result = list(ordered[0])
+    for postings in ordered[1:]:
+        if not result:
+            break
+        result = intersect(result, postings)
+    return result
+
+
+def union_all(lists: Sequence[Sequence[int]]) -> array:
+    """多个升序表求并"""
+    if len(lists) == 1:
+        return lists[0]
+    merged = set()
+    for postings in lists:
+        merged.update(postings)
+    return new_postings(merged)
@@ -0,0 +1,217 @@
+"""
+请求限速工具
+异步令牌桶与 AIMD 自适应并发限制器，同名限速器在进程内共享，多个爬虫实例共用同一份配额
+"""
+
+import asyncio
+import random
+import time
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """异步令牌桶：按 rate（个/秒）补充令牌，最多积攒 capacity 个"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("限速速率必须大于0")
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _get_lock(self) -> asyncio.Lock:
+        # asyncio.Lock 在 Python 3.9 中绑定创建时的事件循环，换了事件循环需要重建
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """获取令牌，不足时等待；按到达顺序排队"""
+        async with self._get_lock():
+            self._refill()
+            if self._tokens < tokens:
+                delay = (tokens - self._tokens) / self.rate
+                self.waits += 1
+                self.wait_seconds += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self._tokens -= tokens
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, capacity: Optional[float] = None) -> TokenBucket:
+    """获取进程内共享的限速器；首次创建时的参数生效"""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = TokenBucket(rate, capacity)
+            _limiters[name] = limiter
+        return limiter
+
+
+class AdaptiveLimiter:
+    """AIMD 自适应并发限制器
+
+    响应正常时每个往返把并发上限加 1（每次成功加 1/limit），遇到 429 或超时把上限减半；
+    服务端给出 Retry-After 时所有请求暂停到该时刻。同一次拥塞期间（cooldown 秒内）只减一次。
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop = None
+        self.increases = 0
+        self.decreases = 0
+        self.throttled = 0
+        self.timeouts = 0
+        self.pauses = 0
+        self.pause_seconds = 0.0
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    async def acquire(self):
+        """等待暂停结束并占用一个并发名额"""
+        while True:
+            delay = self.blocked_until - time.monotonic()
+            if delay > 0:
+                self.pauses += 1
+                self.pause_seconds += delay
+                await asyncio.sleep(delay)
+                continue
+            condition = self._get_condition()
+            async with condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                # 被唤醒后重新检查暂停时间
+                await condition.wait()
+
+    async def release(self):
+        """归还并发名额"""
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            condition.notify_all()
+
+    def record_success(self):
+        """加性增：每个完整窗口的成功响应把上限加 1"""
+        if self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.increases += 1
+
+    def record_throttle(self, retry_after: Optional[float] = None):
+        """收到 429：乘性减，并按 Retry-After 暂停所有请求"""
+        self.throttled += 1
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+        self._decrease()
+
+    def record_timeout(self):
+        """请求超时同样视为拥塞信号"""
+        self.timeouts += 1
+        self._decrease()
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        self.decreases += 1
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "limit": int(self.limit),
+            "limit_exact": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "paused_for": round(max(0.0, self.blocked_until - time.monotonic()), 3),
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "throttled": self.throttled,
+            "timeouts": self.timeouts,
+            "pauses": self.pauses,
+            "pause_seconds": round(self.pause_seconds, 3),
+        }
+
+
+_adaptive_limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def get_adaptive_limiter(name: str, initial: float, max_limit: float) -> AdaptiveLimiter:
+    """获取进程内共享的自适应并发限制器；首次创建时的参数生效"""
+    with _limiters_lock:
+        limiter = _adaptive_limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveLimiter(initial=initial, max_limit=max_limit)
+            _adaptive_limiters[name] = limiter
+        return limiter
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头：秒数或 HTTP 日期，返回需要等待的秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 30.0) -> float:
+    """带抖动的指数退避（full jitter）：在 [0, min(cap, base * 2^attempt)] 内随机取值，避免并发请求同时重试"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -0,0 +1,492 @@
+"""
+代码执行沙箱
+预先启动的常驻工作进程池：每个进程带内存/CPU/文件大小限制，按任务执行用户代码并采集耗时与内存。
+工作进程以 spawn 方式启动（不继承主进程的文件描述符、数据库连接与内存状态），启动后清空环境变量、
+切到根目录，在 Linux 上尽量进入独立的网络命名空间（没有网卡），以 root 运行时降为 SANDBOX_USER；
+各项措施实际是否生效见进程池统计中的 isolation。
+注意：这些措施只是降低风险，不是完整的安全边界；运行代码的接口默认关闭（SANDBOX_ENABLED），只接受本机直接访问。
+"""
+
+import contextlib
+import copy
+import ctypes
+import inspect
+import io
+import math
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows 下没有 rlimit，只保留超时控制
+    resource = None
+
+try:
+    import pwd
+except ImportError:
+    pwd = None
+
+from .input_generator import generate_arguments
+
+# 用户代码默认可用的名字，与 LeetCode 运行环境保持一致
+CODE_PRELUDE = (
+    "from typing import *\n"
+    "import collections, heapq, bisect, math, functools, itertools, string, re\n"
+    "from collections import defaultdict, deque, Counter, OrderedDict\n"
+    "from functools import lru_cache, cache\n"
+)
+
+MAX_STDOUT_CHARS = 64 * 1024
+
+# 快速调用的批量计时参数
+FAST_CALL_SECONDS = 2e-5
+BATCH_SECONDS = 2e-3
+MAX_BATCH_CALLS = 10000
+
+# 工作进程启动（导入模块、完成隔离）的等待时间
+WORKER_START_TIMEOUT = 30.0
+# unshare(2) 标志
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+
+
+class SandboxPool:
+    """沙箱工作进程池"""
+
+    def __init__(self, size: int = 2, memory_limit_mb: int = 256, default_timeout: float = 5.0,
+                 sandbox_user: Optional[str] = "nobody"):
+        self.size = max(1, size)
+        self.memory_limit_mb = memory_limit_mb
+        self.default_timeout = default_timeout
+        self.sandbox_user = sandbox_user
+        self.isolation: Optional[Dict[str, Any]] = None
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._stats = {"tasks": 0, "timeouts": 0, "crashes": 0, "respawns": 0}
+
+    def start(self):
+        """预先启动全部工作进程，之后的任务复用已热身的解释器"""
+        with self._lock:
+            if self._started:
+                return
+            for _ in range(self.size):
+                worker = self._spawn()
+                self._workers.append(worker)
+                self._idle.put(worker)
+            self._started = True
+
+    def run(self, task: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """在空闲工作进程中执行任务（阻塞直到完成或超时）"""
+        self.start()
+        timeout = timeout or self.default_timeout
+        worker = self._idle.get()
+        self._count("tasks")
+        try:
+            worker.conn.send(task)
+            if worker.conn.poll(timeout):
+                return worker.conn.recv()
+            self._count("timeouts")
+            worker = self._respawn(worker)
+            return {"ok": False, "error": f"执行超时（{timeout:g} 秒）", "timeout": True}
+        except (EOFError, OSError):
+            self._count("crashes")
+            worker.process.join(timeout=1)
+            exitcode = worker.process.exitcode
+            worker = self._respawn(worker)
+            return {
+                "ok": False,
+                "error": f"执行进程异常退出（退出码 {exitcode}），可能超出了内存或CPU时间限制",
+                "crashed": True,
+                "exitcode": exitcode,
+            }
+        finally:
+            self._idle.put(worker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """进程池统计"""
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "memory_limit_mb": self.memory_limit_mb,
+            "isolation": self.isolation,
+            **self._stats,
+        }
+
+    def shutdown(self):
+        """关闭全部工作进程"""
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+            self._idle = queue.Queue()
+            self._started = False
+
+    def _spawn(self) -> "_Worker":
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, args=(child_conn, self.memory_limit_mb, self.sandbox_user), daemon=True
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        # 等待工作进程完成隔离并报告实际生效的措施
+        try:
+            if not parent_conn.poll(WORKER_START_TIMEOUT):
+                raise RuntimeError("代码执行进程启动超时")
+            self.isolation = parent_conn.recv()
+        except (EOFError, OSError, RuntimeError):
+            worker.stop()
+            raise RuntimeError(f"代码执行进程启动失败（退出码 {process.exitcode}）")
+        return worker
+
+    def _respawn(self, worker: "_Worker") -> "_Worker":
+        """结束卡死或崩溃的进程并补充新进程"""
+        worker.stop()
+        replacement = self._spawn()
+        with self._lock:
+            self._workers = [w for w in self._workers if w is not worker] + [replacement]
+            self._stats["respawns"] += 1
+        return replacement
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+
+class _Worker:
+    """工作进程句柄"""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+
+    def stop(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """获取全局沙箱进程池"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from ..core.config import settings
+            _pool = SandboxPool(
+                size=settings.SANDBOX_WORKERS,
+                memory_limit_mb=settings.SANDBOX_MEMORY_MB,
+                default_timeout=settings.SANDBOX_TIMEOUT,
+                sandbox_user=settings.SANDBOX_USER,
+            )
+        return _pool
+
+
+# ---------------------------------------------------------------------------
+# 以下代码运行在工作进程中
+# ---------------------------------------------------------------------------
+
+def _worker_main(conn, memory_limit_mb: int, sandbox_user: Optional[str]):
+    """工作进程主循环"""
+    # 降权前先导入预置模块：降权后的用户可能读不到解释器所在目录
+    exec(CODE_PRELUDE, {})
+    isolation = _isolate(sandbox_user)
+    _apply_limits(memory_limit_mb)
+    conn.send(isolation)
+    compiled: Dict[str, Any] = {}
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        try:
+            result = _execute(task, compiled)
+        except BaseException as e:  # 用户代码可能抛出 SystemExit 等
+            result = {"ok": False, "error": _format_error(e)}
+        try:
+            conn.send(result)
+        except Exception as e:
+            conn.send({"ok": False, "error": f"结果无法序列化: {e}"})
+
+
+def _isolate(sandbox_user: Optional[str]) -> Dict[str, Any]:
+    """在执行任何用户代码之前收紧工作进程的权限，返回实际生效的措施（均为尽力而为）"""
+    os.environ.clear()
+    os.chdir("/")
+    isolation: Dict[str, Any] = {"start_method": "spawn", "network_namespace": False, "user": None}
+
+    # 独立的网络命名空间里只有未启用的回环接口；非 root 时借助用户命名空间获得所需权限
+    if sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            flags = CLONE_NEWNET if os.geteuid() == 0 else CLONE_NEWUSER | CLONE_NEWNET
+            isolation["network_namespace"] = libc.unshare(flags) == 0
+        except (OSError, AttributeError):
+            pass
+
+    if pwd is not None and os.geteuid() == 0 and sandbox_user:
+        try:
+            entry = pwd.getpwnam(sandbox_user)
+            os.setgroups([])
+            os.setgid(entry.pw_gid)
+            os.setuid(entry.pw_uid)
+        except (KeyError, OSError):
+            pass
+    if pwd is not None:
+        try:
+            isolation["user"] = pwd.getpwuid(os.geteuid()).pw_name
+        except KeyError:
+            isolation["user"] = str(os.geteuid())
+    return isolation
+
+
+def _format_error(error: BaseException) -> str:
+    """异常信息，附带用户代码中出错的行号"""
+    message = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+    line = None
+    if isinstance(error, SyntaxError) and error.filename == "<solution>":
+        line = error.lineno
+    tb = error.__traceback__
+    while tb is not None:
+        if tb.tb_frame.f_code.co_filename == "<solution>":
+            line = tb.tb_lineno
+        tb = tb.tb_next
+    return f"{message}（第 {line} 行）" if line else message
+
+
+def _apply_limits(memory_limit_mb: int):
+    """限制地址空间增量与单文件大小；进程本身已占用的地址空间不计入"""
+    if resource is None:
+        return
+    base = _current_address_space()
+    limits = [("RLIMIT_FSIZE", 1024 * 1024)]
+    if base:
+        limits.append(("RLIMIT_AS", base + memory_limit_mb * 1024 * 1024))
+    for name, value in limits:
+        rlimit = getattr(resource, name, None)
+        if rlimit is None:
+            continue
+        try:
+            _, hard = resource.getrlimit(rlimit)
+            if hard != resource.RLIM_INFINITY:
+                value = min(value, hard)
+            resource.setrlimit(rlimit, (value, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def _current_address_space() -> int:
+    """当前进程虚拟地址空间大小（字节）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _set_cpu_limit(seconds: Optional[float]):
+    """在已用 CPU 时间基础上设置本次任务的 CPU 时间上限，超出后进程收到 SIGXCPU"""
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        soft = hard
+    else:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(math.ceil(usage.ru_utime + usage.ru_stime + seconds)) + 1
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _reset_peak_rss():
+    """清零进程的峰值常驻内存（Linux 4.0+），使每个任务的峰值互不影响"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """进程峰值常驻内存（KB）；优先读 VmHWM（可按任务清零），否则用 ru_maxrss"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _execute(task: Dict[str, Any], compiled: Dict[str, Any]) -> Dict[str, Any]:
+    """执行一次调用任务
+
+    task 字段：
+        code            用户代码
+        method          入口方法名，缺省为 Solution 类的第一个公有方法或代码中定义的第一个函数
+        args            显式参数列表；与 generate 二选一
+        generate        {"n": 规模, "seed": 随机种子}，按函数签名生成输入
+        min_time        计时累计下限（秒），小规模输入会重复执行取最小值
+        max_repeat      最大重复次数
+        measure_memory  是否额外用 tracemalloc 统计一次峰值分配
+        return_result   是否返回函数返回值
+        return_args     是否返回实际使用的参数（用于展示自动生成的输入）
+        cpu_limit       本次任务的 CPU 时间上限（秒）
+    """
+    stdout = io.StringIO()
+    _reset_peak_rss()
+    baseline_rss = _peak_rss_kb()
+    _set_cpu_limit(task.get("cpu_limit"))
+    try:
+        with contextlib.redirect_stdout(stdout):
+            func = _load_entry(task["code"], task.get("method"), compiled)
+            if "generate" in task:
+                spec = task["generate"]
+                args = generate_arguments(func(), spec["n"], spec.get("seed", 0))
+            else:
+                args = list(task.get("args") or [])
+
+            min_time = task.get("min_time", 0.0)
+            max_repeat = max(1, task.get("max_repeat", 1))
+            timings: List[float] = []
+            result = None
+            while True:
+                call_args = _copy_args(args)
+                bound = func()
+                start = time.perf_counter()
+                result = bound(*call_args)
+                timings.append(time.perf_counter() - start)
+                if len(timings) >= max_repeat or sum(timings) >= min_time:
+                    break
+
+            if max_repeat > 1 and min(timings) < FAST_CALL_SECONDS:
+                # 单次调用接近计时器精度时改为同一份参数连续调用多次取平均；
+                # 这么快的调用不可能改写大部分输入，复用参数不影响计时
+                number = min(MAX_BATCH_CALLS, max(1, int(BATCH_SECONDS / max(min(timings), 1e-7))))
+                call_args = _copy_args(args)
+                bound = func()
+                timings = []
+                for _ in range(5):
+                    start = time.perf_counter()
+                    for _ in range(number):
+                        bound(*call_args)
+                    timings.append((time.perf_counter() - start) / number)
+
+            peak_alloc = None
+            if task.get("measure_memory"):
+                call_args = _copy_args(args)
+                bound = func()
+                tracemalloc.start()
+                try:
+                    bound(*call_args)
+                    peak_alloc = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+    finally:
+        _set_cpu_limit(None)
+
+    output = stdout.getvalue()
+    peak_rss = _peak_rss_kb()
+    response = {
+        "ok": True,
+        "seconds": min(timings),
+        "repeat": len(timings),
+        "peak_alloc_bytes": peak_alloc,
+        "peak_rss_kb": peak_rss,
+        "rss_delta_kb": max(0, peak_rss - baseline_rss) if peak_rss and baseline_rss else None,
+        "stdout": output[:MAX_STDOUT_CHARS],
+    }
+    if task.get("return_result"):
+        response["result"] = _to_plain(result)
+    if task.get("return_args"):
+        response["args"] = _to_plain(args)
+    return response
+
+
+def _load_entry(code: str, method: Optional[str], compiled: Dict[str, Any]) -> Callable[[], Callable]:
+    """执行用户代码并返回入口工厂：每次调用返回一个新的可调用对象（与 LeetCode 一样每次新建 Solution）
+
+    只缓存编译结果；每个任务都在新的命名空间中重新执行，上一次运行留下的模块级状态不会带到下一次
+    """
+    code_object = compiled.get(code)
+    if code_object is None:
+        code_object = compile(code, "<solution>", "exec")
+        if len(compiled) >= 32:
+            compiled.clear()
+        compiled[code] = code_object
+    namespace = {"__name__": "__solution__"}
+    exec(CODE_PRELUDE, namespace)
+    exec(code_object, namespace)
+
+    solution_cls = namespace.get("Solution")
+    if isinstance(solution_cls, type):
+        name = method or next(
+            (attr for attr, value in vars(solution_cls).items()
+             if callable(value) and not attr.startswith("_")),
+            None
+        )
+        if not name or not hasattr(solution_cls, name):
+            raise ValueError(f"Solution 类中找不到方法: {method or '(公有方法)'}")
+        return lambda: getattr(solution_cls(), name)
+
+    if method:
+        func = namespace.get(method)
+    else:
+        func = next(
+            (value for value in namespace.values()
+             if inspect.isfunction(value) and value.__code__.co_filename == "<solution>"),
+            None
+        )
+    if callable(func):
+        return lambda: func
+    raise ValueError("代码中没有找到 Solution 类或指定的函数")
+
+
+def _copy_args(args: List[Any]) -> List[Any]:
+    """复制参数，避免原地修改影响下一次执行；扁平列表用浅拷贝即可"""
+    copied = []
+    for arg in args:
+        if isinstance(arg, list) and not (arg and isinstance(arg[0], (list, dict, set))):
+            copied.append(list(arg))
+        elif isinstance(arg, (list, dict, set)):
+            copied.append(copy.deepcopy(arg))
+        else:
+            copied.append(arg)
+    return copied
+
+
+def _to_plain(value: Any) -> Any:
+    """将返回值转换为可 JSON 序列化的结构"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_to_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _to_plain(v) for k, v in value.items()}
+    return repr(value)
@@ -0,0 +1,33 @@
+"""
+中英文混合文本切词
+中文按相邻两字切分为二元组（单字成段时保留单字），英文与数字按整词切分并转小写；
+不依赖分词词典，面试回答中常见的中英混写术语（如「HashMap 的扩容」）也能稳定切分
+"""
+
+import re
+from typing import Iterator, List
+
+_TOKEN = re.compile(
+    "(?P<cjk>[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+)"
+    r"|(?P<word>[a-z0-9_]+(?:[.+#][a-z0-9_]+)*[+#]*)"
+)
+
+
+def iter_terms(text: str) -> Iterator[str]:
+    """按出现顺序产出全部词项（可重复）"""
+    if not text:
+        return
+    for match in _TOKEN.finditer(text.lower()):
+        run = match.group()
+        if match.lastgroup == "word":
+            yield run
+        elif len(run) == 1:
+            yield run
+        else:
+            for i in range(len(run) - 1):
+                yield run[i:i + 2]
+
+
+def text_terms(text: str) -> List[str]:
+    """全部词项列表（可重复）"""
+    return list(iter_terms(text))
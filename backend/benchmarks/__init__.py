@@ -0,0 +1,4 @@
+"""
+性能基准测试
+在本地模拟服务上离线测量爬虫等模块的吞吐量，运行方式见各脚本的说明
+"""
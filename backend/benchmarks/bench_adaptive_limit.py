@@ -0,0 +1,85 @@
+"""
+自适应并发限制基准测试
+模拟服务同时处理的请求超过阈值时返回 429 和 Retry-After；对比固定并发与 AIMD 自适应并发的耗时、被限流次数和失败页数
+
+运行: cd backend && python -m benchmarks.bench_adaptive_limit --server-limit 8 --problems 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from app.services.crawler_service import CrawlerService
+from app.utils.http_cache import ResponseCache
+from app.utils.rate_limit import AdaptiveLimiter
+from benchmarks.fake_leetcode import FakeLeetCodeServer
+
+
+async def run_once(server: FakeLeetCodeServer, args, limiter: AdaptiveLimiter, cache: ResponseCache) -> dict:
+    server.reset_counters()
+    cache.clear()
+    start = time.perf_counter()
+    async with CrawlerService(
+        base_url=server.url, max_concurrency=args.prefetch, requests_per_second=args.rate, cache=cache
+    ) as crawler:
+        crawler.concurrency_limiter = limiter
+        crawler.rate_limit_delay = args.backoff
+        result = await crawler.batch_fetch_problems(batch_size=args.batch_size)
+        stats = crawler.get_crawler_statistics()
+    return {
+        "fetched": len(result.get("problems") or result.get("partial_data") or []),
+        "success": result["success"],
+        "seconds": time.perf_counter() - start,
+        "throttled": server.throttled,
+        "peak": server.peak_in_flight,
+        "retries": stats["retries"],
+        "limit": stats["limits"]["concurrency"]["limit"],
+    }
+
+
+async def main_async(args):
+    server = FakeLeetCodeServer(
+        args.problems, args.latency, args.jitter, max_in_flight=args.server_limit, retry_after=args.retry_after
+    )
+    await server.start()
+    cache = ResponseCache(args.cache_path)
+    try:
+        print(f"模拟服务 {server.url}，{args.problems} 题，延迟 {args.latency}s，"
+              f"同时超过 {args.server_limit} 个请求返回 429（Retry-After {args.retry_after}s）")
+        print(f"{'策略':<14} {'成功':>4} {'题目数':>7} {'耗时(s)':>8} {'429次数':>8} {'重试':>6} "
+              f"{'服务端峰值':>10} {'最终上限':>8}")
+        strategies = [
+            (f"固定并发 {args.prefetch}", AdaptiveLimiter(initial=args.prefetch, min_limit=args.prefetch,
+                                                     max_limit=args.prefetch)),
+            ("AIMD 自适应", AdaptiveLimiter(initial=2, max_limit=args.prefetch)),
+        ]
+        for name, limiter in strategies:
+            r = await run_once(server, args, limiter, cache)
+            print(f"{name:<14} {'是' if r['success'] else '否':>4} {r['fetched']:>7} {r['seconds']:>8.2f} "
+                  f"{r['throttled']:>8} {r['retries']:>6} {r['peak']:>10} {r['limit']:>8}")
+    finally:
+        cache.clear()
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="自适应并发限制基准测试")
+    parser.add_argument("--problems", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--server-limit", type=int, default=8, help="服务端允许的同时请求数")
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--prefetch", type=int, default=24, help="批量任务预取页数，也是固定并发策略的并发数")
+    parser.add_argument("--rate", type=float, default=500.0, help="令牌桶速率（请求/秒），设高以突出并发限制")
+    parser.add_argument("--backoff", type=float, default=0.2, help="重试退避基数（秒）")
+    parser.add_argument("--cache-path", default="./data/bench_adaptive_cache.db", help="基准测试专用的响应缓存文件")
+    args = parser.parse_args()
+    # 限流警告每次都会输出，基准测试只看汇总
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+批量获取题目详情基准测试
+对比逐题请求（每个 slug 一次请求）与 GraphQL 别名合并请求在模拟服务上的请求数与耗时
+
+运行: cd backend && python -m benchmarks.bench_batch_details --problems 3000 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.services.crawler_service import CrawlerService
+from app.utils.http_cache import ResponseCache
+from benchmarks.fake_leetcode import FakeLeetCodeServer
+
+
+async def fetch_one_by_one(crawler: CrawlerService, slugs) -> int:
+    """基线：每个 slug 一次请求，同样受并发数和限速器约束"""
+    semaphore = asyncio.Semaphore(crawler.max_concurrency)
+
+    async def fetch(slug):
+        async with semaphore:
+            return await crawler.get_problem_detail(slug)
+
+    results = await asyncio.gather(*(fetch(slug) for slug in slugs))
+    return sum(1 for r in results if r["success"])
+
+
+async def fetch_batched(crawler: CrawlerService, slugs, batch_size: int) -> int:
+    fetched = 0
+    async for _, result in crawler.iter_problem_details(slugs, batch_size):
+        if result["success"]:
+            fetched += len(result["problems"])
+    return fetched
+
+
+async def run_once(server: FakeLeetCodeServer, args, batch_size: int, cache: ResponseCache) -> dict:
+    slugs = [p["titleSlug"] for p in server.catalog]
+    server.reset_counters()
+    cache.clear()
+    start = time.perf_counter()
+    async with CrawlerService(
+        base_url=server.url, max_concurrency=args.concurrency, requests_per_second=args.rate, cache=cache
+    ) as crawler:
+        if batch_size == 1:
+            fetched = await fetch_one_by_one(crawler, slugs)
+        else:
+            fetched = await fetch_batched(crawler, slugs, batch_size)
+    return {
+        "fetched": fetched,
+        "requests": sum(server.requests.values()),
+        "bytes": server.bytes_sent,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+async def main_async(args):
+    server = FakeLeetCodeServer(args.problems, args.latency, args.jitter, item_latency=args.item_latency)
+    await server.start()
+    cache = ResponseCache(args.cache_path)
+    try:
+        print(f"模拟服务 {server.url}，{args.problems} 题，延迟 {args.latency}s + 每题 {args.item_latency}s，"
+              f"并发 {args.concurrency}，限速 {args.rate}/s")
+        print(f"{'每批题数':>8} {'题目数':>8} {'请求数':>8} {'流量(KB)':>10} {'耗时(s)':>9} {'题/秒':>8}")
+        for batch_size in args.batch_sizes:
+            r = await run_once(server, args, batch_size, cache)
+            print(f"{batch_size:>8} {r['fetched']:>8} {r['requests']:>8} {r['bytes'] / 1024:>10.0f} "
+                  f"{r['seconds']:>9.2f} {r['fetched'] / r['seconds']:>8.1f}")
+    finally:
+        cache.clear()
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量获取题目详情基准测试")
+    parser.add_argument("--problems", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--item-latency", type=float, default=0.005, help="每道题目增加的服务端耗时（秒）")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--rate", type=float, default=20.0, help="令牌桶速率（请求/秒）")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 25])
+    parser.add_argument("--cache-path", default="./data/bench_details_cache.db", help="基准测试专用的响应缓存文件")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
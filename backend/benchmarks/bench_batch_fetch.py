@@ -0,0 +1,60 @@
+"""
+批量抓取题目基准测试
+对比逐页顺序抓取（并发数 1）与并发抓取在注入延迟的模拟服务上的耗时
+
+运行: cd backend && python -m benchmarks.bench_batch_fetch --problems 3000 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.services.crawler_service import CrawlerService
+from benchmarks.fake_leetcode import FakeLeetCodeServer
+
+
+async def run_once(base_url: str, concurrency: int, rate: float, batch_size: int) -> dict:
+    start = time.perf_counter()
+    async with CrawlerService(base_url=base_url, max_concurrency=concurrency, requests_per_second=rate) as crawler:
+        result = await crawler.batch_fetch_problems(batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    problems = result.get("problems") or []
+    ids = [p["leetcode_id"] for p in problems]
+    return {
+        "success": result["success"],
+        "fetched": len(problems),
+        "ordered": ids == sorted(ids),
+        "seconds": elapsed,
+    }
+
+
+async def main_async(args):
+    server = FakeLeetCodeServer(args.problems, args.latency, args.jitter)
+    base_url = await server.start()
+    try:
+        print(f"模拟服务 {base_url}，{args.problems} 题，每页 {args.batch_size}，延迟 {args.latency}s，限速 {args.rate}/s")
+        print(f"{'并发数':>6} {'题目数':>8} {'耗时(s)':>9} {'页/秒':>8} {'有序':>5}")
+        pages = -(-args.problems // args.batch_size)
+        for concurrency in args.concurrency:
+            server.reset_counters()
+            r = await run_once(base_url, concurrency, args.rate, args.batch_size)
+            print(f"{concurrency:>6} {r['fetched']:>8} {r['seconds']:>9.2f} {pages / r['seconds']:>8.1f} "
+                  f"{'是' if r['ordered'] else '否':>5}")
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量抓取题目基准测试")
+    parser.add_argument("--problems", type=int, default=3000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--rate", type=float, default=20.0, help="令牌桶速率（请求/秒）")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10])
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
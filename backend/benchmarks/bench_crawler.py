@@ -0,0 +1,134 @@
+"""
+爬虫基准测试套件
+在本地模拟服务上测量三项指标：
+  吞吐量   —— 不同并发数下抓取完整题目列表的耗时
+  缓存     —— 冷缓存与热缓存下同一组操作的请求数、耗时、命中率与节省流量
+  重试成本 —— 注入 500 错误与 429 限流后多发的请求数、重试次数与耗时
+
+运行: cd backend && python -m benchmarks.bench_crawler --problems 2000 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, Any
+
+from app.services.crawler_service import CrawlerService
+from app.utils.http_cache import ResponseCache
+from benchmarks.fake_leetcode import FakeLeetCodeServer
+
+
+def make_crawler(server: FakeLeetCodeServer, args, cache: ResponseCache, concurrency: int) -> CrawlerService:
+    crawler = CrawlerService(
+        base_url=server.url, max_concurrency=concurrency, requests_per_second=args.rate, cache=cache
+    )
+    crawler.rate_limit_delay = args.backoff
+    return crawler
+
+
+async def bench_throughput(server: FakeLeetCodeServer, args, cache: ResponseCache):
+    print(f"\n[吞吐量] 抓取 {args.problems} 题，每页 {args.batch_size} 题")
+    print(f"{'并发数':>6} {'耗时(s)':>9} {'页/秒':>8} {'题/秒':>9}")
+    pages = -(-args.problems // args.batch_size)
+    for concurrency in args.concurrency:
+        cache.clear()
+        server.reset_counters()
+        start = time.perf_counter()
+        async with make_crawler(server, args, cache, concurrency) as crawler:
+            result = await crawler.batch_fetch_problems(batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        fetched = len(result.get("problems") or [])
+        print(f"{concurrency:>6} {elapsed:>9.2f} {pages / elapsed:>8.1f} {fetched / elapsed:>9.1f}")
+
+
+async def run_workload(crawler: CrawlerService, args, slugs) -> None:
+    """混合操作：题目列表、题目详情、搜索、每日一题"""
+    await crawler.batch_fetch_problems(batch_size=args.batch_size)
+    await asyncio.gather(*(crawler.get_problem_detail(slug) for slug in slugs))
+    for keyword in ("array", "tree", "graph", "synthetic problem 1"):
+        await crawler.search_problems(keyword)
+    await crawler.get_daily_challenge()
+
+
+async def bench_cache(server: FakeLeetCodeServer, args, cache: ResponseCache):
+    print(f"\n[缓存] 题目列表 + {args.details} 道题目详情 + 4 次搜索 + 每日一题")
+    print(f"{'轮次':<6} {'请求数':>8} {'耗时(s)':>9} {'命中率':>8} {'节省流量(KB)':>13}")
+    cache.clear()
+    slugs = [p["titleSlug"] for p in server.catalog[:args.details]]
+    for label in ("冷缓存", "热缓存"):
+        server.reset_counters()
+        before = cache.get_stats()
+        start = time.perf_counter()
+        async with make_crawler(server, args, cache, args.concurrency[-1]) as crawler:
+            await run_workload(crawler, args, slugs)
+        elapsed = time.perf_counter() - start
+        after = cache.get_stats()
+        lookups = sum(after[k] - before[k] for k in ("hits", "stale_hits", "misses"))
+        hits = sum(after[k] - before[k] for k in ("hits", "stale_hits"))
+        saved = after["bytes_saved"] - before["bytes_saved"]
+        print(f"{label:<6} {sum(server.requests.values()):>8} {elapsed:>9.2f} "
+              f"{(hits / lookups if lookups else 0):>8.1%} {saved / 1024:>13.0f}")
+
+
+async def bench_retry_cost(server: FakeLeetCodeServer, args, cache: ResponseCache):
+    print(f"\n[重试成本] 抓取 {args.problems} 题，并发 {args.concurrency[-1]}，退避基数 {args.backoff}s")
+    print(f"{'错误率':>6} {'限流率':>6} {'成功':>4} {'请求数':>7} {'额外请求':>8} {'重试':>6} {'耗时(s)':>9}")
+    pages = -(-args.problems // args.batch_size) + 1  # 另加一次 globalData
+    scenarios = [(0.0, 0.0), (0.05, 0.0), (0.0, 0.05), (0.2, 0.0), (0.1, 0.1)]
+    try:
+        for error_rate, throttle_rate in scenarios:
+            cache.clear()
+            server.reset_counters()
+            server.error_rate = error_rate
+            server.throttle_rate = throttle_rate
+            start = time.perf_counter()
+            async with make_crawler(server, args, cache, args.concurrency[-1]) as crawler:
+                result = await crawler.batch_fetch_problems(batch_size=args.batch_size)
+                stats: Dict[str, Any] = crawler.get_crawler_statistics()
+            elapsed = time.perf_counter() - start
+            requests = sum(server.requests.values())
+            # 失败时剩余页被取消，额外请求数没有意义
+            extra = str(requests - pages) if result["success"] else "-"
+            print(f"{error_rate:>6.0%} {throttle_rate:>6.0%} {'是' if result['success'] else '否':>4} "
+                  f"{requests:>7} {extra:>8} {stats['retries']:>6} {elapsed:>9.2f}")
+    finally:
+        server.error_rate = 0.0
+        server.throttle_rate = 0.0
+
+
+async def main_async(args):
+    server = FakeLeetCodeServer(args.problems, args.latency, args.jitter, retry_after=args.retry_after)
+    await server.start()
+    cache = ResponseCache(args.cache_path)
+    try:
+        print(f"模拟服务 {server.url}，{args.problems} 题，延迟 {args.latency}s，限速 {args.rate}/s")
+        sections = {"throughput": bench_throughput, "cache": bench_cache, "retry": bench_retry_cost}
+        for name in args.only or list(sections):
+            await sections[name](server, args, cache)
+    finally:
+        cache.clear()
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬虫基准测试套件")
+    parser.add_argument("--problems", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--details", type=int, default=200, help="缓存测试中获取详情的题目数")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--rate", type=float, default=100.0, help="令牌桶速率（请求/秒）")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--backoff", type=float, default=0.1, help="重试退避基数（秒）")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="模拟服务 429 响应的 Retry-After（秒）")
+    parser.add_argument("--only", nargs="+", choices=["throughput", "cache", "retry"], help="只运行指定项目")
+    parser.add_argument("--cache-path", default="./data/bench_crawler_cache.db", help="基准测试专用的响应缓存文件")
+    args = parser.parse_args()
+    # 重试与限流警告每次都会输出，基准测试只看汇总
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+回答要点匹配基准测试
+在合成的 5 分钟口述转写文本（约 260 字/分钟）上对比原先的逐要点子串查找（每次 eval 解析要点）
+与预编译 Aho–Corasick 匹配器（缓存命中 / 每次重新编译）的耗时，以及对同义说法的召回率
+
+运行: cd backend && python -m benchmarks.bench_keypoints --answers 500 --minutes 5
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from app.utils.keypoint_matcher import KEYPOINT_SYNONYMS, KeyPointMatcher, parse_list_field
+
+FILLER = [
+    "我先说一下整体思路，", "这个问题在实际项目中经常遇到，", "从实现的角度来看，", "需要注意边界条件，",
+    "举个例子来说，", "面试中通常会追问细节，", "然后再分析一下复杂度，", "这里有一个常见的误区，",
+    "我们在线上系统里做过类似的优化，", "总的来说就是这样，", "另外还要考虑并发的情况，", "嗯，",
+]
+
+
+def build_questions(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """每题 4-7 个要点，取自同义词表中的术语，部分写成「a/b」「主词（细节）」形式"""
+    terms = list(KEYPOINT_SYNONYMS.keys())
+    questions = []
+    for question_id in range(1, count + 1):
+        points = rng.sample(terms, rng.randint(4, 7))
+        if rng.random() < 0.5:
+            details = rng.sample([term for term in terms if term not in points], 2)
+            points[0] = f"{points[0]}（{details[0]}/{details[1]}）"
+        questions.append({"id": question_id, "key_points": json.dumps(points, ensure_ascii=False)})
+    return questions
+
+
+def build_transcript(question: Dict[str, Any], minutes: float, rng: random.Random) -> Tuple[str, int]:
+    """口述转写文本：填充语句中穿插约一半要点，其中一部分用同义说法；返回文本与埋入的要点数"""
+    points = json.loads(question["key_points"])
+    planted = rng.sample(points, max(1, len(points) // 2))
+    phrases = []
+    for point in planted:
+        term = point.split("（")[0]
+        synonyms = KEYPOINT_SYNONYMS.get(term.lower(), [])
+        phrases.append(rng.choice(synonyms) if synonyms and rng.random() < 0.5 else term)
+    target = int(minutes * 260)
+    parts: List[str] = []
+    length = 0
+    while length < target:
+        piece = rng.choice(FILLER)
+        if phrases and rng.random() < 0.1:
+            piece += phrases.pop() + "，"
+        parts.append(piece)
+        length += len(piece)
+    parts.extend(phrase + "。" for phrase in phrases)
+    return "".join(parts), len(planted)
+
+
+def legacy_match(key_points_raw: str, answer_text: str) -> int:
+    """原 analyze_answer 的实现：每次 eval 要点，逐个子串查找"""
+    key_points = eval(key_points_raw)
+    matched = 0
+    for point in key_points:
+        if isinstance(point, str) and point.lower() in answer_text.lower():
+            matched += 1
+    return matched
+
+
+def measure(samples, run, repeat: int) -> Tuple[float, int]:
+    best, found = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(run(question, text) for question, text in samples)
+        best = min(best, time.perf_counter() - start)
+    return best, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回答要点匹配基准测试")
+    parser.add_argument("--answers", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--minutes", type=float, default=5.0, help="每条回答的口述时长")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    questions = build_questions(args.questions, rng)
+    samples, planted = [], 0
+    for _ in range(args.answers):
+        question = rng.choice(questions)
+        text, count = build_transcript(question, args.minutes, rng)
+        samples.append((question, text))
+        planted += count
+    avg_chars = sum(len(text) for _, text in samples) / len(samples)
+    print(f"{len(samples)} 条回答，平均 {avg_chars:.0f} 字，{len(questions)} 道题，埋入要点 {planted} 个")
+
+    matchers: Dict[int, KeyPointMatcher] = {}
+
+    def cached(question, text):
+        matcher = matchers.get(question["id"])
+        if matcher is None:
+            matcher = matchers[question["id"]] = KeyPointMatcher(parse_list_field(question["key_points"]))
+        return len(matcher.match(text))
+
+    runs = (
+        ("子串查找（原实现）", lambda q, t: legacy_match(q["key_points"], t)),
+        ("自动机，每次编译", lambda q, t: len(KeyPointMatcher(parse_list_field(q["key_points"])).match(t))),
+        ("自动机，缓存命中", cached),
+    )
+    print(f"{'方式':<18} {'总耗时(ms)':>10} {'每条(µs)':>10} {'命中要点':>8} {'召回率':>7}")
+    for name, run in runs:
+        seconds, found = measure(samples, run, args.repeat)
+        print(f"{name:<18} {seconds * 1000:>10.1f} {seconds / len(samples) * 1e6:>10.1f} "
+              f"{found:>8} {found / planted:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
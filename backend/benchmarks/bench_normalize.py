@@ -0,0 +1,94 @@
+"""
+题目内容规范化基准测试
+在整个题库语料上对比原先抓取时的正则清理（标签正则 + 逐个实体替换 + 压平空白）与 html.parser 单次扫描生成 Markdown/纯文本的耗时，
+并统计两者保留下来的行数（压平空白会丢掉示例代码块的换行）
+
+运行: cd backend && python -m benchmarks.bench_normalize --problems 3000
+      cd backend && python -m benchmarks.bench_normalize --from-db   # 使用库中已保存的原始 HTML
+"""
+
+import argparse
+import re
+import time
+from typing import List
+
+from app.utils.html_normalizer import normalize_html
+from benchmarks.fake_leetcode import build_catalog, build_question_detail
+
+
+def legacy_clean(html_content: str) -> str:
+    """原 CrawlerService._clean_html_content 的实现，作为基线"""
+    if not html_content:
+        return ""
+    import re
+    clean_text = re.sub(r'<[^>]+>', '', html_content)
+    html_entities = {
+        '&lt;': '<',
+        '&gt;': '>',
+        '&amp;': '&',
+        '&quot;': '"',
+        '&#39;': "'",
+        '&nbsp;': ' '
+    }
+    for entity, char in html_entities.items():
+        clean_text = clean_text.replace(entity, char)
+    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+    return clean_text
+
+
+def load_corpus(args) -> List[str]:
+    if args.from_db:
+        from app.core.database import SessionLocal
+        from app.models.problem_content import ProblemContent
+        db = SessionLocal()
+        try:
+            return [row[0] for row in db.query(ProblemContent.source_html).all() if row[0]]
+        finally:
+            db.close()
+    return [build_question_detail(problem)["content"] for problem in build_catalog(args.problems)]
+
+
+def measure(corpus: List[str], convert, repeat: int) -> float:
+    """取 repeat 次中最快的一次"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in corpus:
+            convert(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="题目内容规范化基准测试")
+    parser.add_argument("--problems", type=int, default=3000, help="合成语料的题目数")
+    parser.add_argument("--from-db", action="store_true", help="使用 problem_contents 表中的原始 HTML 作为语料")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    if not corpus:
+        print("语料为空")
+        return
+    total_bytes = sum(len(html.encode("utf-8")) for html in corpus)
+    print(f"语料: {len(corpus)} 道题目，{total_bytes / 1024 / 1024:.2f} MB HTML")
+
+    pre_lines = sum(len(re.findall(r"\n", m)) for html in corpus for m in re.findall(r"<pre>(.*?)</pre>", html, re.S))
+    legacy_lines = sum(legacy_clean(html).count("\n") for html in corpus)
+    normalized = [normalize_html(html) for html in corpus]
+    markdown_lines = sum(n.markdown.count("\n") for n in normalized)
+    sup_kept = sum(n.text.count("^") for n in normalized)
+
+    print(f"{'方式':<22} {'总耗时(s)':>10} {'每题(µs)':>10} {'MB/s':>8}")
+    for name, convert in (("正则清理（原实现）", legacy_clean), ("html.parser 规范化", normalize_html)):
+        seconds = measure(corpus, convert, args.repeat)
+        print(f"{name:<22} {seconds:>10.3f} {seconds / len(corpus) * 1e6:>10.1f} "
+              f"{total_bytes / 1024 / 1024 / seconds:>8.2f}")
+
+    print(f"示例代码块中的换行: {pre_lines}；原实现输出保留 {legacy_lines} 个换行，"
+          f"Markdown 输出 {markdown_lines} 个换行，保留上标 {sup_kept} 处")
+    print("规范化结果在入库时写入 problem_contents，读取题目时直接返回，不再重复转换")
+
+
+if __name__ == "__main__":
+    main()
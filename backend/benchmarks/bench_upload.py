@@ -0,0 +1,140 @@
+"""
+录音上传基准测试
+在进程内的 FastAPI 应用上并发上传合成 WAV 录音，对比原先的整文件读入（await file.read()）与分块写盘
+（FileHandler.save_upload_stream）的 Python 内存峰值（tracemalloc）与耗时，并检查超限与文件头错误的上传被拒绝
+
+运行: cd backend && python -m benchmarks.bench_upload --uploads 50 --sizes 5 20 50
+"""
+
+import argparse
+import asyncio
+import os
+import struct
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, Any
+
+import httpx
+from fastapi import FastAPI, File, HTTPException, UploadFile
+
+from app.services.voice_service import sniff_audio_format
+from app.utils.file_handler import FileHandler, UploadTooLargeError
+
+
+class SyntheticWav:
+    """按需生成的 16kHz 单声道 WAV 文件对象，客户端不在内存中持有整个文件"""
+
+    def __init__(self, size: int, seed: int, header: bytes = b""):
+        data_size = size - 44
+        self.header = header or (
+            b"RIFF" + struct.pack("<I", size - 8) + b"WAVEfmt "
+            + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16)
+            + b"data" + struct.pack("<I", data_size)
+        )
+        self.block = bytes((seed + i) % 251 for i in range(65536))
+        self.size = size
+        self.position = 0
+
+    def read(self, n: int = -1) -> bytes:
+        if n < 0:
+            n = self.size - self.position
+        n = min(n, self.size - self.position)
+        if n <= 0:
+            return b""
+        if self.position < len(self.header):
+            chunk = self.header[self.position:self.position + n]
+        else:
+            offset = (self.position - len(self.header)) % len(self.block)
+            chunk = self.block[offset:offset + n]
+        self.position += len(chunk)
+        return chunk
+
+
+def build_app(save_dir: str, max_size: int) -> FastAPI:
+    app = FastAPI()
+    handler = FileHandler()
+
+    @app.post("/legacy")
+    async def legacy(audio_file: UploadFile = File(...)):
+        # 原实现：整个文件读进内存后一次写出
+        content = await audio_file.read()
+        if len(content) > max_size:
+            raise HTTPException(status_code=413, detail="too large")
+        with open(os.path.join(save_dir, f"legacy-{id(content)}.wav"), "wb") as buffer:
+            buffer.write(content)
+        return {"size": len(content)}
+
+    @app.post("/stream")
+    async def stream(audio_file: UploadFile = File(...)):
+        try:
+            saved = await handler.save_upload_stream(audio_file, save_dir, max_size, check_header=sniff_audio_format)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"size": saved["size"], "sha256": saved["sha256"]}
+
+    return app
+
+
+async def upload_many(app: FastAPI, path: str, uploads: int, size: int, header: bytes = b"") -> Dict[str, Any]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one(index: int):
+            files = {"audio_file": (f"answer-{index}.wav", SyntheticWav(size, index, header), "audio/wav")}
+            return await client.post(path, files=files)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(one(index) for index in range(uploads)))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    statuses: Dict[int, int] = {}
+    for response in responses:
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return {"seconds": elapsed, "peak_mb": peak / 1024 / 1024, "statuses": statuses}
+
+
+def clear(directory: str):
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+
+
+async def main_async(args):
+    max_size = args.max_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as save_dir:
+        app = build_app(save_dir, max_size)
+        print(f"[并发上传] {args.uploads} 个并发上传，大小上限 {args.max_mb}MB")
+        print(f"{'实现':>8} {'单个大小':>8} {'耗时(s)':>9} {'内存峰值(MB)':>13} {'状态码':>12}")
+        for size_mb in args.sizes:
+            for path, label in (("/legacy", "整文件"), ("/stream", "分块")):
+                if path == "/legacy" and size_mb * args.uploads > args.legacy_limit_mb:
+                    print(f"{label:>8} {size_mb:>6}MB {'跳过（预计内存超过 --legacy-limit-mb）':>30}")
+                    continue
+                result = await upload_many(app, path, args.uploads, size_mb * 1024 * 1024)
+                clear(save_dir)
+                print(f"{label:>8} {size_mb:>6}MB {result['seconds']:>9.2f} {result['peak_mb']:>13.1f} "
+                      f"{str(result['statuses']):>12}")
+
+        print("\n[拒绝] 分块实现")
+        result = await upload_many(app, "/stream", args.uploads, max_size + 1024 * 1024)
+        print(f"超过上限 1MB: {result['statuses']}，内存峰值 {result['peak_mb']:.1f}MB，"
+              f"残留文件 {len(os.listdir(save_dir))} 个")
+        result = await upload_many(app, "/stream", args.uploads, 1024 * 1024, header=b"<html>not audio</html>")
+        print(f"文件头不是音频: {result['statuses']}，残留文件 {len(os.listdir(save_dir))} 个")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录音上传基准测试")
+    parser.add_argument("--uploads", type=int, default=50, help="并发上传数")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 20, 50], help="单个录音大小（MB）")
+    parser.add_argument("--max-mb", type=int, default=50, help="大小上限（MB）")
+    parser.add_argument("--legacy-limit-mb", type=int, default=1500, help="整文件读入的总大小超过该值时跳过")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+本地模拟 LeetCode GraphQL 服务
+基于合成题库实现爬虫用到的查询（problemsetQuestionList、question、questionOfToday、searchQuestions、globalData），
+可注入延迟、随机错误和 429 限流，用于离线测试与基准测试
+
+单独运行: cd backend && python -m benchmarks.fake_leetcode --port 8765 --latency 0.2 --error-rate 0.05
+然后设置 LEETCODE_BASE_URL=http://127.0.0.1:8765 启动后端
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+from datetime import date
+from typing import Dict, List, Any, Optional
+
+from aiohttp import web
+
+TOPIC_TAGS = [
+    ("Array", "array"), ("String", "string"), ("Hash Table", "hash-table"),
+    ("Dynamic Programming", "dynamic-programming"), ("Math", "math"), ("Sorting", "sorting"),
+    ("Greedy", "greedy"), ("Depth-First Search", "depth-first-search"), ("Binary Search", "binary-search"),
+    ("Tree", "tree"), ("Breadth-First Search", "breadth-first-search"), ("Matrix", "matrix"),
+    ("Two Pointers", "two-pointers"), ("Bit Manipulation", "bit-manipulation"), ("Stack", "stack"),
+    ("Heap (Priority Queue)", "heap-priority-queue"), ("Graph", "graph"), ("Linked List", "linked-list"),
+    ("Backtracking", "backtracking"), ("Sliding Window", "sliding-window"),
+]
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+# 匹配 question(titleSlug: $var) 字段，可带别名
+QUESTION_FIELD = re.compile(r"(?:(\w+)\s*:\s*)?question\s*\(\s*titleSlug\s*:\s*\$(\w+)\s*\)")
+
+
+def build_question_detail(problem: Dict[str, Any]) -> Dict[str, Any]:
+    """生成题目详情：HTML 题面包含段落、示例代码块、列表、上标和实体"""
+    rng = random.Random(int(problem["frontendQuestionId"]))
+    n = rng.randint(3, 8)
+    nums = [rng.randint(-100, 100) for _ in range(n)]
+    target = rng.randint(-50, 50)
+    examples = "".join(
+        f"<p><strong class=\"example\">Example {i}:</strong></p>\n"
+        f"<pre><strong>Input:</strong> nums = {nums[:n - i + 1]}, target = {target + i}\n"
+        f"<strong>Output:</strong> {rng.randint(0, n)}\n"
+        f"<strong>Explanation:</strong> nums[0] &lt; target &amp;&amp; nums[1] &gt;= 0.\n</pre>\n"
+        for i in range(1, 3)
+    )
+    paragraphs = "".join(
+        f"<p>Given an integer array <code>nums</code> and an integer <code>target</code>, "
+        f"return the answer for query {j} of <em>{problem['title']}</em> &mdash; "
+        f"you may assume that each input has <strong>exactly one</strong> solution.</p>\n"
+        for j in range(rng.randint(1, 3))
+    )
+    constraints = (
+        "<p><strong>Constraints:</strong></p>\n<ul>\n"
+        "\t<li><code>2 &lt;= nums.length &lt;= 10<sup>4</sup></code></li>\n"
+        "\t<li><code>-10<sup>9</sup> &lt;= nums[i] &lt;= 10<sup>9</sup></code></li>\n"
+        "\t<li>Only one valid answer exists.</li>\n</ul>\n"
+    )
+    similar = [
+        {"title": f"Synthetic Problem {k}", "titleSlug": f"synthetic-problem-{k}", "difficulty": "Medium"}
+        for k in rng.sample(range(1, 200), 2)
+    ]
+    return {
+        "questionId": problem["frontendQuestionId"],
+        "questionFrontendId": problem["frontendQuestionId"],
+        "title": problem["title"],
+        "titleSlug": problem["titleSlug"],
+        "content": paragraphs + "<p>&nbsp;</p>\n" + examples + "<p>&nbsp;</p>\n" + constraints,
+        "isPaidOnly": problem["paidOnly"],
+        "difficulty": problem["difficulty"],
+        "likes": rng.randint(0, 50000),
+        "dislikes": rng.randint(0, 5000),
+        "similarQuestions": json.dumps(similar),
+        "exampleTestcases": f"{json.dumps(nums)}\n{target}",
+        "sampleTestCase": f"{json.dumps(nums)}\n{target}",
+        "topicTags": [{"name": t["name"], "slug": t["slug"]} for t in problem["topicTags"]],
+        "hints": [f"Try a hash map for problem {problem['frontendQuestionId']}.", "Sort first?"],
+        "codeSnippets": [],
+    }
+
+
+def build_catalog(total: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """生成确定性的合成题库"""
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(1, total + 1):
+        tags = rng.sample(TOPIC_TAGS, rng.randint(1, 3))
+        catalog.append({
+            "acRate": round(rng.uniform(20, 80), 2),
+            "difficulty": DIFFICULTIES[rng.choices([0, 1, 2], weights=[3, 5, 2])[0]],
+            "freqBar": round(rng.uniform(0, 100), 2),
+            "frontendQuestionId": str(i),
+            "isFavor": False,
+            "paidOnly": i % 10 == 0,
+            "status": None,
+            "title": f"Synthetic Problem {i}",
+            "titleSlug": f"synthetic-problem-{i}",
+            "topicTags": [{"name": name, "id": str(idx), "slug": slug} for idx, (name, slug) in enumerate(tags)],
+            "hasSolution": i % 3 == 0,
+            "hasVideoSolution": False,
+        })
+    return catalog
+
+
+class FakeLeetCodeServer:
+    """模拟 LeetCode GraphQL 服务"""
+
+    def __init__(
+        self,
+        total_problems: int = 3000,
+        latency: float = 0.1,
+        jitter: float = 0.0,
+        seed: int = 0,
+        item_latency: float = 0.0,
+        max_in_flight: Optional[int] = None,
+        retry_after: float = 1.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0
+    ):
+        self.catalog = build_catalog(total_problems, seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.item_latency = item_latency  # 一个请求中每多查询一道题目详情增加的延迟
+        self._by_slug: Dict[str, Dict[str, Any]] = {}
+        # 同时处理的请求超过 max_in_flight 时返回 429 并带 Retry-After，模拟服务端限流
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.throttled = 0
+        # 按比例随机返回 500 错误或 429 限流
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.errors = 0
+        self.rng = random.Random(seed)
+        self.requests: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/graphql", self.handle_graphql)
+        app.router.add_post("/graphql/", self.handle_graphql)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """在后台启动服务，返回 base_url"""
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def reset_counters(self):
+        self.requests = {}
+        self.bytes_sent = 0
+        self.peak_in_flight = 0
+        self.throttled = 0
+        self.errors = 0
+
+    async def handle_graphql(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        query = payload.get("query", "")
+        variables = payload.get("variables") or {}
+        operation = self._operation_name(query)
+        self.requests[operation] = self.requests.get(operation, 0) + 1
+
+        overloaded = self.max_in_flight is not None and self.in_flight >= self.max_in_flight
+        if overloaded or (self.throttle_rate and self.rng.random() < self.throttle_rate):
+            self.throttled += 1
+            return web.json_response(
+                {"errors": [{"message": "too many requests"}]},
+                status=429, headers={"Retry-After": str(self.retry_after)}
+            )
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"errors": [{"message": "internal error"}]}, status=500)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await self._respond(operation, query, variables)
+        finally:
+            self.in_flight -= 1
+
+    async def _respond(self, operation: str, query: str, variables: Dict[str, Any]) -> web.Response:
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+        if operation == "question":
+            delay += self.item_latency * len(QUESTION_FIELD.findall(query))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        handler = getattr(self, f"_resolve_{operation}", None)
+        if handler is None:
+            body = {"errors": [{"message": f"unsupported operation: {operation}"}]}
+        else:
+            body = {"data": handler(variables, query)}
+        response = web.json_response(body)
+        self.bytes_sent += len(response.body)
+        return response
+
+    def _operation_name(self, query: str) -> str:
+        if "problemsetQuestionList" in query:
+            return "problemsetQuestionList"
+        if "activeDailyCodingChallengeQuestion" in query:
+            return "questionOfToday"
+        if "searchQuestions" in query:
+            return "searchQuestions"
+        if QUESTION_FIELD.search(query):
+            return "question"
+        if "allQuestionsCount" in query:
+            return "globalData"
+        if "__typename" in query:
+            return "typename"
+        return "unknown"
+
+    def _resolve_problemsetQuestionList(self, variables: Dict[str, Any], query: str) -> Dict[str, Any]:
+        skip = int(variables.get("skip") or 0)
+        limit = int(variables.get("limit") or 50)
+        return {
+            "problemsetQuestionList": {
+                "total": len(self.catalog),
+                "questions": self.catalog[skip:skip + limit],
+            }
+        }
+
+    def _resolve_question(self, variables: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """支持别名批量查询：q0: question(titleSlug: $s0) ..."""
+        if len(self._by_slug) != len(self.catalog):
+            self._by_slug = {p["titleSlug"]: p for p in self.catalog}
+        data = {}
+        for alias, variable in QUESTION_FIELD.findall(query):
+            problem = self._by_slug.get(variables.get(variable))
+            data[alias or "question"] = build_question_detail(problem) if problem else None
+        return data
+
+    def _resolve_questionOfToday(self, variables: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """每日一题按日期在题库中确定性地选取"""
+        today = date.today()
+        problem = self.catalog[today.toordinal() % len(self.catalog)]
+        return {
+            "activeDailyCodingChallengeQuestion": {
+                "date": today.isoformat(),
+                "userStatus": "NotStart",
+                "link": f"/problems/{problem['titleSlug']}/",
+                "question": problem,
+            }
+        }
+
+    def _resolve_searchQuestions(self, variables: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """按标题或标签名做不区分大小写的子串匹配"""
+        keyword = (variables.get("searchKeywords") or "").lower()
+        limit = int(variables.get("limit") or 20)
+        matched = [
+            p for p in self.catalog
+            if keyword in p["title"].lower() or any(keyword in t["name"].lower() for t in p["topicTags"])
+        ]
+        return {
+            "searchQuestions": {
+                "hasMore": len(matched) > limit,
+                "numFound": len(matched),
+                "questions": [
+                    {
+                        "questionId": p["frontendQuestionId"],
+                        "title": p["title"],
+                        "titleSlug": p["titleSlug"],
+                        "difficulty": p["difficulty"],
+                        "isPaidOnly": p["paidOnly"],
+                        "topicTags": [{"name": t["name"], "slug": t["slug"]} for t in p["topicTags"]],
+                    }
+                    for p in matched[:limit]
+                ],
+            }
+        }
+
+    def _resolve_globalData(self, variables: Dict[str, Any], query: str) -> Dict[str, Any]:
+        counts = {d: 0 for d in DIFFICULTIES}
+        for problem in self.catalog:
+            counts[problem["difficulty"]] += 1
+        return {
+            "userStatus": {"isSignedIn": False, "isPremium": False, "username": ""},
+            "jobsMyCompany": None,
+            "allQuestionsCount": [{"difficulty": d, "count": c} for d, c in counts.items()],
+        }
+
+    def _resolve_typename(self, variables: Dict[str, Any], query: str) -> Dict[str, Any]:
+        return {"__typename": "Query"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟 LeetCode GraphQL 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--problems", type=int, default=3000, help="合成题目数量")
+    parser.add_argument("--latency", type=float, default=0.1, help="每个请求的固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="额外随机延迟上限（秒）")
+    parser.add_argument("--item-latency", type=float, default=0.0, help="批量详情查询中每道题增加的延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回 500 的比例")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="随机返回 429 的比例")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="同时处理的请求超过该值时返回 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 响应的 Retry-After（秒）")
+    args = parser.parse_args()
+
+    server = FakeLeetCodeServer(
+        args.problems, args.latency, args.jitter,
+        item_latency=args.item_latency,
+        max_in_flight=args.max_in_flight,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate
+    )
+    print(f"模拟 LeetCode 服务: http://{args.host}:{args.port}/graphql（{args.problems} 题，延迟 {args.latency}s，"
+          f"错误率 {args.error_rate}，限流率 {args.throttle_rate}）")
+    web.run_app(server.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""题库离线导入 - 从 JSON Lines / CSV 导出文件批量导入LeetCode题目
+
+用法:
+    python import_catalog.py problems.jsonl
+    python import_catalog.py problems.csv --batch-size 1000
+"""
+import sys
+import os
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import init_db
+from app.services.catalog_importer import CatalogImporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从导出文件批量导入LeetCode题目")
+    parser.add_argument("path", help="题库文件路径（.jsonl / .csv）")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="文件格式，默认按扩展名判断")
+    parser.add_argument("--batch-size", type=int, default=500, help="每个事务写入的题目数")
+    parser.add_argument("--skip-related", action="store_true", help="导入后不重建相似题目索引")
+    args = parser.parse_args()
+
+    init_db()
+    importer = CatalogImporter(batch_size=args.batch_size)
+    stats = importer.import_file(args.path, file_format=args.format)
+
+    print(f"导入完成: 共 {stats['rows']} 行，新增 {stats['created']}，更新 {stats['updated']}，"
+          f"跳过 {stats['skipped']}，耗时 {stats['seconds']} 秒（{stats['rows_per_sec']} 行/秒）")
+    for error in stats["errors"]:
+        print(f"  ⚠️ {error}")
+
+    if not args.skip_related and (stats["created"] or stats["updated"]):
+        from app.services.similarity_service import ProblemSimilarityService
+        result = ProblemSimilarityService().rebuild()
+        print(f"相似题目索引已重建: {result['pairs']} 条，耗时 {result['seconds']} 秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,10 @@
 FastAPI应用程序主文件
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 import uvicorn
 import os
 from pathlib import Path
@@ -34,6 +34,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def limit_request_body(request: Request, call_next):
+    """声明的请求体超过上限时直接返回 413，不再解析表单、写临时文件；分块传输的请求由上传接口边写边检查"""
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        try:
+            size = int(content_length)
+        except ValueError:
+            return JSONResponse(status_code=400, content={"detail": "无效的 Content-Length"})
+        if size > settings.MAX_REQUEST_BODY_MB * 1024 * 1024:
+            return JSONResponse(
+                status_code=413, content={"detail": f"请求体超过{settings.MAX_REQUEST_BODY_MB}MB限制"}
+            )
+    return await call_next(request)
+
 # 注册API路由
 app.include_router(resume.router, prefix="/api/v1", tags=["简历管理"])
 app.include_router(leetcode.router, prefix="/api/v1", tags=["LeetCode刷题"])
@@ -45,14 +60,110 @@ WEB_DIR = Path(__file__).parent.parent / "web"
 STATIC_DIR = Path(__file__).parent / "static"
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     """应用启动时初始化数据库并填充种子数据"""
     init_db()
     _seed_data_if_empty()
+    _normalize_pending_content()
+    _label_unclassified_problems()
+    _replay_knowledge_mastery()
+    _start_sandbox_pool()
+    await _start_shared_crawler()
+    _start_sync_scheduler()
+    _start_item_calibration_scheduler()
     print("🚀 面试助手后端服务启动成功！")
     print(f"📖 API文档地址: http://localhost:{settings.PORT}/docs")
     print(f"🌐 前端地址: http://localhost:{settings.PORT}/")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时结束代码执行进程池并关闭爬虫连接池"""
+    from app.utils.sandbox import get_sandbox_pool
+    from app.services.crawler_service import close_shared_crawler
+    from app.api.leetcode import sync_job_manager
+    from app.api.interview import item_bank
+    get_sandbox_pool().shutdown()
+    item_bank.shutdown()
+    await sync_job_manager.shutdown()
+    await close_shared_crawler()
+
+async def _start_shared_crawler():
+    """打开共享爬虫的连接池，所有爬虫接口和同步任务复用同一个会话"""
+    try:
+        from app.services.crawler_service import get_shared_crawler
+        await get_shared_crawler()
+        print("✅ 爬虫连接池已就绪")
+    except Exception as e:
+        print(f"⚠️ 爬虫连接池启动失败（不影响服务启动）: {e}")
+
+def _start_sync_scheduler():
+    """处理上次遗留的同步任务，并按 SYNC_SCHEDULE 启动定时同步"""
+    try:
+        from app.api.leetcode import sync_job_manager
+        interrupted = sync_job_manager.recover_interrupted()
+        if interrupted:
+            print(f"⚠️ {interrupted} 个同步任务因服务重启中断，可重新提交从断点继续")
+        if settings.SYNC_SCHEDULE:
+            sync_job_manager.start_scheduler(settings.SYNC_SCHEDULE, {"mode": settings.SYNC_SCHEDULE_MODE})
+            print(f"✅ 定时同步已启用（{settings.SYNC_SCHEDULE}，{settings.SYNC_SCHEDULE_MODE}）")
+    except Exception as e:
+        print(f"⚠️ 定时同步启动失败（不影响服务启动）: {e}")
+
+def _start_item_calibration_scheduler():
+    """按 ITEM_CALIBRATION_SCHEDULE 定时用答题记录标定面试题的 IRT 参数"""
+    try:
+        from app.api.interview import item_bank
+        if settings.ITEM_CALIBRATION_SCHEDULE:
+            item_bank.start_scheduler(settings.ITEM_CALIBRATION_SCHEDULE)
+            print(f"✅ 面试题定时标定已启用（{settings.ITEM_CALIBRATION_SCHEDULE}）")
+    except Exception as e:
+        print(f"⚠️ 面试题定时标定启动失败（不影响服务启动）: {e}")
+
+def _normalize_pending_content():
+    """把库中仍是 HTML 或规则版本落后的题目内容规范化一次，之后读取不再处理"""
+    try:
+        from app.services.content_service import ProblemContentService
+        stats = ProblemContentService().normalize_pending()
+        if stats["converted"] or stats["reconverted"]:
+            print(f"✅ 已规范化 {stats['converted'] + stats['reconverted']} 道题目内容，耗时 {stats['seconds']} 秒")
+    except Exception as e:
+        print(f"⚠️ 题目内容规范化失败（不影响服务启动）: {e}")
+
+def _label_unclassified_problems():
+    """为还没有分类标签的题目（种子数据、分类表上线前入库的题目）按标签分类表补写标签"""
+    try:
+        from app.services.tag_label_service import ProblemTagService
+        stats = ProblemTagService().reclassify_all(only_unlabeled=True)
+        if stats["problems"]:
+            print(f"✅ 已为 {stats['problems']} 道题目写入分类标签，耗时 {stats['seconds']} 秒")
+    except Exception as e:
+        print(f"⚠️ 题目分类标签写入失败（不影响服务启动）: {e}")
+
+def _replay_knowledge_mastery():
+    """已有刷题与答题记录但还没有知识点掌握度时，由历史记录全量重放一次"""
+    try:
+        from app.services.knowledge_tracing_service import KnowledgeTracingService
+        service = KnowledgeTracingService()
+        if service.needs_replay():
+            stats = service.replay()
+            print(f"✅ 已由 {stats['events']} 条记录重建 {stats['tags']} 个知识点的掌握度，耗时 {stats['seconds']} 秒")
+    except Exception as e:
+        print(f"⚠️ 知识点掌握度重建失败（不影响服务启动）: {e}")
+
+def _start_sandbox_pool():
+    """预先启动代码执行进程池，避免首次运行代码时的进程启动开销（未开启 SANDBOX_ENABLED 时不启动）"""
+    if not settings.SANDBOX_ENABLED:
+        return
+    try:
+        from app.utils.sandbox import get_sandbox_pool
+        pool = get_sandbox_pool()
+        pool.start()
+        isolation = pool.isolation or {}
+        print(f"✅ 代码执行进程池已就绪（{pool.size} 个工作进程，用户 {isolation.get('user')}，"
+              f"网络隔离{'已' if isolation.get('network_namespace') else '未'}生效）")
+    except Exception as e:
+        print(f"⚠️ 代码执行进程池启动失败（不影响服务启动）: {e}")
+
 def _seed_data_if_empty():
     """如果数据库为空则自动填充种子数据"""
     try:
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""题库重新分类 - 按当前标签分类表批量重写所有题目的分类标签与主分类
+
+用法:
+    python reclassify_problems.py
+    python reclassify_problems.py --only-unlabeled --batch-size 2000
+"""
+import sys
+import os
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.database import init_db
+from app.services.tag_label_service import ProblemTagService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按标签分类表重新分类整个题库")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每个事务处理的题目数")
+    parser.add_argument("--only-unlabeled", action="store_true", help="只处理还没有分类标签的题目")
+    args = parser.parse_args()
+
+    init_db()
+    service = ProblemTagService()
+    stats = service.reclassify_all(
+        batch_size=args.batch_size,
+        only_unlabeled=args.only_unlabeled,
+        on_progress=lambda s: print(f"  已处理 {s['problems']} 道题目..."),
+    )
+
+    print(f"重新分类完成: 共 {stats['problems']} 道题目，写入 {stats['labels']} 个分类标签，"
+          f"多分类 {stats['multi_label']} 道，主分类变化 {stats['category_changed']} 道，耗时 {stats['seconds']} 秒")
+    for category, count in sorted(service.get_category_counts().items(), key=lambda item: -item[1]):
+        print(f"  {category}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -463,6 +463,12 @@ class CodeEditorWidget(QWidget):
         """)
         self.result_text.setPlaceholderText("运行结果将在此显示...")
         layout.addWidget(self.result_text)
+        
+        # 测试输入（LeetCode 格式：每行一个参数）
+        self.test_input = QTextEdit()
+        self.test_input.setMaximumHeight(80)
+        self.test_input.setPlaceholderText("测试输入（每行一个参数，JSON 格式，如 [2,7,11,15] 换行 9）；留空则使用题目示例或自动生成输入")
+        layout.addWidget(self.test_input)
     
     def set_problem(self, problem: Dict):
         """设置当前题目"""
@@ -540,17 +546,46 @@ int main() {{
         code = self.code_editor.toPlainText()
         language = self.language_combo.currentText()
         
-        # 模拟代码运行
-        self.result_text.setPlainText(f"""
-运行结果:
-语言: {language}
-状态: 运行成功
-输出: Hello World
-执行时间: 52 ms
-内存消耗: 14.2 MB
-
-注意: 这是模拟运行结果，实际项目中需要集成代码执行服务
-        """)
+        try:
+            api_client = APIClient()
+            response = api_client.run_code(
+                code,
+                language=language,
+                problem_id=self.current_problem.get("id"),
+                test_input=self.test_input.toPlainText().strip() or None
+            )
+            
+            if "error" in response and "status" not in response:
+                self.result_text.setPlainText(f"运行失败: {response['error']}")
+                return
+            
+            lines = [
+                "运行结果:",
+                f"语言: {language}",
+                f"状态: {response.get('status')}",
+            ]
+            if response.get("runtime_ms") is not None:
+                lines.append(f"执行时间: {response['runtime_ms']:.2f} ms")
+            if response.get("memory_mb") is not None:
+                lines.append(f"内存消耗: {response['memory_mb']:.1f} MB")
+            if response.get("error"):
+                lines.append(f"错误: {response['error']}")
+            for case in response.get("cases", []):
+                lines.append("")
+                lines.append(f"用例 {case['index'] + 1}: {case['status']}")
+                lines.append(f"输入: {case.get('input')}")
+                if case.get("error"):
+                    lines.append(f"错误: {case['error']}")
+                else:
+                    lines.append(f"输出: {case.get('output')}")
+                if case.get("expected") is not None:
+                    lines.append(f"预期: {case['expected']}")
+                if case.get("stdout"):
+                    lines.append(f"标准输出: {case['stdout'].rstrip()}")
+            self.result_text.setPlainText("\n".join(lines))
+            
+        except Exception as e:
+            self.result_text.setPlainText(f"运行失败: {str(e)}")
     
     def submit_code(self):
         """提交代码"""
@@ -107,6 +107,16 @@ class APIClient:
         return self.post(f'/api/v1/leetcode/problems/{problem_id}/submit', 
                         data=solution_data)
     
+    def run_code(self, code: str, language: str = "Python", problem_id: Optional[int] = None,
+                 test_input: Optional[str] = None) -> Dict[str, Any]:
+        """在后端沙箱中运行代码"""
+        data = {"code": code, "language": language}
+        if problem_id:
+            data["problem_id"] = problem_id
+        if test_input:
+            data["test_input"] = test_input
+        return self.post('/api/v1/leetcode/run', data=data)
+    
     def get_leetcode_progress(self) -> Dict[str, Any]:
         """获取刷题进度"""
         return self.get('/api/v1/leetcode/progress')